@@ -1,5 +1,5 @@
-from pyshell.main import PyShell
+from pyshell.__main__ import main
 
 if __name__ == "__main__":
 
-    PyShell().main()
+    main()
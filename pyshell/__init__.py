@@ -3,4 +3,16 @@ Module to provide for command line access but does not perform
 any actions if imported into another Python module.
 """
 
-from pyshell.main import PyShell  # noqa F401
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # The PyShell class is exported lazily so that thin entry points, such as the
+    # "run --client" path, can be imported without loading the whole application.
+    if name == "PyShell":
+        # pylint: disable=import-outside-toplevel
+        from pyshell.main import PyShell
+
+        # pylint: enable=import-outside-toplevel
+        return PyShell
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
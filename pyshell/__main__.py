@@ -3,7 +3,9 @@ Module to provide for "-m pymarkdown" access to the module,
 as if it was run from the console.
 """
 
-from pyshell.main import PyShell
+import sys
+
+from pyshell.prompt_client import PromptClient
 
 
 def main() -> None:
@@ -11,7 +13,21 @@ def main() -> None:
     Main entry point.  Exposed in this manner so that the setup
     entry_points configuration has something to execute.
     """
-    PyShell().main()
+
+    # The "run --client" path is handled before the rest of the application is
+    # imported, as avoiding those imports is the reason for using the daemon.
+    if prompt_client := PromptClient.parse_thin_arguments(sys.argv[1:]):
+        client_output = prompt_client.render_current()
+        if client_output is not None:
+            print(client_output)
+            sys.exit(0)
+
+    # pylint: disable=import-outside-toplevel
+    from pyshell.main import PyShell
+
+    # pylint: enable=import-outside-toplevel
+
+    PyShell(daemon_already_tried=prompt_client is not None).main()
 
 
 if __name__ == "__main__":
@@ -3,20 +3,13 @@ Module to handle the processing of configuration for the application.
 """
 
 import argparse
-import json
 import logging
 import os
 from typing import Callable, Optional
 
-import tomli
-import yaml
-from application_properties import (
-    ApplicationProperties,
-    ApplicationPropertiesJsonLoader,
-    ApplicationPropertiesTomlLoader,
-    ApplicationPropertiesYamlLoader,
-)
+from application_properties import ApplicationProperties
 
+from pyshell.configuration_file_loader import ConfigurationFileLoader
 from pyshell.file_path_helpers import FilePathHelpers
 
 LOGGER = logging.getLogger(__name__)
@@ -47,7 +40,18 @@ class ApplicationConfigurationHelper:
             properties,
             handle_error,
         )
+        ApplicationConfigurationHelper.apply_strict_mode(args, properties, handle_error)
 
+    @staticmethod
+    def apply_strict_mode(
+        args: argparse.Namespace,
+        properties: ApplicationProperties,
+        handle_error: Callable[[str, Optional[Exception]], None],
+    ) -> None:
+        """
+        Enable strict mode for the properties if requested on the command line or
+        in the configuration itself.
+        """
         try:
             if args.strict_configuration or properties.get_boolean_property(
                 "mode.strict-config", strict_mode=True
@@ -107,6 +111,16 @@ class ApplicationConfigurationHelper:
             }
         )
 
+    @staticmethod
+    def resolve_configuration_file(args: argparse.Namespace) -> str:
+        """
+        Determine the normalized path of the configuration file to load.
+        """
+        return FilePathHelpers.normalize_path(
+            args.configuration_file
+            or ApplicationConfigurationHelper.DEFAULT_CONFIGURATION_PATH
+        )
+
     @staticmethod
     def __process_project_specific_json_configuration(
         args: argparse.Namespace,
@@ -133,71 +147,9 @@ class ApplicationConfigurationHelper:
                 None,
             )
 
-        LOGGER.debug(
-            "Determining file type for specified configuration file '%s'.",
-            configuration_file,
+        ConfigurationFileLoader.load_and_set(
+            application_properties, configuration_file, handle_error_fn
         )
-        try:
-            with open(configuration_file, encoding="utf-8") as infile:
-                json.load(infile)
-            did_load_as_json = True
-        except json.decoder.JSONDecodeError:
-            did_load_as_json = False
-
-        try:
-            with open(configuration_file, "rb") as infile:
-                loaded_document = yaml.safe_load(infile)
-            did_load_as_yaml = not isinstance(loaded_document, str)
-        except yaml.MarkedYAMLError:
-            did_load_as_yaml = False
-
-        try:
-            with open(configuration_file, "rb") as infile:
-                tomli.load(infile)
-            did_load_as_toml = True
-        except tomli.TOMLDecodeError:
-            did_load_as_toml = False
-
-        if did_load_as_json:
-            LOGGER.debug(
-                "Attempting to load configuration file '%s' as a JSON file.",
-                configuration_file,
-            )
-            ApplicationPropertiesJsonLoader.load_and_set(
-                application_properties,
-                configuration_file,
-                handle_error_fn=handle_error_fn,
-                clear_property_map=False,
-                check_for_file_presence=False,
-            )
-        elif did_load_as_yaml:
-            LOGGER.debug(
-                "Attempting to load configuration file '%s' as a YAML file.",
-                configuration_file,
-            )
-            ApplicationPropertiesYamlLoader.load_and_set(
-                application_properties,
-                configuration_file,
-                handle_error_fn=handle_error_fn,
-                clear_property_map=False,
-                check_for_file_presence=False,
-            )
-        elif did_load_as_toml:
-            LOGGER.debug(
-                "Attempting to load configuration file '%s' as a TOML file.",
-                configuration_file,
-            )
-            ApplicationPropertiesTomlLoader.load_and_set(
-                application_properties,
-                configuration_file,
-                handle_error_fn=handle_error_fn,
-                clear_property_map=False,
-                check_for_file_presence=False,
-            )
-        else:
-            formatted_error = f"Specified configuration file '{configuration_file}' was not parseable as a JSON, YAML, or TOML file."
-            LOGGER.warning(formatted_error)
-            handle_error_fn(formatted_error, None)
 
         # A specific setting applied on the command line has the highest precedence.
         if args.set_configuration:
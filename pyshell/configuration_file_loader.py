@@ -0,0 +1,199 @@
+"""
+Module to load a configuration file that may be in JSON, YAML, or TOML format.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from application_properties import ApplicationProperties
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ConfigurationFileLoader:
+    """
+    Class to load a configuration file that may be in JSON, YAML, or TOML format.
+
+    The contents of the file are read once.  The format that is most likely is parsed
+    first, based on the extension of the file or a quick look at its contents, with
+    the other formats only being tried if that parse fails.
+    """
+
+    JSON_FORMAT = "JSON"
+    YAML_FORMAT = "YAML"
+    TOML_FORMAT = "TOML"
+
+    __ALL_FORMATS = [JSON_FORMAT, YAML_FORMAT, TOML_FORMAT]
+    __FORMATS_BY_EXTENSION = {
+        ".json": JSON_FORMAT,
+        ".yaml": YAML_FORMAT,
+        ".yml": YAML_FORMAT,
+        ".toml": TOML_FORMAT,
+    }
+    __TOML_LINE_PATTERN = re.compile(
+        r"^(\[\[?[A-Za-z0-9_\-\.\"' ]+\]\]?\s*(#.*)?$|[A-Za-z0-9_\-\.\"']+\s*=)"
+    )
+
+    @staticmethod
+    def guess_formats(configuration_file: str, file_contents: bytes) -> List[str]:
+        """
+        Determine the order in which the formats should be tried, most likely first.
+        """
+        _, file_extension = os.path.splitext(configuration_file)
+        likely_format = ConfigurationFileLoader.__FORMATS_BY_EXTENSION.get(
+            file_extension.lower()
+        )
+        if not likely_format:
+            likely_format = ConfigurationFileLoader.__sniff_format(file_contents)
+        return [likely_format] + [
+            next_format
+            for next_format in ConfigurationFileLoader.__ALL_FORMATS
+            if next_format != likely_format
+        ]
+
+    @staticmethod
+    def __sniff_format(file_contents: bytes) -> str:
+        stripped_contents = file_contents.lstrip()
+        if stripped_contents.startswith(b"{"):
+            return ConfigurationFileLoader.JSON_FORMAT
+        for next_line in stripped_contents.splitlines():
+            next_line = next_line.strip()
+            if next_line and not next_line.startswith(b"#"):
+                if ConfigurationFileLoader.__TOML_LINE_PATTERN.match(
+                    next_line.decode("utf-8", errors="replace")
+                ):
+                    return ConfigurationFileLoader.TOML_FORMAT
+                break
+        return ConfigurationFileLoader.YAML_FORMAT
+
+    @staticmethod
+    def parse(
+        configuration_file: str, file_contents: bytes
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        Parse the contents of the file, returning the format that was used to parse
+        them and the parsed document, or None for both if no format could parse them.
+        """
+        for next_format in ConfigurationFileLoader.guess_formats(
+            configuration_file, file_contents
+        ):
+            LOGGER.debug(
+                "Attempting to parse configuration file '%s' as a %s file.",
+                configuration_file,
+                next_format,
+            )
+            did_parse, parsed_document = ConfigurationFileLoader.__parse_as(
+                next_format, file_contents
+            )
+            if did_parse:
+                return next_format, parsed_document
+        return None, None
+
+    # pylint: disable=import-outside-toplevel
+    @staticmethod
+    def __parse_as(file_format: str, file_contents: bytes) -> Tuple[bool, Any]:
+        """
+        Parse the contents using the given format.  The parser for each format is
+        only imported when that format is tried.
+        """
+        if file_format == ConfigurationFileLoader.JSON_FORMAT:
+            import json
+
+            try:
+                return True, json.loads(file_contents)
+            except (json.decoder.JSONDecodeError, UnicodeDecodeError):
+                return False, None
+        if file_format == ConfigurationFileLoader.YAML_FORMAT:
+            import yaml
+
+            try:
+                parsed_document = yaml.safe_load(file_contents)
+            except yaml.YAMLError:
+                return False, None
+            return not isinstance(parsed_document, str), parsed_document
+        import tomli
+
+        try:
+            return True, tomli.loads(file_contents.decode("utf-8"))
+        except (tomli.TOMLDecodeError, UnicodeDecodeError):
+            return False, None
+
+    # pylint: enable=import-outside-toplevel
+
+    @staticmethod
+    def load_and_set(
+        properties: ApplicationProperties,
+        configuration_file: str,
+        handle_error_fn: Callable[[str, Optional[Exception]], None],
+    ) -> None:
+        """
+        Read the configuration file once, parse it, and add its contents to the properties.
+        """
+        try:
+            with open(configuration_file, "rb") as infile:
+                file_contents = infile.read()
+        except OSError as this_exception:
+            handle_error_fn(
+                f"Specified configuration file '{configuration_file}' "
+                + f"was not loaded: {str(this_exception)}.",
+                this_exception,
+            )
+            return
+
+        file_format, parsed_document = ConfigurationFileLoader.parse(
+            configuration_file, file_contents
+        )
+        if not file_format:
+            formatted_error = f"Specified configuration file '{configuration_file}' was not parseable as a JSON, YAML, or TOML file."
+            LOGGER.warning(formatted_error)
+            handle_error_fn(formatted_error, None)
+            return
+
+        LOGGER.debug(
+            "Loading configuration file '%s' as a %s file.",
+            configuration_file,
+            file_format,
+        )
+        if parsed_document is None:
+            parsed_document = {}
+        if not isinstance(parsed_document, dict):
+            handle_error_fn(
+                f"Specified configuration file '{configuration_file}' is not a valid {file_format} file.",
+                None,
+            )
+            return
+        ConfigurationFileLoader.__apply_document(
+            properties,
+            configuration_file,
+            file_format,
+            parsed_document,
+            handle_error_fn,
+        )
+
+    @staticmethod
+    def __apply_document(
+        properties: ApplicationProperties,
+        configuration_file: str,
+        file_format: str,
+        parsed_document: Dict[str, Any],
+        handle_error_fn: Callable[[str, Optional[Exception]], None],
+    ) -> None:
+        if not parsed_document:
+            return
+        try:
+            properties.load_from_dict(
+                parsed_document, clear_map=False, allow_periods_in_keys=True
+            )
+        except ValueError as this_exception:
+            error_reason = (
+                "is not valid"
+                if file_format == ConfigurationFileLoader.JSON_FORMAT
+                else "contains invalidly formatted data"
+            )
+            handle_error_fn(
+                f"Specified configuration file '{configuration_file}' "
+                + f"{error_reason}: {str(this_exception)}",
+                this_exception,
+            )
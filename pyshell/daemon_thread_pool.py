@@ -0,0 +1,84 @@
+"""
+Module to provide for a pool of daemon threads to run work on.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple, TypeVar
+
+ResultType = TypeVar("ResultType")
+
+
+class DaemonThreadPool:
+    """
+    Class to provide for a pool of at most a given number of daemon threads.
+
+    Unlike a ThreadPoolExecutor, whose threads are joined when the interpreter
+    exits, work that never returns, such as a read from a hung network mount, can
+    neither keep the application from exiting nor start more threads than the pool
+    allows.  Threads are started as work is submitted and no thread is idle, and
+    are then kept for as long as the pool is used.  The number of threads that the
+    pool allows can be raised, such as when the work that is running is known to be
+    stuck, but never lowered.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str) -> None:
+        self.__max_workers = max_workers
+        self.__thread_name_prefix = thread_name_prefix
+        self.__work_queue: (
+            "queue.SimpleQueue[Tuple[Future[Any], Callable[..., Any], Tuple[Any, ...]]]"
+        ) = queue.SimpleQueue()
+        self.__idle_semaphore = threading.Semaphore(0)
+        self.__threads_lock = threading.Lock()
+        self.__threads: List[threading.Thread] = []
+
+    @property
+    def max_workers(self) -> int:
+        """Largest number of threads that the pool may start."""
+        with self.__threads_lock:
+            return self.__max_workers
+
+    @max_workers.setter
+    def max_workers(self, max_workers: int) -> None:
+        with self.__threads_lock:
+            self.__max_workers = max(self.__max_workers, max_workers)
+
+    @property
+    def thread_count(self) -> int:
+        """Number of threads that have been started by the pool."""
+        with self.__threads_lock:
+            return len(self.__threads)
+
+    def submit(
+        self, work_function: Callable[..., ResultType], *work_arguments: Any
+    ) -> "Future[ResultType]":
+        """Submit the work to be run on one of the threads, returning a future for
+        its result."""
+        work_future: "Future[ResultType]" = Future()
+        self.__work_queue.put((work_future, work_function, work_arguments))
+        if self.__idle_semaphore.acquire(blocking=False):
+            return work_future
+        with self.__threads_lock:
+            if len(self.__threads) < self.__max_workers:
+                new_thread = threading.Thread(
+                    target=self.__run_work,
+                    name=f"{self.__thread_name_prefix}-{len(self.__threads)}",
+                    daemon=True,
+                )
+                new_thread.start()
+                self.__threads.append(new_thread)
+        return work_future
+
+    # pylint: disable=broad-exception-caught
+    def __run_work(self) -> None:
+        while True:
+            work_future, work_function, work_arguments = self.__work_queue.get()
+            if work_future.set_running_or_notify_cancel():
+                try:
+                    work_future.set_result(work_function(*work_arguments))
+                except BaseException as this_exception:
+                    work_future.set_exception(this_exception)
+            self.__idle_semaphore.release()
+
+    # pylint: enable=broad-exception-caught
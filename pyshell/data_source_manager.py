@@ -1,40 +1,217 @@
 """Module to provide for the handling of data sources.
 """
 
-from typing import Dict, List
+import importlib
+import logging
+import os
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from application_properties import ApplicationProperties
 
 from pyshell.data_sources.base_data_source import (
     BaseDataSource,
     ComposerPriorityLevel,
+    PropertyCachePolicy,
+    PropertyCacheScope,
     PropertyPath,
 )
-from pyshell.data_sources.git_data_source import GitDataSource
-from pyshell.data_sources.project_data_source import ProjectDataSource
-from pyshell.data_sources.system_data_source import SystemDataSource
 from pyshell.line_item_manager import LineItemManager
 from pyshell.pyshell_exception import PyShellException
 
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+
+    from pyshell.daemon_thread_pool import DaemonThreadPool
+    from pyshell.property_value_cache import FileFingerprint, PropertyValueCache
+
+LOGGER = logging.getLogger(__name__)
+
 
 class DataSourceManager:
     """Class for the handling of data sources."""
 
-    def __init__(self) -> None:
+    __MAX_WORKERS_PROPERTY_NAME = "evaluation.max-workers"
+    __DEADLINE_PROPERTY_NAME = "evaluation.deadline-ms"
+    __SUBPROCESS_TIMEOUT_PROPERTY_NAME = "evaluation.subprocess-timeout-ms"
+    __GIT_SHOW_UNTRACKED_PROPERTY_NAME = "git.status.show-untracked"
+    __GIT_IGNORE_SUBMODULES_PROPERTY_NAME = "git.status.ignore-submodules"
+    __CACHE_TTL_PROPERTY_PREFIX = "cache.ttl-seconds"
+
+    # Properties refreshed in the background are stored even if they may not be
+    # reused, so that their last known values can be shown.
+    __LAST_KNOWN_VALUE_POLICY = PropertyCachePolicy(0, PropertyCacheScope.DIRECTORY)
+
+    # The module and class of each standard data source, along with the names of any
+    # data sources that it injects dependencies into.  Modules are only imported
+    # once a data source that they provide is needed.
+    __STANDARD_DATA_SOURCES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+        "system": ("pyshell.data_sources.system_data_source", "SystemDataSource", ()),
+        "git": (
+            "pyshell.data_sources.git_data_source",
+            "GitDataSource",
+            ("project",),
+        ),
+        "project": (
+            "pyshell.data_sources.project_data_source",
+            "ProjectDataSource",
+            (),
+        ),
+    }
+
+    def __init__(self, max_workers: int = 1, deadline_ms: Optional[int] = None) -> None:
         self.__data_sources: Dict[str, BaseDataSource] = {}
         self.__registration_completed = False
+        self.__max_workers = max_workers
+        self.__deadline_ms = deadline_ms
+        self.__cache_ttl_overrides: Dict[str, int] = {}
+        self.__has_async_properties = False
+        self.__composed_dependencies: Dict[str, Dict[str, Tuple[PropertyPath, ...]]] = (
+            {}
+        )
+        self.__deadline_pool: Optional["DaemonThreadPool"] = None
+        self.__in_flight_futures: Dict[str, "Future[str]"] = {}
+        self.__in_flight_context: Optional[Tuple[str, FrozenSet[Tuple[str, str]]]] = (
+            None
+        )
+        self.__abandoned_futures: List["Future[str]"] = []
 
-    def from_properties(self, properties: ApplicationProperties) -> None:
-        """Use information from the properties to guide how the data sources are loaded.
+    @staticmethod
+    def __validate_max_workers(max_workers: int) -> None:
+        if max_workers < 1:
+            raise ValueError("Value must be at least 1.")
+
+    @staticmethod
+    def __validate_deadline(deadline_ms: int) -> None:
+        if deadline_ms < 1:
+            raise ValueError("Value must be at least 1.")
 
-        NOTE: currently marked for future support.
+    @staticmethod
+    def __validate_cache_ttl(ttl_seconds: int) -> None:
+        if ttl_seconds < 0:
+            raise ValueError("Value must be at least 0.")
+
+    def from_properties(
+        self,
+        properties: ApplicationProperties,
+        required_properties: Optional[Sequence[PropertyPath]] = None,
+    ) -> None:
+        """Use information from the properties to guide how the data sources are loaded.
+        If the required properties are given, only the data sources needed to resolve
+        them are loaded.  Otherwise, every standard data source is loaded.
         """
-        _ = properties
-        self.register_data_source(SystemDataSource())
-        self.register_data_source(GitDataSource())
-        self.register_data_source(ProjectDataSource())
+
+        self.__max_workers = (
+            properties.get_integer_property(
+                DataSourceManager.__MAX_WORKERS_PROPERTY_NAME,
+                default_value=1,
+                valid_value_fn=DataSourceManager.__validate_max_workers,
+            )
+            or 1
+        )
+        self.__deadline_ms = properties.get_integer_property(
+            DataSourceManager.__DEADLINE_PROPERTY_NAME,
+            valid_value_fn=DataSourceManager.__validate_deadline,
+        )
+        ttl_prefix_length = len(DataSourceManager.__CACHE_TTL_PROPERTY_PREFIX) + 1
+        for next_property_name in properties.property_names_under(
+            DataSourceManager.__CACHE_TTL_PROPERTY_PREFIX
+        ):
+            ttl_seconds = properties.get_integer_property(
+                next_property_name,
+                valid_value_fn=DataSourceManager.__validate_cache_ttl,
+            )
+            if ttl_seconds is not None:
+                self.__cache_ttl_overrides[next_property_name[ttl_prefix_length:]] = (
+                    ttl_seconds
+                )
+        subprocess_timeout_ms = properties.get_integer_property(
+            DataSourceManager.__SUBPROCESS_TIMEOUT_PROPERTY_NAME,
+            valid_value_fn=DataSourceManager.__validate_deadline,
+        )
+        data_source_arguments: Dict[str, Dict[str, Any]] = {
+            "git": {
+                "subprocess_timeout": (
+                    subprocess_timeout_ms / 1000.0
+                    if subprocess_timeout_ms is not None
+                    else None
+                ),
+                "status_property_names": (
+                    [i.item_name for i in required_properties if i.source_name == "git"]
+                    if required_properties is not None
+                    else None
+                ),
+                "show_untracked": properties.get_boolean_property(
+                    DataSourceManager.__GIT_SHOW_UNTRACKED_PROPERTY_NAME,
+                    default_value=True,
+                ),
+                "ignore_submodules": properties.get_boolean_property(
+                    DataSourceManager.__GIT_IGNORE_SUBMODULES_PROPERTY_NAME,
+                    default_value=False,
+                ),
+            }
+        }
+
+        source_names_to_load = (
+            list(DataSourceManager.__STANDARD_DATA_SOURCES)
+            if required_properties is None
+            else [i.source_name for i in required_properties]
+        )
+        self.__load_standard_data_sources(source_names_to_load, data_source_arguments)
         self.registration_completed()
 
+    def __load_standard_data_sources(
+        self,
+        source_names_to_load: List[str],
+        data_source_arguments: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Load the named standard data sources, along with any data sources that the
+        properties they compose depend on, and any that inject dependencies into them.
+        """
+        standard_data_sources = DataSourceManager.__STANDARD_DATA_SOURCES
+        while source_names_to_load:
+            source_name = source_names_to_load.pop()
+            if (
+                source_name in self.__data_sources
+                or source_name not in standard_data_sources
+            ):
+                continue
+            module_name, class_name, _ = standard_data_sources[source_name]
+            LOGGER.debug(
+                "Loading data source '%s' from '%s'.", source_name, module_name
+            )
+            data_source_class = getattr(
+                importlib.import_module(module_name), class_name
+            )
+            new_data_source: BaseDataSource = data_source_class(
+                **data_source_arguments.get(source_name, {})
+            )
+            self.register_data_source(new_data_source)
+
+            for next_property_name in new_data_source.get_composed_property_names():
+                source_names_to_load.extend(
+                    i.source_name
+                    for i in new_data_source.get_property_dependencies(
+                        next_property_name
+                    )
+                )
+            source_names_to_load.extend(
+                next_source_name
+                for next_source_name, next_entry in standard_data_sources.items()
+                if source_name in next_entry[2]
+            )
+
     def register_data_source(self, new_data_source: BaseDataSource) -> None:
         """Register a new data source with the manager."""
         if new_data_source.name in self.__data_sources:
@@ -63,67 +240,191 @@ class DataSourceManager:
                         ),
                         ComposerPriorityLevel.NORMAL,
                     )
+        self.__build_dependency_graph()
+        self.__has_async_properties = any(
+            next_data_source.has_async_properties()
+            for next_data_source in self.__data_sources.values()
+        )
         self.__registration_completed = True
 
+    def __build_dependency_graph(self) -> None:
+        """Build the graph of the composed properties and the dynamic dependencies
+        between the data sources, and make sure that it does not contain any cycles.
+        """
+
+        dependency_graph: Dict[str, List[PropertyPath]] = {}
+        for next_data_source in self.__data_sources.values():
+            for next_property_name in next_data_source.get_composed_property_names():
+                dependency_graph[
+                    PropertyPath(next_data_source.name, next_property_name).full_name
+                ] = list(next_data_source.get_property_dependencies(next_property_name))
+        for next_data_source in self.__data_sources.values():
+            for next_dependency in next_data_source.get_dynamic_dependencies():
+                destination_edges = dependency_graph.setdefault(
+                    next_dependency.destination_property_path.full_name, []
+                )
+                local_property_path = PropertyPath(
+                    next_data_source.name, next_dependency.local_item_name
+                )
+                if local_property_path not in destination_edges:
+                    destination_edges.append(local_property_path)
+
+        DataSourceManager.__check_for_cycles(dependency_graph)
+        self.__composed_dependencies = {
+            next_data_source.name: {
+                next_property_name: tuple(
+                    next_data_source.get_property_dependencies(next_property_name)
+                )
+                for next_property_name in next_data_source.get_composed_property_names()
+            }
+            for next_data_source in self.__data_sources.values()
+        }
+
+    @staticmethod
+    def __check_for_cycles(dependency_graph: Dict[str, List[PropertyPath]]) -> None:
+        # Iterative depth first search, where a property that is reached again while
+        # it is still on the current path closes a cycle.
+        finished_properties: Set[str] = set()
+        for start_property_name in dependency_graph:
+            if start_property_name in finished_properties:
+                continue
+            current_path = [start_property_name]
+            current_path_names = {start_property_name}
+            edge_iterators = [iter(dependency_graph[start_property_name])]
+            while edge_iterators:
+                next_edge = next(edge_iterators[-1], None)
+                if next_edge is None:
+                    finished_property_name = current_path.pop()
+                    finished_properties.add(finished_property_name)
+                    current_path_names.discard(finished_property_name)
+                    edge_iterators.pop()
+                    continue
+                if next_edge.full_name in current_path_names:
+                    raise PyShellException(
+                        "Dependency cycle encountered: "
+                        + "->".join(current_path + [next_edge.full_name])
+                    )
+                if (
+                    next_edge.full_name in finished_properties
+                    or next_edge.full_name not in dependency_graph
+                ):
+                    continue
+                current_path.append(next_edge.full_name)
+                current_path_names.add(next_edge.full_name)
+                edge_iterators.append(iter(dependency_graph[next_edge.full_name]))
+
+    def __get_property_dependencies(
+        self, data_source: BaseDataSource, property_id: PropertyPath
+    ) -> Sequence[PropertyPath]:
+        if (
+            composed_dependencies := self.__composed_dependencies.get(
+                property_id.source_name
+            )
+        ) is not None and (
+            property_dependencies := composed_dependencies.get(property_id.item_name)
+        ) is not None:
+            return property_dependencies
+        return data_source.get_property_dependencies(property_id.item_name)
+
     def __evaluate_single_property(
         self,
         value_cache: Dict[str, str],
-        visitor_log: List[str],
         property_id: PropertyPath,
+        unresolved_properties: Optional[Set[str]] = None,
     ) -> str:
+        """Evaluate the property without recursion.  Each composed property on the
+        current path has a frame on the stack, holding its alternatives and the index
+        of the next one to try.  Alternatives are tried in order until one has a
+        non-empty value, and data sources that decide their dependencies as they are
+        asked are still checked for cycles along the current path.
 
-        # Check to see if we already have this in our cache. If so, use it.
-        if property_id.full_name in value_cache:
-            return value_cache[property_id.full_name]
-
-        is_top_level = not visitor_log
-        visitor_log.append(property_id.full_name)
-
-        # Next, gather any dependencies for the property we want to get.  Note
-        # that is there are no dependencies, we can simply grab the property
-        # value and use it.
-        if property_id.source_name not in self.__data_sources:
-            value_cache[property_id.full_name] = ""
-            return value_cache[property_id.full_name]
-        data_dependencies = self.__data_sources[
-            property_id.source_name
-        ].get_property_dependencies(property_id.item_name)
-        if not data_dependencies:
-            value_cache[property_id.full_name] = self.__data_sources[
-                property_id.source_name
-            ].get_property(property_id.item_name)
-            return value_cache[property_id.full_name]
+        Properties whose values are not known, such as those that did not resolve
+        before their deadline, are left out of the cache.  So is a composed property
+        that reaches one of them before finding a non-empty value, as its value
+        cannot be known either.
+        """
 
-        # For the more complex properties, we need to go through the dependencies
-        # until we find a non-empty value.
+        unresolved_properties = (
+            unresolved_properties if unresolved_properties is not None else set()
+        )
+        evaluation_stack: List[Tuple[PropertyPath, Sequence[PropertyPath], int]] = []
+        evaluation_path_names: Set[str] = set()
+        property_to_enter: Optional[PropertyPath] = property_id
         resolved_value = ""
-        for next_dependency in data_dependencies:
-            inner_property_id = PropertyPath(
-                next_dependency.source_name, next_dependency.item_name
-            )
+        is_unresolved = False
+        while True:
+            if property_to_enter is not None:
+                entered_property, property_to_enter = property_to_enter, None
+                if entered_property.full_name in value_cache:
+                    resolved_value = value_cache[entered_property.full_name]
+                elif entered_property.full_name in unresolved_properties:
+                    resolved_value, is_unresolved = "", True
+                elif entered_property.source_name not in self.__data_sources:
+                    resolved_value = value_cache[entered_property.full_name] = ""
+                else:
+                    data_source = self.__data_sources[entered_property.source_name]
+                    if data_dependencies := self.__get_property_dependencies(
+                        data_source, entered_property
+                    ):
+                        evaluation_stack.append(
+                            (entered_property, data_dependencies, 0)
+                        )
+                        evaluation_path_names.add(entered_property.full_name)
+                        resolved_value = ""
+                    else:
+                        resolved_value = value_cache[entered_property.full_name] = (
+                            data_source.get_property(entered_property.item_name)
+                        )
+
+            if not evaluation_stack:
+                return resolved_value
 
-            # Detect cycles.
-            if inner_property_id.full_name in visitor_log:
-                visitor_log.append(inner_property_id.full_name)
-                raise PyShellException(
-                    "Dependency cycle encountered: " + "->".join(visitor_log)
+            # For the more complex properties, go through the dependencies until one
+            # has a non-empty value.
+            composed_property, data_dependencies, next_index = evaluation_stack[-1]
+            if (
+                not is_unresolved
+                and not resolved_value
+                and next_index < len(data_dependencies)
+            ):
+                next_dependency = data_dependencies[next_index]
+                evaluation_stack[-1] = (
+                    composed_property,
+                    data_dependencies,
+                    next_index + 1,
                 )
+                if next_dependency.full_name in evaluation_path_names:
+                    raise PyShellException(
+                        "Dependency cycle encountered: "
+                        + "->".join(
+                            [i[0].full_name for i in evaluation_stack]
+                            + [next_dependency.full_name]
+                        )
+                    )
+                property_to_enter = next_dependency
+                continue
 
-            resolved_value = self.__evaluate_single_property(
-                value_cache, visitor_log, inner_property_id
-            )
-            if resolved_value:
-                break
-            if is_top_level:
-                visitor_log.clear()
-        value_cache[property_id.full_name] = resolved_value
-        return value_cache[property_id.full_name]
+            evaluation_stack.pop()
+            evaluation_path_names.discard(composed_property.full_name)
+            if is_unresolved:
+                unresolved_properties.add(composed_property.full_name)
+            else:
+                value_cache[composed_property.full_name] = resolved_value
 
     def evaluate(
-        self, value_cache: Dict[str, str], list_item_manager: LineItemManager
-    ) -> None:
+        self,
+        value_cache: Dict[str, str],
+        list_item_manager: LineItemManager,
+        value_store: Optional["PropertyValueCache"] = None,
+    ) -> List[PropertyPath]:
         """Evaluate the required properties from the line items and resolve the
-        value of each property before we do anything else.
+        value of each property before we do anything else.  If a store of values
+        from earlier prompts is given, any values that it has for the properties
+        are used instead of resolving them, and newly resolved values are saved to it.
+
+        Properties shown by items that are refreshed in the background are not
+        resolved if there is a store.  Their last known values are used instead, and
+        the properties that need to be refreshed by refresh_properties are returned.
         """
 
         if not self.__registration_completed:
@@ -131,9 +432,664 @@ class DataSourceManager:
                 "Registration must be completed before evaluation can begin."
             )
 
+        self.__begin_render()
         required_properties = list_item_manager.get_properties_required_for_items()
+        properties_to_store = (
+            self.__load_stored_values(value_cache, required_properties, value_store)
+            if value_store
+            else {}
+        )
+        unresolved_properties: Set[str] = set()
+        properties_to_refresh = (
+            self.__load_last_known_values(
+                value_cache,
+                list_item_manager.get_properties_refreshed_in_background(),
+                value_store,
+                properties_to_store,
+            )
+            if value_store
+            else []
+        )
+        for next_property in properties_to_refresh:
+            if next_property.full_name not in value_cache:
+                unresolved_properties.add(next_property.full_name)
+        if leaf_deadlines := self.__get_leaf_deadlines(
+            list_item_manager, required_properties
+        ):
+            unresolved_properties |= self.__prefetch_with_deadlines(
+                value_cache,
+                {
+                    next_name: next_property
+                    for next_name, next_property in self.__collect_leaf_properties(
+                        required_properties, first_alternatives_only=True
+                    ).items()
+                    if next_name not in unresolved_properties
+                },
+                leaf_deadlines,
+            )
+        elif self.__max_workers > 1 or self.__has_async_properties:
+            self.__prefetch_leaf_properties(
+                value_cache, required_properties, unresolved_properties
+            )
         for property_to_resolve in required_properties:
-            visitor_log: List[str] = []
             self.__evaluate_single_property(
-                value_cache, visitor_log, property_to_resolve
+                value_cache, property_to_resolve, unresolved_properties
+            )
+        if value_store:
+            for next_name, (
+                next_policy,
+                next_fingerprint,
+            ) in properties_to_store.items():
+                if next_name in value_cache:
+                    value_store.set(
+                        next_name, next_policy, value_cache[next_name], next_fingerprint
+                    )
+            value_store.save()
+        return properties_to_refresh
+
+    def __begin_render(self) -> None:
+        for next_data_source in self.__data_sources.values():
+            next_data_source.begin_render()
+
+    def refresh_properties(
+        self,
+        properties_to_refresh: List[PropertyPath],
+        value_store: "PropertyValueCache",
+    ) -> None:
+        """Resolve the properties, ignoring any stored values, and save them to the store
+        as the last known values for the items that are refreshed in the background."""
+
+        if not self.__registration_completed:
+            raise PyShellException(
+                "Registration must be completed before evaluation can begin."
+            )
+
+        self.__begin_render()
+        value_cache: Dict[str, str] = {}
+        for next_property in properties_to_refresh:
+            cache_policy = (
+                self.get_cache_policy(next_property)
+                or DataSourceManager.__LAST_KNOWN_VALUE_POLICY
+            )
+            # The files are checked before resolving, so that a change made while
+            # the property is being resolved is not hidden by the stored value.
+            file_fingerprint = self.__compute_file_fingerprint(
+                next_property, value_store
+            )
+            value_store.set(
+                next_property.full_name,
+                cache_policy,
+                self.__evaluate_single_property(value_cache, next_property),
+                file_fingerprint,
+            )
+        value_store.save()
+
+    def __load_last_known_values(
+        self,
+        value_cache: Dict[str, str],
+        background_properties: List[PropertyPath],
+        value_store: "PropertyValueCache",
+        properties_to_store: Dict[
+            str, Tuple[PropertyCachePolicy, Optional["FileFingerprint"]]
+        ],
+    ) -> List[PropertyPath]:
+        """Place the last known values of the properties that are refreshed in the
+        background into the cache, even if they are out of date, and return the
+        properties that need to be refreshed."""
+        properties_to_refresh: List[PropertyPath] = []
+        for next_name, next_property in self.__collect_leaf_properties(
+            background_properties
+        ).items():
+            if next_name in value_cache:
+                continue
+            properties_to_store.pop(next_name, None)
+            if (
+                last_known_value := value_store.get_last_known(
+                    next_name,
+                    self.get_cache_policy(next_property)
+                    or DataSourceManager.__LAST_KNOWN_VALUE_POLICY,
+                )
+            ) is not None:
+                value_cache[next_name] = last_known_value
+            properties_to_refresh.append(next_property)
+        return properties_to_refresh
+
+    def __compute_file_fingerprint(
+        self, property_id: PropertyPath, value_store: "PropertyValueCache"
+    ) -> Optional["FileFingerprint"]:
+        if (
+            file_dependencies := self.__data_sources[
+                property_id.source_name
+            ].get_file_dependencies(property_id.item_name)
+        ) is None:
+            return None
+        return value_store.compute_fingerprint(file_dependencies)
+
+    def get_cache_policy(
+        self, property_id: PropertyPath
+    ) -> Optional[PropertyCachePolicy]:
+        """Get how long, and within which scope, the resolved value of the property may
+        be reused by later prompts.  A time to live in the configuration replaces the
+        one given by the resolver, with a time to live of 0 turning reuse off.  Any
+        files that the value depends on are still checked.
+        """
+        resolver_policy = self.__data_sources[property_id.source_name].get_cache_policy(
+            property_id.item_name
+        )
+        if (
+            ttl_seconds := self.__cache_ttl_overrides.get(property_id.full_name)
+        ) is None:
+            return resolver_policy
+        if not ttl_seconds:
+            return None
+        if resolver_policy is None:
+            return PropertyCachePolicy(ttl_seconds, PropertyCacheScope.DIRECTORY)
+        return PropertyCachePolicy(
+            ttl_seconds, resolver_policy.scope, resolver_policy.file_dependencies
+        )
+
+    def __load_stored_values(
+        self,
+        value_cache: Dict[str, str],
+        required_properties: List[PropertyPath],
+        value_store: "PropertyValueCache",
+    ) -> Dict[str, Tuple[PropertyCachePolicy, Optional["FileFingerprint"]]]:
+        """Place any stored values for the properties that do not depend on other
+        properties into the cache, returning the policies of those that need to be
+        resolved and stored, along with the fingerprints of the files they depend on."""
+        properties_to_store: Dict[
+            str, Tuple[PropertyCachePolicy, Optional["FileFingerprint"]]
+        ] = {}
+        for next_name, next_property in self.__collect_leaf_properties(
+            required_properties
+        ).items():
+            if next_name in value_cache or not (
+                cache_policy := self.get_cache_policy(next_property)
+            ):
+                continue
+            file_fingerprint = self.__compute_file_fingerprint(
+                next_property, value_store
+            )
+            if (
+                stored_value := value_store.get(
+                    next_name, cache_policy, file_fingerprint
+                )
+            ) is not None:
+                value_cache[next_name] = stored_value
+            else:
+                properties_to_store[next_name] = (cache_policy, file_fingerprint)
+        return properties_to_store
+
+    def __get_leaf_deadlines(
+        self,
+        list_item_manager: LineItemManager,
+        required_properties: List[PropertyPath],
+    ) -> Dict[str, Optional[int]]:
+        """Work out how long to wait for each property that does not depend on another
+        property.  Items without their own deadline use the global deadline, and a
+        property needed by more than one item waits for the longest of them.  If no
+        deadlines apply, an empty map is returned.
+        """
+        item_deadlines = list_item_manager.get_property_deadlines()
+        property_deadlines = [
+            item_deadlines.get(next_property.full_name) or self.__deadline_ms
+            for next_property in required_properties
+        ]
+        leaf_deadlines: Dict[str, Optional[int]] = {}
+        if all(next_deadline is None for next_deadline in property_deadlines):
+            return leaf_deadlines
+        for next_property, property_deadline in zip(
+            required_properties, property_deadlines
+        ):
+            for next_leaf_name in self.__collect_leaf_properties(
+                [next_property], first_alternatives_only=True
+            ):
+                if next_leaf_name not in leaf_deadlines:
+                    leaf_deadlines[next_leaf_name] = property_deadline
+                elif (existing_deadline := leaf_deadlines[next_leaf_name]) is not None:
+                    leaf_deadlines[next_leaf_name] = (
+                        None
+                        if property_deadline is None
+                        else max(existing_deadline, property_deadline)
+                    )
+        return leaf_deadlines
+
+    # pylint: disable=broad-exception-caught
+    def __prefetch_with_deadlines(
+        self,
+        value_cache: Dict[str, str],
+        leaf_properties: Dict[str, PropertyPath],
+        leaf_deadlines: Dict[str, Optional[int]],
+    ) -> Set[str]:
+        """Resolve each property that does not depend on another property and that has
+        a deadline on a pool of daemon threads, with the "async" properties sharing one
+        event loop, and stop waiting for each one once its deadline has passed.  The
+        pool lives as long as the manager, so a resolver that is stuck can neither
+        delay the prompt nor keep the application from exiting.  A property whose
+        earlier resolution is still running is waited on again instead of being
+        resolved again, so the pool only ever needs a thread for each property with a
+        deadline.  It is grown to that size, instead of using "max-workers", so that
+        no property waits for a thread held by one that is stuck.  Resolvers are only
+        waited on again while the current directory and the environment stay the
+        same, as they depend on both.  Once either changes, such as when the daemon
+        renders for another client, resolvers left from earlier prompts are
+        abandoned, and only still count towards the threads in use.
+
+        As with prefetching, only the first alternative of each composed property is
+        resolved here, and any later alternative that is needed is resolved by the
+        normal evaluation, without a deadline.  Properties without a deadline are also
+        left for the normal evaluation, so that they are never stuck behind one that
+        is.  The names of the properties that timed out are returned.
+        """
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+        from pyshell.daemon_thread_pool import DaemonThreadPool
+
+        # pylint: enable=import-outside-toplevel
+
+        start_time = time.monotonic()
+        render_context = (os.getcwd(), frozenset(os.environ.items()))
+        if render_context != self.__in_flight_context:
+            self.__abandoned_futures.extend(self.__in_flight_futures.values())
+            self.__in_flight_futures.clear()
+            self.__in_flight_context = render_context
+        self.__abandoned_futures = [
+            next_future
+            for next_future in self.__abandoned_futures
+            if not next_future.done()
+        ]
+        async_properties: List[PropertyPath] = []
+        threaded_properties: List[PropertyPath] = []
+        pending_deadlines: Dict[str, int] = {}
+        for next_name, next_property in leaf_properties.items():
+            if (
+                next_name in value_cache
+                or (next_deadline := leaf_deadlines.get(next_name)) is None
+            ):
+                continue
+            pending_deadlines[next_name] = next_deadline
+            if (
+                in_flight_future := self.__in_flight_futures.get(next_name)
+            ) is not None and not in_flight_future.done():
+                LOGGER.debug("Property '%s' is still being resolved.", next_name)
+            elif self.__data_sources[next_property.source_name].is_async_property(
+                next_property.item_name
+            ):
+                async_properties.append(next_property)
+            else:
+                threaded_properties.append(next_property)
+
+        busy_thread_count = len(self.__abandoned_futures) + sum(
+            not next_future.done() for next_future in self.__in_flight_futures.values()
+        )
+        required_thread_count = (
+            busy_thread_count + len(threaded_properties) + bool(async_properties)
+        )
+        if self.__deadline_pool is None:
+            self.__deadline_pool = DaemonThreadPool(
+                required_thread_count, "pyshell-evaluate"
+            )
+        else:
+            self.__deadline_pool.max_workers = required_thread_count
+        for next_property in threaded_properties:
+            self.__in_flight_futures[next_property.full_name] = (
+                self.__deadline_pool.submit(
+                    self.__data_sources[next_property.source_name].get_property,
+                    next_property.item_name,
+                )
+            )
+        if async_properties:
+            async_futures: Dict[str, "Future[str]"] = {
+                next_property.full_name: Future() for next_property in async_properties
+            }
+            self.__in_flight_futures.update(async_futures)
+            self.__deadline_pool.submit(
+                self.__resolve_async_into_futures, async_properties, async_futures
+            )
+
+        timed_out_properties: Set[str] = set()
+        while pending_deadlines:
+            wait(
+                [self.__in_flight_futures[i] for i in pending_deadlines],
+                timeout=max(
+                    0.0,
+                    start_time
+                    + (min(pending_deadlines.values()) / 1000.0)
+                    - time.monotonic(),
+                ),
+                return_when=FIRST_COMPLETED,
+            )
+
+            current_time = time.monotonic()
+            for next_name, next_deadline in list(pending_deadlines.items()):
+                if (next_future := self.__in_flight_futures[next_name]).done():
+                    del pending_deadlines[next_name]
+                    del self.__in_flight_futures[next_name]
+                    if (next_exception := next_future.exception()) is None:
+                        value_cache[next_name] = next_future.result()
+                    else:
+                        LOGGER.debug(
+                            "Prefetching property '%s' failed: %s",
+                            next_name,
+                            next_exception,
+                        )
+                elif start_time + (next_deadline / 1000.0) <= current_time:
+                    del pending_deadlines[next_name]
+                    timed_out_properties.add(next_name)
+                    LOGGER.warning(
+                        "Property '%s' did not resolve within its deadline of %d ms.",
+                        next_name,
+                        next_deadline,
+                    )
+        return timed_out_properties
+
+    def __resolve_async_into_futures(
+        self,
+        async_properties: List[PropertyPath],
+        async_futures: Dict[str, "Future[str]"],
+    ) -> None:
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+
+        # pylint: enable=import-outside-toplevel
+
+        async def resolve_async_property(property_id: PropertyPath) -> None:
+            try:
+                async_futures[property_id.full_name].set_result(
+                    await self.__data_sources[
+                        property_id.source_name
+                    ].get_property_async(property_id.item_name)
+                )
+            except Exception as this_exception:
+                async_futures[property_id.full_name].set_exception(this_exception)
+
+        async def resolve_async_properties() -> None:
+            await asyncio.gather(*(resolve_async_property(i) for i in async_properties))
+
+        asyncio.run(resolve_async_properties())
+
+    # pylint: enable=broad-exception-caught
+
+    def __collect_leaf_properties(
+        self,
+        required_properties: List[PropertyPath],
+        first_alternatives_only: bool = False,
+    ) -> Dict[str, PropertyPath]:
+        leaf_properties: Dict[str, PropertyPath] = {}
+        visited_property_names: Set[str] = set()
+        properties_to_visit = list(reversed(required_properties))
+        while properties_to_visit:
+            property_id = properties_to_visit.pop()
+            if (
+                property_id.full_name in visited_property_names
+                or property_id.source_name not in self.__data_sources
+            ):
+                continue
+            visited_property_names.add(property_id.full_name)
+            if data_dependencies := self.__get_property_dependencies(
+                self.__data_sources[property_id.source_name], property_id
+            ):
+                properties_to_visit.extend(
+                    data_dependencies[:1]
+                    if first_alternatives_only
+                    else reversed(data_dependencies)
+                )
+            else:
+                leaf_properties[property_id.full_name] = property_id
+        return leaf_properties
+
+    # pylint: disable=broad-exception-caught
+    def __prefetch_leaf_properties(
+        self,
+        value_cache: Dict[str, str],
+        required_properties: List[PropertyPath],
+        unresolved_properties: Set[str],
+    ) -> None:
+        """Resolve the properties that do not depend on another property before the
+        normal evaluation.  Properties with "async" resolvers are all awaited on a
+        single event loop.  If more than one worker is allowed, the other properties
+        are resolved on a pool of threads at the same time.  Only the properties that
+        are referenced directly, and the first alternative of each composed property,
+        are resolved, as the later alternatives are usually never needed.  If the
+        first alternative is empty, the later ones are resolved one after the other
+        by the normal evaluation, which runs against the filled cache and so keeps
+        the composer ordering and the cycle detection exactly as they are.
+        """
+        leaf_properties = self.__collect_leaf_properties(
+            required_properties, first_alternatives_only=True
+        )
+        async_properties: List[PropertyPath] = []
+        threaded_properties: List[PropertyPath] = []
+        for next_name, next_property in leaf_properties.items():
+            if next_name in value_cache or next_name in unresolved_properties:
+                continue
+            if self.__data_sources[next_property.source_name].is_async_property(
+                next_property.item_name
+            ):
+                async_properties.append(next_property)
+            else:
+                threaded_properties.append(next_property)
+        if self.__max_workers < 2 or len(threaded_properties) < 2:
+            threaded_properties = []
+
+        property_futures: Dict[str, "Future[str]"] = {}
+        if threaded_properties:
+            # pylint: disable=import-outside-toplevel
+            from concurrent.futures import ThreadPoolExecutor
+
+            # pylint: enable=import-outside-toplevel
+
+            with ThreadPoolExecutor(
+                max_workers=min(self.__max_workers, len(threaded_properties)),
+                thread_name_prefix="pyshell-evaluate",
+            ) as executor:
+                property_futures = {
+                    next_property.full_name: executor.submit(
+                        self.__data_sources[next_property.source_name].get_property,
+                        next_property.item_name,
+                    )
+                    for next_property in threaded_properties
+                }
+                if async_properties:
+                    self.__prefetch_async_properties(value_cache, async_properties)
+        elif async_properties:
+            self.__prefetch_async_properties(value_cache, async_properties)
+
+        for next_name, next_future in property_futures.items():
+            try:
+                value_cache[next_name] = next_future.result()
+            except Exception as this_exception:
+                # Left out of the cache, so the normal evaluation resolves it again
+                # and reports the error in the same way it always has.
+                LOGGER.debug(
+                    "Prefetching property '%s' failed: %s", next_name, this_exception
+                )
+
+    def __prefetch_async_properties(
+        self, value_cache: Dict[str, str], async_properties: List[PropertyPath]
+    ) -> None:
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+
+        # pylint: enable=import-outside-toplevel
+
+        async def resolve_async_properties() -> List[Union[str, BaseException]]:
+            return await asyncio.gather(
+                *(
+                    self.__data_sources[next_property.source_name].get_property_async(
+                        next_property.item_name
+                    )
+                    for next_property in async_properties
+                ),
+                return_exceptions=True,
+            )
+
+        for next_property, next_value in zip(
+            async_properties, asyncio.run(resolve_async_properties())
+        ):
+            if isinstance(next_value, BaseException):
+                LOGGER.debug(
+                    "Prefetching property '%s' failed: %s",
+                    next_property.full_name,
+                    next_value,
+                )
+            else:
+                value_cache[next_property.full_name] = next_value
+
+    # pylint: enable=broad-exception-caught
+
+    @property
+    def subprocess_timeout_count(self) -> int:
+        """Number of processes started by the data sources that were killed for
+        running too long."""
+        return sum(
+            next_data_source.subprocess_timeout_count
+            for next_data_source in self.__data_sources.values()
+        )
+
+    def evaluate_property(
+        self, value_cache: Dict[str, str], property_to_resolve: PropertyPath
+    ) -> str:
+        """Evaluate a single property, resolving any dependencies it has."""
+
+        if not self.__registration_completed:
+            raise PyShellException(
+                "Registration must be completed before evaluation can begin."
+            )
+        return self.__evaluate_single_property(value_cache, property_to_resolve)
+
+    def get_shell_translation(
+        self, property_to_translate: PropertyPath, variable_name: str
+    ) -> Optional[str]:
+        """Get shell commands that assign the value of the property to the named shell
+        variable, or None if the property cannot be translated.  Composed properties
+        are translated as a chain that stops at the first non-empty value.
+        """
+
+        if not self.__registration_completed:
+            raise PyShellException(
+                "Registration must be completed before translation can begin."
+            )
+        return self.__translate_single_property(property_to_translate, variable_name)
+
+    def is_volatile_property(self, property_to_check: PropertyPath) -> bool:
+        """Determine whether the value of the property, or of any property it is
+        composed from, may change without the current directory, the git HEAD or
+        the configuration changing.
+        """
+
+        if not self.__registration_completed:
+            raise PyShellException(
+                "Registration must be completed before volatility can be checked."
+            )
+        return self.__is_volatile_single_property(property_to_check)
+
+    def __get_dependency_order(
+        self, property_id: PropertyPath
+    ) -> Tuple[List[Tuple[PropertyPath, Sequence[PropertyPath]]], bool]:
+        """Get the property and every property that it may be composed from, each one
+        after the properties that it depends on, along with their dependencies from
+        the dependency graph.  The graph is walked without recursion, and any
+        dependency that would close a cycle is skipped, with the second value of the
+        result noting that one was found.
+        """
+        dependency_order: List[Tuple[PropertyPath, Sequence[PropertyPath]]] = []
+        finished_property_names: Set[str] = set()
+        path_property_names: Set[str] = set()
+        walk_stack: List[Tuple[PropertyPath, Sequence[PropertyPath], int]] = []
+        property_to_enter: Optional[PropertyPath] = property_id
+        has_cycle = False
+        while True:
+            if property_to_enter is not None:
+                entered_property, property_to_enter = property_to_enter, None
+                if entered_property.full_name in path_property_names:
+                    has_cycle = True
+                elif entered_property.full_name not in finished_property_names:
+                    walk_stack.append(
+                        (
+                            entered_property,
+                            (
+                                self.__get_property_dependencies(
+                                    self.__data_sources[entered_property.source_name],
+                                    entered_property,
+                                )
+                                if entered_property.source_name in self.__data_sources
+                                else ()
+                            ),
+                            0,
+                        )
+                    )
+                    path_property_names.add(entered_property.full_name)
+
+            if not walk_stack:
+                return dependency_order, has_cycle
+            walked_property, data_dependencies, next_index = walk_stack[-1]
+            if next_index < len(data_dependencies):
+                walk_stack[-1] = (walked_property, data_dependencies, next_index + 1)
+                property_to_enter = data_dependencies[next_index]
+                continue
+            walk_stack.pop()
+            path_property_names.discard(walked_property.full_name)
+            finished_property_names.add(walked_property.full_name)
+            dependency_order.append((walked_property, data_dependencies))
+
+    def __is_volatile_single_property(self, property_id: PropertyPath) -> bool:
+        volatile_property_names: Set[str] = set()
+        for next_property, data_dependencies in self.__get_dependency_order(
+            property_id
+        )[0]:
+            if next_property.source_name not in self.__data_sources:
+                continue
+            if (
+                any(i.full_name in volatile_property_names for i in data_dependencies)
+                if data_dependencies
+                else self.__data_sources[
+                    next_property.source_name
+                ].is_volatile_property(next_property.item_name)
+            ):
+                volatile_property_names.add(next_property.full_name)
+        return property_id.full_name in volatile_property_names
+
+    def __translate_single_property(
+        self, property_id: PropertyPath, variable_name: str
+    ) -> Optional[str]:
+        dependency_order, has_cycle = self.__get_dependency_order(property_id)
+        if has_cycle:
+            return None
+        translated_properties: Dict[str, Optional[str]] = {}
+        for next_property, data_dependencies in dependency_order:
+            translated_properties[next_property.full_name] = (
+                DataSourceManager.__translate_composed_property(
+                    [translated_properties[i.full_name] for i in data_dependencies],
+                    variable_name,
+                )
+                if data_dependencies
+                else (
+                    self.__data_sources[
+                        next_property.source_name
+                    ].get_shell_translation(next_property.item_name, variable_name)
+                    if next_property.source_name in self.__data_sources
+                    else f'{variable_name}=""'
+                )
+            )
+        return translated_properties[property_id.full_name]
+
+    @staticmethod
+    def __translate_composed_property(
+        translated_dependencies: List[Optional[str]], variable_name: str
+    ) -> Optional[str]:
+        """Chain the translations of the alternatives of a composed property, so that
+        each one is only run if the ones before it left the variable empty."""
+        known_translations = [i for i in translated_dependencies if i is not None]
+        if len(known_translations) != len(translated_dependencies):
+            return None
+        shell_lines = [known_translations[0]]
+        for translated_dependency in known_translations[1:]:
+            shell_lines.append(f'if [ -z "${variable_name}" ]; then')
+            shell_lines.extend(
+                f"    {next_line}" if next_line else next_line
+                for next_line in translated_dependency.split("\n")
             )
+            shell_lines.append("fi")
+        return "\n".join(shell_lines)
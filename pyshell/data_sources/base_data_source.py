@@ -1,10 +1,36 @@
 """Classes required to exress data sources.
 """
 
-import subprocess  # nosec blacklist
-from dataclasses import dataclass
+import inspect
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from pyshell.pyshell_exception import PyShellException
+
+if TYPE_CHECKING:  # pragma: no cover
+    import subprocess  # nosec blacklist
+
+LOGGER = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -15,6 +41,15 @@ class PropertyPath:
     "Name of the data source that contains the property."
     item_name: str
     "Name of the property within the data source."
+    full_name: str = field(init=False, repr=False, compare=False)
+    'Full name of the property, in the "source.item" format.'
+
+    def __post_init__(self) -> None:
+        # The full name is used as a key throughout evaluation, so it is built once
+        # and interned to make comparing it cheap.
+        object.__setattr__(
+            self, "full_name", sys.intern(f"{self.source_name}.{self.item_name}")
+        )
 
     @staticmethod
     def from_one(one_name: str) -> "PropertyPath":
@@ -22,11 +57,6 @@ class PropertyPath:
         two_names = one_name.split(".")
         return PropertyPath(two_names[0], two_names[1])
 
-    @property
-    def full_name(self) -> str:
-        """Get the full name of the property228."""
-        return f"{self.source_name}.{self.item_name}"
-
 
 @dataclass(frozen=True)
 class PropertyDependency:
@@ -57,6 +87,11 @@ class ComposerItem:
     priority_level: ComposerPriorityLevel
     "Priority level to use when resolving priority amoung multiple property paths."
 
+    @property
+    def sort_key(self) -> Tuple[int, str]:
+        """Key used to order the items within the composer."""
+        return (self.priority_level.value, self.property_path.full_name)
+
 
 @dataclass(frozen=False)
 class PropertyComposer:
@@ -72,6 +107,7 @@ class PropertyComposer:
     ) -> None:
         self.dependency_name = dependency_name
         self.__registered_properties: List[ComposerItem] = []
+        self.__property_paths: Optional[Tuple[PropertyPath, ...]] = None
         if default_property_path:
             self.__registered_properties.append(
                 ComposerItem(default_property_path, ComposerPriorityLevel.LOWEST)
@@ -82,26 +118,74 @@ class PropertyComposer:
         remote_property_path: PropertyPath,
         priority_level: ComposerPriorityLevel = ComposerPriorityLevel.NORMAL,
     ) -> None:
-        """Add a new path/priority pair to the list for this composer."""
-        self.__registered_properties.insert(
-            0, ComposerItem(remote_property_path, priority_level)
-        )
+        """Add a new path/priority pair to the list for this composer, keeping the list
+        sorted by priority level and full name."""
+        # pylint: disable=import-outside-toplevel
+        import bisect
 
-    @property
-    def registered_properties(self) -> List[PropertyPath]:
-        """Generate a list of registered properties, sorted by priority level and full name."""
-        sorted_data = sorted(
+        # pylint: enable=import-outside-toplevel
+
+        bisect.insort(
             self.__registered_properties,
-            key=lambda x: (x.priority_level.value, x.property_path.full_name),
+            ComposerItem(remote_property_path, priority_level),
+            key=lambda x: x.sort_key,
         )
-        property_list: List[PropertyPath] = []
-        property_list.extend(i.property_path for i in sorted_data)
-        return property_list
+        self.__property_paths = None
+
+    @property
+    def registered_properties(self) -> Tuple[PropertyPath, ...]:
+        """Get the registered properties, sorted by priority level and full name."""
+        if self.__property_paths is None:
+            self.__property_paths = tuple(
+                i.property_path for i in self.__registered_properties
+            )
+        return self.__property_paths
+
+
+class PropertyCacheScope(Enum):
+    """Scope within which a resolved property value may be reused by later prompts."""
+
+    GLOBAL = "global"
+    "The value is the same wherever the prompt is shown."
+    REPOSITORY = "repository"
+    "The value is the same anywhere within the same git repository."
+    DIRECTORY = "directory"
+    "The value is only the same within the same directory."
+    SESSION = "session"
+    "The value is the same until the login session ends."
+    BOOT = "boot"
+    "The value is the same until the machine is restarted."
 
 
-all_property_resolvers = {}
-"""Global list of property resolvers across all data sources.
-This is required as this list is created when the data sources are initialized.
+class PropertyMemoScope(Enum):
+    """How long a resolved property value stays the same, allowing the framework to
+    remember it instead of resolving it again."""
+
+    RENDER = 0
+    "The value may change between prompts, so it is only remembered while rendering."
+    PROCESS = 1
+    "The value cannot change while the process is running."
+    SESSION = 2
+    "The value cannot change during the login session."
+    BOOT = 3
+    "The value cannot change until the machine is restarted."
+
+
+@dataclass(frozen=True)
+class PropertyCachePolicy:
+    """How long, and within which scope, a resolved property value may be reused."""
+
+    ttl_seconds: Optional[float]
+    "Number of seconds that the value may be reused for, or None if there is no limit."
+    scope: PropertyCacheScope
+    "Scope within which the value may be reused."
+    file_dependencies: Optional[Callable[[Any], List[str]]] = None
+    "Function returning the files that the value depends on, given the data source."
+
+
+all_property_resolvers: Dict[str, "NameFunctionPair"] = {}
+"""Global list of property resolvers across all data sources, keyed by the qualified
+name of the function.  Each data source class also keeps its own table of resolvers.
 """
 
 
@@ -113,17 +197,53 @@ class NameFunctionPair:
     "Local item name associated with the property."
     function: Any
     "Function used to resolve the property value."
+    cache_policy: Optional[PropertyCachePolicy] = None
+    "How long resolved values may be reused by later prompts, if at all."
+    memo_scope: PropertyMemoScope = PropertyMemoScope.RENDER
+    "How long resolved values stay the same."
 
 
 # https://medium.com/@ashley.e.shultz/type-hinting-a-decorator-that-changes-function-arguments-d603a6631c3c
-P = TypeVar("P", bound=Callable[[Any], str])
-
-
-def property_resolver(property_name: str) -> Callable[[P], P]:
-    "Decorator to mark the encapsulated function with a property name to refer to it by."
+P = TypeVar("P", bound=Callable[[Any], Union[str, Awaitable[str]]])
+
+
+def property_resolver(
+    property_name: str,
+    ttl_seconds: Optional[float] = None,
+    cache_scope: PropertyCacheScope = PropertyCacheScope.DIRECTORY,
+    file_dependencies: Optional[Callable[[Any], List[str]]] = None,
+    memo_scope: PropertyMemoScope = PropertyMemoScope.RENDER,
+) -> Callable[[P], P]:
+    """Decorator to mark the encapsulated function with a property name to refer to it by.
+    The function may be an "async" function, in which case it is awaited.  If a time to
+    live is given, the resolved value may be reused by later prompts within the scope.
+    If the files that the value depends on are given, the value may be reused until any
+    of those files change, or until the time to live passes, if one is also given.
+
+    A memo scope other than RENDER states that the value cannot change for the life of
+    the process, the login session or the machine.  The value is then only resolved
+    once for each data source, and values that last for a session or until the
+    machine is restarted are also reused by later prompts.
+    """
 
     def decorator(function: P) -> P:
-        function._register = NameFunctionPair(property_name, function)  # type: ignore
+        policy_scope = (
+            PropertyCacheScope[memo_scope.name]
+            if memo_scope in (PropertyMemoScope.SESSION, PropertyMemoScope.BOOT)
+            else cache_scope
+        )
+        function._register = NameFunctionPair(  # type: ignore
+            property_name,
+            function,
+            (
+                PropertyCachePolicy(ttl_seconds, policy_scope, file_dependencies)
+                if ttl_seconds is not None
+                or file_dependencies is not None
+                or policy_scope != cache_scope
+                else None
+            ),
+            memo_scope,
+        )
         return function
 
     return decorator
@@ -132,8 +252,14 @@ def property_resolver(property_name: str) -> Callable[[P], P]:
 class RegisteringType(type):
     """Base class/metaclass used to collect information about functions marked
     as property resolvers.
+
+    Each class is given a table of its property resolvers, keyed by property name,
+    that includes any resolvers inherited from its bases.  A function that replaces
+    an inherited resolver, with or without being marked, takes its place.
     """
 
+    property_resolver_table: Dict[str, NameFunctionPair]
+
     def __init__(
         cls: "RegisteringType",
         name: str,
@@ -143,7 +269,17 @@ class RegisteringType(type):
         for key, val in attrs.items():
             resolver_function = getattr(val, "_register", None)
             if resolver_function is not None:
-                all_property_resolvers[f"{name}.{key}"] = resolver_function
+                all_property_resolvers[f"{cls.__module__}.{cls.__qualname__}.{key}"] = (
+                    resolver_function
+                )
+
+        resolvers_by_attribute: Dict[str, Optional[NameFunctionPair]] = {}
+        for next_class in reversed(cls.__mro__):
+            for key, val in vars(next_class).items():
+                resolvers_by_attribute[key] = getattr(val, "_register", None)
+        cls.property_resolver_table = {
+            i.name: i for i in resolvers_by_attribute.values() if i is not None
+        }
 
 
 class BaseDataSource(metaclass=RegisteringType):
@@ -154,10 +290,19 @@ class BaseDataSource(metaclass=RegisteringType):
         name: str,
         dependencies_to_inject: Optional[List[PropertyDependency]] = None,
         property_composers: Optional[List[PropertyComposer]] = None,
+        subprocess_timeout: Optional[float] = None,
     ) -> None:
         self.__name = name
-        self.__property_resolvers: Dict[str, Callable[["BaseDataSource"], str]] = {}
+        self.__subprocess_timeout = subprocess_timeout
+        self.__subprocess_timeout_count = 0
+        self.__subprocess_timeout_lock = threading.Lock()
+        self.__property_resolvers: Dict[
+            str, Callable[["BaseDataSource"], Union[str, Awaitable[str]]]
+        ] = {}
         self.__property_composers: Dict[str, PropertyComposer] = {}
+        self.__cache_policies: Dict[str, PropertyCachePolicy] = {}
+        self.__memoized_property_names: Set[str] = set()
+        self.__memoized_values: Dict[str, str] = {}
 
         self.__resolve_registered_properties()
         self.__dependencies_to_inject = (
@@ -177,29 +322,119 @@ class BaseDataSource(metaclass=RegisteringType):
     def __resolve_registered_properties(
         child_instance: "BaseDataSource",
     ) -> None:  # sourcery skip: instance-method-first-arg-name
-        child_class_prefix = f"{child_instance.__class__.__name__}."
-        for (
-            full_function_name,
-            property_name_function_pair,
-        ) in all_property_resolvers.items():
-            if full_function_name.startswith(child_class_prefix):
-                child_instance.__property_resolvers[
+        for property_name_function_pair in type(
+            child_instance
+        ).property_resolver_table.values():
+            child_instance.__property_resolvers[property_name_function_pair.name] = (
+                property_name_function_pair.function
+            )
+            if property_name_function_pair.memo_scope != PropertyMemoScope.RENDER:
+                child_instance.__memoized_property_names.add(
                     property_name_function_pair.name
-                ] = property_name_function_pair.function
+                )
+            if property_name_function_pair.cache_policy:
+                child_instance.__cache_policies[property_name_function_pair.name] = (
+                    property_name_function_pair.cache_policy
+                )
+
+    @property
+    def subprocess_timeout(self) -> Optional[float]:
+        """Number of seconds that a process started by a resolver may run for, unless the
+        resolver asks for another timeout.  None means there is no timeout."""
+        return self.__subprocess_timeout
+
+    @property
+    def subprocess_timeout_count(self) -> int:
+        """Number of processes started by resolvers that were killed for running too long."""
+        with self.__subprocess_timeout_lock:
+            return self.__subprocess_timeout_count
 
     def get_property(self, property_name: str) -> str:
         """Get the property from the data source that is associated with the given property name."""
-        return self._resolve_property(property_name) or ""
+        if (memoized_value := self.__memoized_values.get(property_name)) is not None:
+            return memoized_value
+        resolved_value = self._resolve_property(property_name) or ""
+        if property_name in self.__memoized_property_names:
+            self.__memoized_values[property_name] = resolved_value
+        return resolved_value
+
+    def is_async_property(self, property_name: str) -> bool:
+        """Determine whether the property is resolved by an "async" resolver."""
+        return inspect.iscoroutinefunction(
+            self.__property_resolvers.get(property_name, None)
+        )
+
+    def has_async_properties(self) -> bool:
+        """Determine whether any of the properties are resolved by an "async" resolver."""
+        return any(
+            self.is_async_property(next_property_name)
+            for next_property_name in self.__property_resolvers
+        )
+
+    async def get_property_async(self, property_name: str) -> str:
+        """Get the property from the data source that is associated with the given property name,
+        awaiting its resolver if it is an "async" resolver."""
+        if not self.is_async_property(property_name):
+            return self.get_property(property_name)
+        if (memoized_value := self.__memoized_values.get(property_name)) is not None:
+            return memoized_value
+        property_resolver_function = self.__property_resolvers[property_name]
+        resolved_value = (
+            await cast(Awaitable[Optional[str]], property_resolver_function(self))
+        ) or ""
+        if property_name in self.__memoized_property_names:
+            self.__memoized_values[property_name] = resolved_value
+        return resolved_value
 
     def get_dynamic_dependencies(self) -> List[PropertyDependency]:
         """Get a list of any dynmanic dependencies to be set up."""
         return self.__dependencies_to_inject
 
-    def get_property_dependencies(self, property_name: str) -> List[PropertyPath]:
+    def get_property_dependencies(self, property_name: str) -> Sequence[PropertyPath]:
         """Get the property dependencies from the data source that is associated with the given property name."""
         _ = property_name
         selected_composer = self.__property_composers.get(property_name, None)
-        return selected_composer.registered_properties if selected_composer else []
+        return selected_composer.registered_properties if selected_composer else ()
+
+    def get_composed_property_names(self) -> List[str]:
+        """Get the names of the properties that are composed from other properties."""
+        return list(self.__property_composers)
+
+    def get_shell_translation(
+        self, property_name: str, variable_name: str
+    ) -> Optional[str]:
+        """Get shell commands that assign the value of the property to the named shell
+        variable without invoking the application, or None if there is no such
+        translation.  Properties without a resolver always have an empty value.
+        """
+        if property_name not in self.__property_resolvers:
+            return f'{variable_name}=""'
+        return None
+
+    def get_cache_policy(self, property_name: str) -> Optional[PropertyCachePolicy]:
+        """Get how long, and within which scope, the resolved value of the property may
+        be reused by later prompts, or None if it must be resolved for every prompt."""
+        return self.__cache_policies.get(property_name, None)
+
+    def get_file_dependencies(self, property_name: str) -> Optional[List[str]]:
+        """Get the files that the resolved value of the property depends on, or None
+        if the value does not depend on any files."""
+        if (
+            cache_policy := self.__cache_policies.get(property_name, None)
+        ) is None or cache_policy.file_dependencies is None:
+            return None
+        return cache_policy.file_dependencies(self)
+
+    def is_volatile_property(self, property_name: str) -> bool:
+        """Determine whether the value of the property may change even if the current
+        directory, the git HEAD and the configuration have not changed.
+        """
+        _ = property_name
+        return False
+
+    def begin_render(self) -> None:  # noqa: B027
+        """Called before the properties of each render are resolved, so that anything
+        shared between the properties of a single render can be dropped."""
 
     def register_dynamic_dependency(  # noqa: B027
         self,
@@ -214,21 +449,196 @@ class BaseDataSource(metaclass=RegisteringType):
 
     def _resolve_property(self, property_name: str) -> Optional[str]:
         property_resolver_function = self.__property_resolvers.get(property_name, None)
-        return property_resolver_function(self) if property_resolver_function else None
+        if not property_resolver_function:
+            return None
+        if self.is_async_property(property_name):
+            # pylint: disable=import-outside-toplevel
+            import asyncio
+
+            # pylint: enable=import-outside-toplevel
+
+            return asyncio.run(
+                cast(
+                    Coroutine[Any, Any, Optional[str]],
+                    property_resolver_function(self),
+                )
+            )
+        return cast(Optional[str], property_resolver_function(self))
 
     def _execute_subprocess(
         self,
         subprocess_args: List[str],
         check_for_success: bool = True,
         use_shell: bool = False,
-    ) -> subprocess.CompletedProcess[str]:
-        """Function to execute a shell process to return more information."""
+        timeout: Optional[float] = None,
+    ) -> "subprocess.CompletedProcess[str]":
+        """Function to execute a shell process to return more information.
+
+        The process may run for the given number of seconds, or for the timeout of the
+        data source if none is given.  If it runs for longer, the process and any
+        processes it started are killed, and it is treated as having failed with no
+        output, without raising an error even if success was asked for.
+        """
+
+        # pylint: disable=import-outside-toplevel
+        import subprocess  # nosec blacklist
+
+        # pylint: enable=import-outside-toplevel
 
-        return subprocess.run(  # nosec subprocess_without_shell_equals_true
+        process_timeout = timeout if timeout is not None else self.__subprocess_timeout
+        with subprocess.Popen(  # nosec subprocess_without_shell_equals_true
             subprocess_args,
             text=True,
             shell=use_shell,  # nosec subprocess_popen_with_shell_equals_true
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            check=check_for_success,
+            start_new_session=True,
+        ) as started_process:
+            try:
+                process_stdout, process_stderr = started_process.communicate(
+                    timeout=process_timeout
+                )
+            except subprocess.TimeoutExpired:
+                self.__kill_timed_out_process(subprocess_args, started_process.pid)
+                started_process.kill()
+                started_process.communicate()
+                return subprocess.CompletedProcess(
+                    subprocess_args, started_process.returncode, "", ""
+                )
+            completed_process = subprocess.CompletedProcess(
+                subprocess_args,
+                started_process.returncode,
+                process_stdout,
+                process_stderr,
+            )
+        if check_for_success:
+            completed_process.check_returncode()
+        return completed_process
+
+    def _stream_subprocess(
+        self,
+        subprocess_args: List[str],
+        line_handler: Callable[[str], bool],
+        timeout: Optional[float] = None,
+        environment: Optional[Dict[str, str]] = None,
+    ) -> Optional[int]:
+        """Function to execute a process, passing each line of its output to the handler
+        as soon as it is read.  If the handler returns False, the process is stopped
+        without reading the rest of its output.  If an environment is given, the
+        process is run with it instead of the environment of this process.
+
+        Returns the return code of the process, 0 if the handler stopped it, or None
+        if it ran for longer than its timeout and was killed, as for _execute_subprocess.
+        """
+
+        # pylint: disable=import-outside-toplevel
+        import subprocess  # nosec blacklist
+
+        # pylint: enable=import-outside-toplevel
+
+        process_timeout = timeout if timeout is not None else self.__subprocess_timeout
+        was_stopped = False
+        timed_out_event = threading.Event()
+        with subprocess.Popen(  # nosec subprocess_without_shell_equals_true
+            subprocess_args,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=environment,
+            start_new_session=True,
+        ) as started_process:
+
+            def kill_timed_out_process() -> None:
+                timed_out_event.set()
+                self.__kill_timed_out_process(subprocess_args, started_process.pid)
+                started_process.kill()
+
+            timeout_timer = (
+                threading.Timer(process_timeout, kill_timed_out_process)
+                if process_timeout is not None
+                else None
+            )
+            if timeout_timer:
+                timeout_timer.daemon = True
+                timeout_timer.start()
+            try:
+                if started_process.stdout is None:
+                    raise PyShellException("Process output could not be read.")
+                for next_line in started_process.stdout:
+                    if not line_handler(next_line.rstrip("\n")):
+                        was_stopped = True
+                        started_process.kill()
+                        break
+            finally:
+                if timeout_timer:
+                    timeout_timer.cancel()
+        if timed_out_event.is_set():
+            return None
+        return 0 if was_stopped else started_process.returncode
+
+    async def _execute_subprocess_async(
+        self,
+        subprocess_args: List[str],
+        check_for_success: bool = True,
+        timeout: Optional[float] = None,
+    ) -> "subprocess.CompletedProcess[str]":
+        """Function to execute a process to return more information, without blocking
+        the event loop that other "async" resolvers are running on.  Timeouts are
+        handled as they are by _execute_subprocess."""
+
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+        import subprocess  # nosec blacklist
+
+        # pylint: enable=import-outside-toplevel
+
+        process_timeout = timeout if timeout is not None else self.__subprocess_timeout
+        created_process = await asyncio.create_subprocess_exec(  # nosec
+            *subprocess_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
         )
+        try:
+            process_stdout, process_stderr = await asyncio.wait_for(
+                created_process.communicate(), timeout=process_timeout
+            )
+        except asyncio.TimeoutError:
+            self.__kill_timed_out_process(subprocess_args, created_process.pid)
+            if created_process.returncode is None:
+                created_process.kill()
+            await created_process.wait()
+            return subprocess.CompletedProcess(
+                subprocess_args, created_process.returncode or 0, "", ""
+            )
+        completed_process = subprocess.CompletedProcess(
+            subprocess_args,
+            created_process.returncode or 0,
+            process_stdout.decode().replace("\r\n", "\n"),
+            process_stderr.decode().replace("\r\n", "\n"),
+        )
+        if check_for_success:
+            completed_process.check_returncode()
+        return completed_process
+
+    def __kill_timed_out_process(
+        self, subprocess_args: List[str], process_id: int
+    ) -> None:
+        """Kill the process group that the timed out process leads, so that anything
+        it started, such as a credential helper, does not outlive it."""
+        with self.__subprocess_timeout_lock:
+            self.__subprocess_timeout_count += 1
+        LOGGER.warning(
+            "Process '%s' did not complete within its timeout and was killed.",
+            " ".join(subprocess_args),
+        )
+        if hasattr(os, "killpg"):
+            # pylint: disable=import-outside-toplevel
+            import signal
+
+            # pylint: enable=import-outside-toplevel
+
+            try:
+                os.killpg(process_id, signal.SIGKILL)
+            except OSError:
+                LOGGER.debug("Process group %d has already exited.", process_id)
@@ -1,4 +1,6 @@
 import os
+import re
+from typing import Optional
 
 from pyshell.data_sources.base_data_source import BaseDataSource
 
@@ -13,3 +15,18 @@ class EnvironmentDataSource(BaseDataSource):
         """Get the property from the data source that is associated with the given property name."""
 
         return os.environ[property_name]
+
+    def get_shell_translation(
+        self, property_name: str, variable_name: str
+    ) -> Optional[str]:
+        """Get shell commands that assign the value of the property to the named shell variable."""
+
+        if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", property_name):
+            return f'{variable_name}="${{{property_name}-}}"'
+        return None
+
+    def is_volatile_property(self, property_name: str) -> bool:
+        """Environment variables may be changed at any time by the shell."""
+
+        _ = property_name
+        return True
@@ -1,7 +1,11 @@
 """Data source for properties belonging to the Git VCS.
 """
 
-from typing import List
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
 from pyshell.data_sources.base_data_source import (
     BaseDataSource,
@@ -11,23 +15,479 @@ from pyshell.data_sources.base_data_source import (
 )
 from pyshell.file_path_helpers import FilePathHelpers
 
+if TYPE_CHECKING:  # pragma: no cover
+    from pyshell.data_sources.git_object_reader import GitCommit
+
 
 class GitDataSource(BaseDataSource):
     """Data source for git properties."""
 
-    def __init__(self) -> None:
+    # Shell commands to find the closest directory, starting with the current
+    # directory, that has a ".git" directory or file.  That directory is left in
+    # "__pyshell_git_root" and the git directory in "__pyshell_git_dir".
+    FIND_GIT_DIRECTORY_COMMANDS = """local __pyshell_git_root __pyshell_git_dir __pyshell_git_head
+__pyshell_git_root="$PWD"
+__pyshell_git_dir=""
+while :; do
+    if [ -d "$__pyshell_git_root/.git" ]; then
+        __pyshell_git_dir="$__pyshell_git_root/.git"
+        break
+    elif [ -f "$__pyshell_git_root/.git" ]; then
+        IFS= read -r __pyshell_git_dir < "$__pyshell_git_root/.git"
+        __pyshell_git_dir="${__pyshell_git_dir#gitdir: }"
+        case "$__pyshell_git_dir" in
+            /*) ;;
+            *) __pyshell_git_dir="$__pyshell_git_root/$__pyshell_git_dir" ;;
+        esac
+        break
+    elif [ -z "$__pyshell_git_root" ]; then
+        break
+    fi
+    __pyshell_git_root="${__pyshell_git_root%/*}"
+done
+"""
+
+    __SHELL_TRANSLATIONS = {
+        "branch": """@VARIABLE@=""
+if [ -n "$__pyshell_git_dir" ] && [ -f "$__pyshell_git_dir/HEAD" ]; then
+    IFS= read -r __pyshell_git_head < "$__pyshell_git_dir/HEAD"
+    case "$__pyshell_git_head" in
+        "ref: refs/heads/"*) @VARIABLE@="${__pyshell_git_head#ref: refs/heads/}" ;;
+        *) @VARIABLE@="(HEAD detached at ${__pyshell_git_head%"${__pyshell_git_head#???????}"})" ;;
+    esac
+fi""",
+        "root_directory": """@VARIABLE@=""
+if [ -n "$__pyshell_git_dir" ]; then
+    @VARIABLE@="${__pyshell_git_root:-/}"
+fi""",
+    }
+
+    # Number of seconds that git may run for before it is killed.  A git that is
+    # waiting on a lock or a credential helper would otherwise hang the prompt.
+    DEFAULT_SUBPROCESS_TIMEOUT = 2.0
+
+    # Environment variables that change where git looks for the repository.  If any
+    # of these are set, git itself is asked for the properties.
+    __GIT_LOCATION_VARIABLES = ["GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR"]
+
+    # Properties counted from the output of "git status".  Only the ahead and behind
+    # counts come from the headers at the start of the output.
+    STATUS_PROPERTY_NAMES = [
+        "staged",
+        "unstaged",
+        "untracked",
+        "conflicts",
+        "ahead",
+        "behind",
+    ]
+    __STATUS_HEADER_PROPERTY_NAMES = {"ahead", "behind"}
+
+    # Operations that leave a file in the git directory while they are in progress,
+    # checked in order once any rebase has been looked for.
+    __OPERATION_MARKER_FILES = [
+        ("MERGE_HEAD", "MERGING"),
+        ("CHERRY_PICK_HEAD", "CHERRY-PICKING"),
+        ("REVERT_HEAD", "REVERTING"),
+        ("BISECT_LOG", "BISECTING"),
+    ]
+    __OPERATION_PROPERTY_NAMES = ["operation", "operation_step", "operation_total"]
+
+    # The commit that HEAD refers to changes when a commit is made, without the HEAD
+    # file itself changing.
+    __HEAD_COMMIT_PROPERTY_NAMES = [
+        "head_sha",
+        "head_short_sha",
+        "head_age",
+        "head_subject",
+    ]
+    __SHORT_OBJECT_NAME_LENGTH = 7
+    __MAXIMUM_REFERENCE_DEPTH = 5
+    __AGE_UNITS = [
+        (365 * 24 * 60 * 60, "y"),
+        (24 * 60 * 60, "d"),
+        (60 * 60, "h"),
+        (60, "m"),
+    ]
+
+    __BRANCH_REFERENCE_PREFIX = "refs/heads/"
+    __OBJECT_NAME_PATTERN = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+    __SHA256_FORMAT_PATTERN = re.compile(
+        r"^\s*objectformat\s*=\s*sha256\s*$", re.IGNORECASE | re.MULTILINE
+    )
+    __CONFIG_SECTION_PATTERN = re.compile(r"^\s*\[\s*([^\]\s]+)\s*(\S[^\]]*)?\]")
+    __CONFIG_VALUE_PATTERN = re.compile(r"^\s*([A-Za-z][-A-Za-z0-9]*)\s*(?:=(.*))?$")
+
+    # Configuration that git may be given that the core settings cannot be read from.
+    __CONFIG_ENVIRONMENT_VARIABLES = [
+        "GIT_CONFIG",
+        "GIT_CONFIG_COUNT",
+        "GIT_CONFIG_PARAMETERS",
+    ]
+    __FALSE_CONFIG_VALUES = {"false", "no", "off", "0"}
+
+    def __init__(
+        self,
+        subprocess_timeout: Optional[float] = None,
+        status_property_names: Optional[List[str]] = None,
+        show_untracked: Optional[bool] = True,
+        ignore_submodules: Optional[bool] = False,
+    ) -> None:
         dynamic_dependencies_to_inject: List[PropertyDependency] = [
             PropertyDependency(
                 "git.root_directory", PropertyPath.from_one("project.root_directory")
             )
         ]
         super().__init__(
-            name="git", dependencies_to_inject=dynamic_dependencies_to_inject
+            name="git",
+            dependencies_to_inject=dynamic_dependencies_to_inject,
+            subprocess_timeout=(
+                subprocess_timeout
+                if subprocess_timeout is not None
+                else GitDataSource.DEFAULT_SUBPROCESS_TIMEOUT
+            ),
+        )
+        self.__status_property_names: Set[str] = set(
+            GitDataSource.STATUS_PROPERTY_NAMES
+            if status_property_names is None
+            else status_property_names
+        ) & set(GitDataSource.STATUS_PROPERTY_NAMES)
+        self.__show_untracked = bool(show_untracked)
+        self.__ignore_submodules = bool(ignore_submodules)
+        self.__status_lock = threading.Lock()
+        self.__status_counts: Optional[Dict[str, int]] = None
+        self.__head_commit_lock = threading.Lock()
+        self.__head_commit: Optional[Tuple[Optional["GitCommit"]]] = None
+
+    def begin_render(self) -> None:
+        """The status of the working tree and the commit that HEAD refers to are only
+        shared by the properties of a single render."""
+        with self.__status_lock:
+            self.__status_counts = None
+        with self.__head_commit_lock:
+            self.__head_commit = None
+
+    def is_volatile_property(self, property_name: str) -> bool:
+        """The status changes whenever any file in the working tree changes."""
+        return (
+            property_name in GitDataSource.STATUS_PROPERTY_NAMES
+            or property_name in GitDataSource.__OPERATION_PROPERTY_NAMES
+            or property_name in GitDataSource.__HEAD_COMMIT_PROPERTY_NAMES
+            or property_name == "dirty"
+        )
+
+    def get_shell_translation(
+        self, property_name: str, variable_name: str
+    ) -> Optional[str]:
+        """Get shell commands that assign the value of the property to the named shell variable.
+        The git directory is found by walking up the directory tree and the branch is
+        read from its HEAD file, instead of running git."""
+        if shell_translation := GitDataSource.__SHELL_TRANSLATIONS.get(property_name):
+            return (
+                GitDataSource.FIND_GIT_DIRECTORY_COMMANDS
+                + shell_translation.replace("@VARIABLE@", variable_name)
+            )
+        return super().get_shell_translation(property_name, variable_name)
+
+    @staticmethod
+    def _find_git_entries(current_directory: str) -> List[str]:
+        """Find the ".git" entries that git would look at, from the current directory
+        up to and including the first one that exists."""
+        git_entries: List[str] = []
+        next_directory = current_directory
+        while True:
+            git_entries.append(os.path.join(next_directory, ".git"))
+            if os.path.exists(git_entries[-1]):
+                break
+            parent_directory = os.path.dirname(next_directory)
+            if parent_directory == next_directory:
+                break
+            next_directory = parent_directory
+        return git_entries
+
+    @staticmethod
+    def _resolve_git_directory(git_entry: str) -> Optional[str]:
+        """Resolve a ".git" entry into the git directory, following a "gitdir:" file
+        as used by worktrees and submodules."""
+        if os.path.isdir(git_entry):
+            return git_entry
+        try:
+            with open(git_entry, "rt", encoding="utf-8") as infile:
+                git_file_line = infile.readline().strip()
+        except OSError:
+            return None
+        if not git_file_line.startswith("gitdir: "):
+            return None
+        return os.path.join(os.path.dirname(git_entry), git_file_line[8:])
+
+    @staticmethod
+    def _resolve_common_directory(git_directory: str) -> str:
+        """Resolve the directory that holds the references and objects shared by all
+        worktrees, as named by the "commondir" file in the git directory, if any."""
+        try:
+            with open(
+                os.path.join(git_directory, "commondir"), "rt", encoding="utf-8"
+            ) as infile:
+                common_directory = infile.readline().strip()
+        except OSError:
+            return git_directory
+        return (
+            os.path.join(git_directory, common_directory)
+            if common_directory
+            else git_directory
+        )
+
+    @staticmethod
+    def _get_object_name_length(common_directory: str) -> int:
+        """Get the length, in bytes, of the object names used by the repository, which
+        is longer for repositories that use SHA-256."""
+        try:
+            with open(
+                os.path.join(common_directory, "config"), "rt", encoding="utf-8"
+            ) as infile:
+                repository_config = infile.read()
+        except OSError:
+            return 20
+        return (
+            32
+            if GitDataSource.__SHA256_FORMAT_PATTERN.search(repository_config)
+            else 20
         )
 
-    @property_resolver("branch")
+    @staticmethod
+    def _read_core_settings(common_directory: str) -> Optional[Dict[str, str]]:
+        """Read the settings in the "core" section of the system, global and
+        repository configuration files, with later files overriding earlier ones and
+        the names of the settings in lowercase.  If the configuration may come from
+        anywhere else, such as an included file or the environment, None is returned
+        so that git can be asked instead."""
+        if any(i in os.environ for i in GitDataSource.__CONFIG_ENVIRONMENT_VARIABLES):
+            return None
+        configuration_paths: List[str] = []
+        if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+            configuration_paths.append(
+                os.environ.get("GIT_CONFIG_SYSTEM", "/etc/gitconfig")
+            )
+        if global_path := os.environ.get("GIT_CONFIG_GLOBAL"):
+            configuration_paths.append(global_path)
+        else:
+            configuration_paths.extend(
+                [
+                    os.path.join(
+                        os.environ.get("XDG_CONFIG_HOME")
+                        or os.path.expanduser(os.path.join("~", ".config")),
+                        "git",
+                        "config",
+                    ),
+                    os.path.expanduser(os.path.join("~", ".gitconfig")),
+                ]
+            )
+        configuration_paths.append(os.path.join(common_directory, "config"))
+
+        core_settings: Dict[str, str] = {}
+        for next_path in configuration_paths:
+            try:
+                with open(next_path, "rt", encoding="utf-8") as infile:
+                    configuration_lines = infile.read().splitlines()
+            except OSError:
+                continue
+            except UnicodeDecodeError:
+                return None
+            section_name = ""
+            for next_line in configuration_lines:
+                if section_match := GitDataSource.__CONFIG_SECTION_PATTERN.match(
+                    next_line
+                ):
+                    section_name = section_match.group(1).lower()
+                    if section_name.startswith("include"):
+                        return None
+                    if section_match.group(2):
+                        section_name = ""
+                elif value_match := GitDataSource.__CONFIG_VALUE_PATTERN.match(
+                    next_line.split("#", 1)[0].split(";", 1)[0]
+                ):
+                    setting_name = value_match.group(1).lower()
+                    if (
+                        section_name == "extensions"
+                        and setting_name == "worktreeconfig"
+                    ):
+                        return None
+                    if section_name == "core":
+                        # A setting without a value is true.
+                        core_settings[setting_name] = (
+                            value_match.group(2).strip().strip('"')
+                            if value_match.group(2) is not None
+                            else "true"
+                        )
+        return core_settings
+
+    @staticmethod
+    def _read_head(git_directory: str) -> Optional[str]:
+        """Read the HEAD file in the git directory, returning None if it cannot be read."""
+        try:
+            with open(
+                os.path.join(git_directory, "HEAD"), "rt", encoding="utf-8"
+            ) as infile:
+                return infile.readline().strip()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_operation_state(git_directory: str) -> Tuple[str, str, str]:
+        """Work out which operation, such as a rebase or a merge, is in progress from
+        the files that it leaves in the git directory.  The step and total number of
+        steps are only known for rebases and for applying patches."""
+        for step_directory, step_file_name, total_file_name in [
+            ("rebase-merge", "msgnum", "end"),
+            ("rebase-apply", "next", "last"),
+        ]:
+            step_path = os.path.join(git_directory, step_directory)
+            if not os.path.isdir(step_path):
+                continue
+            if step_directory == "rebase-merge" or os.path.exists(
+                os.path.join(step_path, "rebasing")
+            ):
+                operation_name = "REBASE"
+            elif os.path.exists(os.path.join(step_path, "applying")):
+                operation_name = "AM"
+            else:
+                operation_name = "AM/REBASE"
+            return (
+                operation_name,
+                GitDataSource.__read_first_line(
+                    os.path.join(step_path, step_file_name)
+                ),
+                GitDataSource.__read_first_line(
+                    os.path.join(step_path, total_file_name)
+                ),
+            )
+        for marker_file_name, operation_name in GitDataSource.__OPERATION_MARKER_FILES:
+            if os.path.exists(os.path.join(git_directory, marker_file_name)):
+                return operation_name, "", ""
+        return "", "", ""
+
+    @staticmethod
+    def _resolve_head_object_name(git_directory: str) -> Optional[str]:
+        """Resolve HEAD to the name of the commit that it refers to, following any
+        symbolic references through the loose and packed references.  An empty name
+        means that the branch does not have any commits yet, and None means that git
+        must be asked instead."""
+        common_directory = GitDataSource._resolve_common_directory(git_directory)
+        if os.path.isdir(os.path.join(common_directory, "reftable")):
+            return None
+        reference_contents = GitDataSource._read_head(git_directory)
+        for _ in range(GitDataSource.__MAXIMUM_REFERENCE_DEPTH):
+            if reference_contents is None or not reference_contents.startswith("ref: "):
+                break
+            reference_name = reference_contents[5:].strip()
+            reference_path = os.path.join(common_directory, reference_name)
+            if os.path.isfile(reference_path):
+                reference_contents = GitDataSource.__read_first_line(reference_path)
+            elif (
+                reference_contents := GitDataSource.__find_packed_reference(
+                    common_directory, reference_name
+                )
+            ) is None:
+                return ""
+        if (
+            reference_contents is not None
+            and GitDataSource.__OBJECT_NAME_PATTERN.fullmatch(reference_contents)
+        ):
+            return reference_contents
+        return None
+
+    @staticmethod
+    def __find_packed_reference(
+        common_directory: str, reference_name: str
+    ) -> Optional[str]:
+        try:
+            with open(
+                os.path.join(common_directory, "packed-refs"), "rt", encoding="utf-8"
+            ) as infile:
+                for next_line in infile:
+                    if next_line.startswith(("#", "^")):
+                        continue
+                    object_name, _, line_reference_name = next_line.rstrip(
+                        "\n"
+                    ).partition(" ")
+                    if line_reference_name == reference_name:
+                        return object_name
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def __read_first_line(file_path: str) -> str:
+        try:
+            with open(file_path, "rt", encoding="utf-8") as infile:
+                return infile.readline().strip()
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _find_repository(current_directory: str) -> Optional[Tuple[str, str]]:
+        """Find the root directory of the repository and its git directory without
+        running git.  An empty root directory means that the current directory is not
+        within a repository, and None means that git must be asked instead, such as
+        when the git directory does not have a HEAD file."""
+        if any(i in os.environ for i in GitDataSource.__GIT_LOCATION_VARIABLES):
+            return None
+        git_entry = GitDataSource._find_git_entries(current_directory)[-1]
+        if not os.path.exists(git_entry):
+            return "", ""
+        if (
+            git_directory := GitDataSource._resolve_git_directory(git_entry)
+        ) and os.path.isfile(os.path.join(git_directory, "HEAD")):
+            return os.path.dirname(git_entry), git_directory
+        return None
+
+    def __get_root_directory_files(self) -> List[str]:
+        return GitDataSource._find_git_entries(os.getcwd())
+
+    def __get_branch_name_files(self) -> List[str]:
+        git_entries = GitDataSource._find_git_entries(os.getcwd())
+        if git_directory := GitDataSource._resolve_git_directory(git_entries[-1]):
+            git_entries.extend(
+                [
+                    os.path.join(git_directory, "HEAD"),
+                    os.path.join(
+                        GitDataSource._resolve_common_directory(git_directory),
+                        "packed-refs",
+                    ),
+                ]
+            )
+        return git_entries
+
+    @property_resolver("branch", file_dependencies=__get_branch_name_files)
     def __get_branch_name(self) -> str:
-        """TBD"""
+        """Get the name of the current branch, read from the HEAD file of the
+        repository.  A detached HEAD is shown as the abbreviated object name that it
+        refers to, and git is only run if the HEAD file cannot be understood."""
+        repository_location = GitDataSource._find_repository(os.getcwd())
+        if repository_location is None:
+            return self.__get_branch_name_from_git()
+        root_directory, git_directory = repository_location
+        if not root_directory:
+            return ""
+        if (head_contents := GitDataSource._read_head(git_directory)) is None or (
+            branch_name := GitDataSource.__parse_head(head_contents)
+        ) is None:
+            return self.__get_branch_name_from_git()
+        return branch_name
+
+    @staticmethod
+    def __parse_head(head_contents: str) -> Optional[str]:
+        if head_contents.startswith("ref: "):
+            head_reference = head_contents[5:].strip()
+            return (
+                head_reference[len(GitDataSource.__BRANCH_REFERENCE_PREFIX) :]
+                if head_reference.startswith(GitDataSource.__BRANCH_REFERENCE_PREFIX)
+                else head_reference
+            )
+        if GitDataSource.__OBJECT_NAME_PATTERN.fullmatch(head_contents):
+            return f"(HEAD detached at {head_contents[:7]})"
+        return None
+
+    def __get_branch_name_from_git(self) -> str:
         if not (
             subcommand_response := self._execute_subprocess(
                 ["git", "branch", "--no-color"], check_for_success=False
@@ -38,9 +498,18 @@ class GitDataSource(BaseDataSource):
                     return i[2:]
         return ""
 
-    @property_resolver("root_directory")
+    @property_resolver("root_directory", file_dependencies=__get_root_directory_files)
     def __get_root_directory(self) -> str:
-        """TBD"""
+        """Get the root directory of the repository, found by looking for the closest
+        ".git" entry.  Git is only run if the entry cannot be understood."""
+        if (
+            repository_location := GitDataSource._find_repository(os.getcwd())
+        ) is not None:
+            return (
+                FilePathHelpers.normalize_path(repository_location[0])
+                if repository_location[0]
+                else ""
+            )
         if not (
             subcommand_response := self._execute_subprocess(
                 ["git", "rev-parse", "--show-toplevel"], check_for_success=False
@@ -49,6 +518,284 @@ class GitDataSource(BaseDataSource):
             return FilePathHelpers.normalize_path(subcommand_response.stdout[:-1])
         return ""
 
+    @property_resolver("operation")
+    def __get_operation(self) -> str:
+        """Get the name of the operation that is in progress, such as "REBASE" or
+        "MERGING", in the same way as the prompt support that comes with git."""
+        return self.__get_operation_state()[0]
+
+    @property_resolver("operation_step")
+    def __get_operation_step(self) -> str:
+        """Get the number of the step that a rebase or the applying of patches is on."""
+        return self.__get_operation_state()[1]
+
+    @property_resolver("operation_total")
+    def __get_operation_total(self) -> str:
+        """Get the number of steps in a rebase or the applying of patches."""
+        return self.__get_operation_state()[2]
+
+    def __get_operation_state(self) -> Tuple[str, str, str]:
+        repository_location = GitDataSource._find_repository(os.getcwd())
+        if repository_location is None:
+            if (
+                git_directory := self._execute_subprocess(
+                    ["git", "rev-parse", "--absolute-git-dir"], check_for_success=False
+                ).stdout.strip()
+            ) and os.path.isdir(git_directory):
+                return GitDataSource._read_operation_state(git_directory)
+            return "", "", ""
+        if not repository_location[0]:
+            return "", "", ""
+        return GitDataSource._read_operation_state(repository_location[1])
+
+    @property_resolver("head_sha")
+    def __get_head_sha(self) -> str:
+        """Get the full name of the commit that HEAD refers to."""
+        head_commit = self.__get_head_commit()
+        return head_commit.object_name if head_commit else ""
+
+    @property_resolver("head_short_sha")
+    def __get_head_short_sha(self) -> str:
+        """Get the abbreviated name of the commit that HEAD refers to."""
+        head_commit = self.__get_head_commit()
+        return (
+            head_commit.object_name[: GitDataSource.__SHORT_OBJECT_NAME_LENGTH]
+            if head_commit
+            else ""
+        )
+
+    @property_resolver("head_age")
+    def __get_head_age(self) -> str:
+        """Get how long ago the commit that HEAD refers to was committed, in the largest
+        whole unit, such as "5m" or "3d"."""
+        if not (head_commit := self.__get_head_commit()):
+            return ""
+        commit_age = max(0, int(time.time()) - head_commit.committer_time)
+        for unit_seconds, unit_suffix in GitDataSource.__AGE_UNITS:
+            if commit_age >= unit_seconds:
+                return f"{commit_age // unit_seconds}{unit_suffix}"
+        return f"{commit_age}s"
+
+    @property_resolver("head_subject")
+    def __get_head_subject(self) -> str:
+        """Get the subject of the message of the commit that HEAD refers to."""
+        head_commit = self.__get_head_commit()
+        return head_commit.subject if head_commit else ""
+
+    def __get_head_commit(self) -> Optional["GitCommit"]:
+        with self.__head_commit_lock:
+            if self.__head_commit is None:
+                self.__head_commit = (self.__read_head_commit(),)
+            return self.__head_commit[0]
+
+    def __read_head_commit(self) -> Optional["GitCommit"]:
+        """Read the commit that HEAD refers to from the object database, only running
+        git if HEAD cannot be resolved or the commit cannot be read."""
+
+        # pylint: disable=import-outside-toplevel
+        from pyshell.data_sources.git_object_reader import GitObjectReader
+
+        # pylint: enable=import-outside-toplevel
+
+        repository_location = GitDataSource._find_repository(os.getcwd())
+        if repository_location is not None and not repository_location[0]:
+            return None
+        if repository_location is not None:
+            git_directory = repository_location[1]
+            object_name = GitDataSource._resolve_head_object_name(git_directory)
+            if object_name == "":
+                return None
+            if object_name is not None:
+                common_directory = GitDataSource._resolve_common_directory(
+                    git_directory
+                )
+                if head_commit := GitObjectReader(
+                    common_directory,
+                    GitDataSource._get_object_name_length(common_directory),
+                ).read_commit(object_name):
+                    return head_commit
+        return self.__read_head_commit_from_git()
+
+    def __read_head_commit_from_git(self) -> Optional["GitCommit"]:
+        # pylint: disable=import-outside-toplevel
+        from pyshell.data_sources.git_object_reader import GitCommit
+
+        # pylint: enable=import-outside-toplevel
+
+        subcommand_response = self._execute_subprocess(
+            ["git", "log", "-1", "--format=%H%x00%ct%x00%s"], check_for_success=False
+        )
+        commit_fields = subcommand_response.stdout.rstrip("\n").split("\0")
+        if subcommand_response.returncode or len(commit_fields) != 3:
+            return None
+        return GitCommit(commit_fields[0], int(commit_fields[1]), commit_fields[2])
+
+    @property_resolver("dirty")
+    def __get_dirty(self) -> str:
+        """Get "*" if any tracked file in the working tree differs from the index, as
+        "git diff" would show.  The index is read directly, stopping at the first file
+        that has changed, and git is only run if the index cannot be read.  As files
+        are compared with the index without any of the conversions that git may make
+        to them first, git is also run if line endings may be converted or if any
+        attributes, which may name filters, could apply."""
+        repository_location = GitDataSource._find_repository(os.getcwd())
+        if repository_location is None:
+            return self.__get_dirty_from_git()
+        root_directory, git_directory = repository_location
+        index_path = os.path.join(git_directory, "index")
+        if not root_directory or not os.path.exists(index_path):
+            return ""
+
+        # pylint: disable=import-outside-toplevel
+        from pyshell.data_sources.git_index_reader import GitIndexReader
+
+        # pylint: enable=import-outside-toplevel
+
+        common_directory = GitDataSource._resolve_common_directory(git_directory)
+        if (
+            core_settings := GitDataSource._read_core_settings(common_directory)
+        ) is None or GitDataSource.__may_convert_files(common_directory, core_settings):
+            return self.__get_dirty_from_git()
+
+        index_mtime_ns = os.stat(index_path).st_mtime_ns
+        if (
+            index_entries := GitIndexReader.read(
+                index_path, GitDataSource._get_object_name_length(common_directory)
+            )
+        ) is None or any(
+            os.path.basename(i) == b".gitattributes" for i in index_entries.paths
+        ):
+            return self.__get_dirty_from_git()
+        return (
+            "*"
+            if index_entries.find_modified_paths(
+                root_directory,
+                index_mtime_ns,
+                trust_executable_bit=os.name != "nt"
+                and core_settings.get("filemode", "true").lower()
+                not in GitDataSource.__FALSE_CONFIG_VALUES,
+            )
+            else ""
+        )
+
+    @staticmethod
+    def __may_convert_files(
+        common_directory: str, core_settings: Dict[str, str]
+    ) -> bool:
+        """Determine if git may convert the files in the working tree before comparing
+        them, either because of the line ending settings or of attributes that are
+        not kept in the working tree."""
+        return (
+            core_settings.get("autocrlf", "false").lower()
+            not in GitDataSource.__FALSE_CONFIG_VALUES
+            or "attributesfile" in core_settings
+            or os.path.exists(os.path.join(common_directory, "info", "attributes"))
+            or os.path.exists(
+                os.path.join(
+                    os.environ.get("XDG_CONFIG_HOME")
+                    or os.path.expanduser(os.path.join("~", ".config")),
+                    "git",
+                    "attributes",
+                )
+            )
+        )
+
+    def __get_dirty_from_git(self) -> str:
+        subcommand_response = self._execute_subprocess(
+            ["git", "diff", "--quiet", "--no-ext-diff"], check_for_success=False
+        )
+        return "*" if subcommand_response.returncode == 1 else ""
+
+    @property_resolver("staged")
+    def __get_staged_count(self) -> str:
+        """Get the number of files with changes staged for the next commit."""
+        return self.__get_status_count("staged")
+
+    @property_resolver("unstaged")
+    def __get_unstaged_count(self) -> str:
+        """Get the number of files with changes that are not staged."""
+        return self.__get_status_count("unstaged")
+
+    @property_resolver("untracked")
+    def __get_untracked_count(self) -> str:
+        """Get the number of files that git is not tracking and not ignoring."""
+        return self.__get_status_count("untracked")
+
+    @property_resolver("conflicts")
+    def __get_conflicts_count(self) -> str:
+        """Get the number of files with unresolved merge conflicts."""
+        return self.__get_status_count("conflicts")
+
+    @property_resolver("ahead")
+    def __get_ahead_count(self) -> str:
+        """Get the number of commits that the branch is ahead of its upstream by."""
+        return self.__get_status_count("ahead")
+
+    @property_resolver("behind")
+    def __get_behind_count(self) -> str:
+        """Get the number of commits that the branch is behind its upstream by."""
+        return self.__get_status_count("behind")
+
+    def __get_status_count(self, property_name: str) -> str:
+        """Get one of the counts from the status of the working tree.  Counts of zero
+        are empty, so that items can hide them with the not empty display modifier."""
+        with self.__status_lock:
+            if self.__status_counts is None:
+                self.__status_counts = self.__collect_status_counts()
+            status_count = self.__status_counts.get(property_name, 0)
+        return str(status_count) if status_count else ""
+
+    def __collect_status_counts(self) -> Dict[str, int]:
+        """Run "git status" once, counting each kind of change as its output is read.
+        Git is asked not to take any optional locks, so it never writes to the index
+        while it runs and can be stopped at any time.  If only the ahead and behind
+        counts of the branch are needed, untracked files and submodules are not looked
+        at, and git is stopped once the headers that hold the counts have been read.
+        """
+        repository_location = GitDataSource._find_repository(os.getcwd())
+        if repository_location is not None and not repository_location[0]:
+            return {}
+
+        status_arguments = ["git", "status", "--porcelain=v2", "--branch"]
+        branch_only = (
+            self.__status_property_names <= GitDataSource.__STATUS_HEADER_PROPERTY_NAMES
+        )
+        if not self.__show_untracked or "untracked" not in self.__status_property_names:
+            status_arguments.append("--untracked-files=no")
+        if self.__ignore_submodules or branch_only:
+            status_arguments.append("--ignore-submodules=all")
+        status_counts = dict.fromkeys(GitDataSource.STATUS_PROPERTY_NAMES, 0)
+
+        def count_status_line(status_line: str) -> bool:
+            if status_line.startswith("# branch.ab "):
+                ahead_text, behind_text = status_line[12:].split()
+                status_counts["ahead"] = int(ahead_text[1:])
+                status_counts["behind"] = int(behind_text[1:])
+                return not branch_only
+            if status_line.startswith("#"):
+                pass
+            elif branch_only:
+                return False
+            elif status_line[:1] in ("1", "2"):
+                status_counts["staged"] += status_line[2] != "."
+                status_counts["unstaged"] += status_line[3] != "."
+            elif status_line[:1] == "u":
+                status_counts["conflicts"] += 1
+            elif status_line[:1] == "?":
+                status_counts["untracked"] += 1
+            return True
+
+        if (
+            self._stream_subprocess(
+                status_arguments,
+                count_status_line,
+                environment=dict(os.environ, GIT_OPTIONAL_LOCKS="0"),
+            )
+            != 0
+        ):
+            return {}
+        return status_counts
+
     # remote project name
     # git config --local remote.origin.url|sed -n 's#.*/\([^.]*\)\.git#\1#p'
     # git remote -v | head -n1 | awk '{print $2}' | sed -e 's,.*:\(.*/\)\?,,' -e 's/\.git$//'
@@ -0,0 +1,304 @@
+"""Module to provide for reading the index of a git repository, to find the tracked
+files that have changed, without running git.
+"""
+
+import array
+import hashlib
+import logging
+import mmap
+import os
+import stat
+import struct
+from typing import List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+class GitIndexEntries:
+    """
+    Entries of a git index.  Instead of an object for each entry, the fields of the
+    entries are kept in arrays, so that large indexes stay compact.
+    """
+
+    # Flags kept for each entry, combining those from the entry and its extended flags.
+    ASSUME_VALID_FLAG = 0x8000
+    STAGE_MASK = 0x3000
+    SKIP_WORKTREE_FLAG = 0x40000000
+    INTENT_TO_ADD_FLAG = 0x20000000
+
+    def __init__(self, object_name_length: int) -> None:
+        self.object_name_length = object_name_length
+        self.paths: List[bytes] = []
+        self.modes = array.array("L")
+        self.sizes = array.array("L")
+        self.inodes = array.array("L")
+        self.flags = array.array("L")
+        self.ctimes = array.array("q")
+        self.mtimes = array.array("q")
+        self.object_names = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def find_modified_paths(
+        self,
+        root_directory: str,
+        index_mtime_ns: int,
+        stop_at_first: bool = True,
+        trust_executable_bit: bool = True,
+    ) -> List[bytes]:
+        """Find the paths of the entries whose files in the working tree differ from
+        the index, in the same way as "git diff" does.  Files whose timestamps do not
+        match, or that were changed too close to when the index was written to be
+        sure, have their contents compared.  Unmerged entries are always modified.
+        """
+        modified_paths: List[bytes] = []
+        for entry_index, entry_path in enumerate(self.paths):
+            if self.__is_entry_modified(
+                entry_index,
+                os.path.join(root_directory, os.fsdecode(entry_path)),
+                index_mtime_ns,
+                trust_executable_bit,
+            ):
+                modified_paths.append(entry_path)
+                if stop_at_first:
+                    break
+        return modified_paths
+
+    def __is_entry_modified(
+        self,
+        entry_index: int,
+        file_path: str,
+        index_mtime_ns: int,
+        trust_executable_bit: bool,
+    ) -> bool:
+        entry_flags = self.flags[entry_index]
+        if entry_flags & GitIndexEntries.STAGE_MASK:
+            return True
+        if entry_flags & (
+            GitIndexEntries.ASSUME_VALID_FLAG | GitIndexEntries.SKIP_WORKTREE_FLAG
+        ):
+            return False
+        if entry_flags & GitIndexEntries.INTENT_TO_ADD_FLAG:
+            return True
+        entry_mode = self.modes[entry_index]
+        if stat.S_IFMT(entry_mode) == stat.S_IFMT(0o160000):
+            # Submodules are left to git.
+            return False
+
+        try:
+            file_status = os.lstat(file_path)
+        except OSError:
+            return True
+        if stat.S_IFMT(file_status.st_mode) != stat.S_IFMT(entry_mode) or (
+            trust_executable_bit
+            and stat.S_ISREG(entry_mode)
+            and (file_status.st_mode ^ entry_mode) & stat.S_IXUSR
+        ):
+            return True
+        if file_status.st_size & 0xFFFFFFFF != self.sizes[entry_index]:
+            return True
+
+        entry_mtime = self.mtimes[entry_index]
+        if (
+            GitIndexEntries.__truncate_time(file_status.st_mtime_ns) == entry_mtime
+            and GitIndexEntries.__truncate_time(file_status.st_ctime_ns)
+            == self.ctimes[entry_index]
+            and file_status.st_ino & 0xFFFFFFFF == self.inodes[entry_index]
+            and entry_mtime < GitIndexEntries.__truncate_time(index_mtime_ns)
+        ):
+            return False
+        return self.__compute_object_name(
+            file_path, file_status.st_mode
+        ) != self.__get_object_name(entry_index)
+
+    @staticmethod
+    def __truncate_time(time_ns: int) -> int:
+        """Truncate the time to the 32 bits of seconds that the index keeps."""
+        return ((time_ns // 1_000_000_000) & 0xFFFFFFFF) * 1_000_000_000 + (
+            time_ns % 1_000_000_000
+        )
+
+    def __get_object_name(self, entry_index: int) -> bytes:
+        object_name_offset = entry_index * self.object_name_length
+        return bytes(
+            self.object_names[
+                object_name_offset : object_name_offset + self.object_name_length
+            ]
+        )
+
+    def __compute_object_name(self, file_path: str, file_mode: int) -> bytes:
+        try:
+            if stat.S_ISLNK(file_mode):
+                file_contents = os.fsencode(os.readlink(file_path))
+            else:
+                with open(file_path, "rb") as infile:
+                    file_contents = infile.read()
+        except OSError:
+            return b""
+        object_hash = (
+            hashlib.sha256() if self.object_name_length == 32 else hashlib.sha1()
+        )
+        object_hash.update(b"blob %d\0" % len(file_contents))
+        object_hash.update(file_contents)
+        return object_hash.digest()
+
+
+class GitIndexReader:
+    """
+    Class to provide for reading the index of a git repository.
+
+    Versions 2 to 4 of the index are supported, including the compressed paths of
+    version 4.  Optional extensions, such as the cache tree, are skipped, but an
+    index with a required extension, such as a split or sparse index, cannot be read.
+    """
+
+    SUPPORTED_VERSIONS = [2, 3, 4]
+
+    __HEADER_FORMAT = struct.Struct(">4sLL")
+    __ENTRY_FORMAT = struct.Struct(">10L")
+    __FLAGS_FORMAT = struct.Struct(">H")
+    __EXTENSION_FORMAT = struct.Struct(">4sL")
+
+    __EXTENDED_FLAG = 0x4000
+    __NAME_LENGTH_MASK = 0x0FFF
+
+    @staticmethod
+    def read(
+        index_path: str, object_name_length: int = 20
+    ) -> Optional[GitIndexEntries]:
+        """Read the entries of the index, returning None if it cannot be read."""
+        try:
+            with open(index_path, "rb") as infile:
+                if os.fstat(infile.fileno()).st_size == 0:
+                    LOGGER.debug("Index '%s' is empty.", index_path)
+                    return None
+                with mmap.mmap(
+                    infile.fileno(), 0, access=mmap.ACCESS_READ
+                ) as index_data:
+                    return GitIndexReader.__parse(index_data, object_name_length)
+        except (OSError, ValueError, IndexError, struct.error) as this_exception:
+            LOGGER.debug("Index '%s' not read: %s", index_path, this_exception)
+            return None
+
+    @staticmethod
+    def __parse(
+        index_data: mmap.mmap, object_name_length: int
+    ) -> Optional[GitIndexEntries]:
+        signature, index_version, entry_count = (
+            GitIndexReader.__HEADER_FORMAT.unpack_from(index_data, 0)
+        )
+        if (
+            signature != b"DIRC"
+            or index_version not in GitIndexReader.SUPPORTED_VERSIONS
+        ):
+            LOGGER.debug("Index version %d is not supported.", index_version)
+            return None
+
+        index_entries = GitIndexEntries(object_name_length)
+        data_offset = GitIndexReader.__HEADER_FORMAT.size
+        previous_path = b""
+        for _ in range(entry_count):
+            (
+                ctime_seconds,
+                ctime_nanoseconds,
+                mtime_seconds,
+                mtime_nanoseconds,
+                _,
+                inode,
+                mode,
+                _,
+                _,
+                size,
+            ) = GitIndexReader.__ENTRY_FORMAT.unpack_from(index_data, data_offset)
+            path_offset = data_offset + GitIndexReader.__ENTRY_FORMAT.size
+            index_entries.object_names += index_data[
+                path_offset : path_offset + object_name_length
+            ]
+            path_offset += object_name_length
+            (entry_flags,) = GitIndexReader.__FLAGS_FORMAT.unpack_from(
+                index_data, path_offset
+            )
+            path_offset += GitIndexReader.__FLAGS_FORMAT.size
+            if entry_flags & GitIndexReader.__EXTENDED_FLAG:
+                if index_version < 3:
+                    return None
+                (extended_flags,) = GitIndexReader.__FLAGS_FORMAT.unpack_from(
+                    index_data, path_offset
+                )
+                entry_flags |= extended_flags << 16
+                path_offset += GitIndexReader.__FLAGS_FORMAT.size
+
+            if index_version == 4:
+                strip_length, path_offset = GitIndexReader.__read_varint(
+                    index_data, path_offset
+                )
+                path_end = index_data.find(b"\0", path_offset)
+                entry_path = (
+                    previous_path[: len(previous_path) - strip_length]
+                    + index_data[path_offset:path_end]
+                )
+                data_offset = path_end + 1
+            else:
+                path_end = (
+                    path_offset + (entry_flags & GitIndexReader.__NAME_LENGTH_MASK)
+                    if entry_flags & GitIndexReader.__NAME_LENGTH_MASK
+                    != GitIndexReader.__NAME_LENGTH_MASK
+                    else index_data.find(b"\0", path_offset)
+                )
+                entry_path = index_data[path_offset:path_end]
+                data_offset += (path_end - data_offset + 8) & ~7
+            if path_end < 0:
+                return None
+            previous_path = entry_path
+
+            index_entries.paths.append(entry_path)
+            index_entries.modes.append(mode)
+            index_entries.sizes.append(size)
+            index_entries.inodes.append(inode)
+            index_entries.flags.append(entry_flags)
+            index_entries.ctimes.append(
+                ctime_seconds * 1_000_000_000 + ctime_nanoseconds
+            )
+            index_entries.mtimes.append(
+                mtime_seconds * 1_000_000_000 + mtime_nanoseconds
+            )
+
+        if not GitIndexReader.__check_extensions(
+            index_data, data_offset, object_name_length
+        ):
+            return None
+        return index_entries
+
+    @staticmethod
+    def __check_extensions(
+        index_data: mmap.mmap, data_offset: int, object_name_length: int
+    ) -> bool:
+        """Make sure that there are no required extensions, which are the ones whose
+        signatures do not start with an uppercase letter."""
+        extensions_end = len(index_data) - object_name_length
+        while data_offset < extensions_end:
+            extension_signature, extension_size = (
+                GitIndexReader.__EXTENSION_FORMAT.unpack_from(index_data, data_offset)
+            )
+            if not b"A"[0] <= extension_signature[0] <= b"Z"[0]:
+                LOGGER.debug(
+                    "Index extension '%s' is required and not supported.",
+                    extension_signature.decode("ascii", "replace"),
+                )
+                return False
+            data_offset += GitIndexReader.__EXTENSION_FORMAT.size + extension_size
+        return True
+
+    @staticmethod
+    def __read_varint(index_data: mmap.mmap, data_offset: int) -> Tuple[int, int]:
+        """Read the variable length integer that git uses for the number of bytes to
+        remove from the end of the previous path."""
+        next_byte = index_data[data_offset]
+        data_offset += 1
+        varint_value = next_byte & 0x7F
+        while next_byte & 0x80:
+            next_byte = index_data[data_offset]
+            data_offset += 1
+            varint_value = ((varint_value + 1) << 7) + (next_byte & 0x7F)
+        return varint_value, data_offset
@@ -0,0 +1,311 @@
+"""Module to provide for reading commits from the object database of a git repository
+without running git.
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GitCommit:
+    """Information about a commit that is shown in the prompt."""
+
+    object_name: str
+    "Full name of the commit, in hexadecimal."
+    committer_time: int
+    "Time that the commit was committed at, in seconds since the epoch."
+    subject: str
+    "Subject of the commit message."
+
+    @staticmethod
+    def from_object_data(object_name: str, object_data: bytes) -> "GitCommit":
+        """Create the commit from the contents of its object."""
+        header_data, _, message_data = object_data.partition(b"\n\n")
+        committer_time = 0
+        for next_header in header_data.split(b"\n"):
+            if next_header.startswith(b"committer "):
+                committer_time = int(next_header.rsplit(b" ", 2)[1])
+        subject_lines = message_data.split(b"\n\n", 1)[0].splitlines()
+        return GitCommit(
+            object_name,
+            committer_time,
+            b" ".join(i.strip() for i in subject_lines).decode("utf-8", "replace"),
+        )
+
+
+class GitObjectReader:
+    """
+    Class to provide for reading objects from the object database of a repository.
+
+    Objects are read from their loose files, or found in the pack files by searching
+    the sorted names in each pack index, and then inflated from the pack file,
+    applying any deltas that they are stored as.  As the contents of a commit never
+    change, the commits that were read most recently are kept for as long as the
+    process runs.
+    """
+
+    MAXIMUM_CACHED_COMMITS = 32
+
+    __LOOSE_OBJECTS_DIRECTORY_NAME = "objects"
+    __PACK_DIRECTORY_NAME = "pack"
+
+    __PACK_INDEX_SIGNATURE = b"\377tOc"
+    __PACK_INDEX_FANOUT_OFFSET = 8
+    __PACK_INDEX_FANOUT_SIZE = 256 * 4
+    __LARGE_OFFSET_FLAG = 0x80000000
+
+    __OBJECT_TYPES = {1: b"commit", 2: b"tree", 3: b"blob", 4: b"tag"}
+    __OFFSET_DELTA_TYPE = 6
+    __REFERENCE_DELTA_TYPE = 7
+    __MAXIMUM_DELTA_DEPTH = 64
+
+    __INFLATE_CHUNK_SIZE = 8192
+
+    __commit_cache: "OrderedDict[str, GitCommit]" = OrderedDict()
+    __commit_cache_lock = threading.Lock()
+
+    def __init__(self, common_directory: str, object_name_length: int = 20) -> None:
+        self.__objects_directory = os.path.join(
+            common_directory, GitObjectReader.__LOOSE_OBJECTS_DIRECTORY_NAME
+        )
+        self.__object_name_length = object_name_length
+
+    def read_commit(self, object_name: str) -> Optional[GitCommit]:
+        """Read the commit with the given name, returning None if it cannot be read."""
+        with GitObjectReader.__commit_cache_lock:
+            if cached_commit := GitObjectReader.__commit_cache.get(object_name):
+                GitObjectReader.__commit_cache.move_to_end(object_name)
+                return cached_commit
+        try:
+            read_object = self.read_object(object_name)
+        except (
+            OSError,
+            ValueError,
+            IndexError,
+            struct.error,
+            zlib.error,
+        ) as this_exception:
+            LOGGER.debug("Object '%s' not read: %s", object_name, this_exception)
+            return None
+        if read_object is None or read_object[0] != b"commit":
+            return None
+        new_commit = GitCommit.from_object_data(object_name, read_object[1])
+        with GitObjectReader.__commit_cache_lock:
+            GitObjectReader.__commit_cache[object_name] = new_commit
+            while (
+                len(GitObjectReader.__commit_cache)
+                > GitObjectReader.MAXIMUM_CACHED_COMMITS
+            ):
+                GitObjectReader.__commit_cache.popitem(last=False)
+        return new_commit
+
+    def read_object(self, object_name: str) -> Optional[Tuple[bytes, bytes]]:
+        """Read the type and contents of the object with the given name, returning None
+        if it is neither a loose object nor in any of the packs."""
+        loose_object_path = os.path.join(
+            self.__objects_directory, object_name[:2], object_name[2:]
+        )
+        try:
+            with open(loose_object_path, "rb") as infile:
+                loose_object_data = zlib.decompress(infile.read())
+        except FileNotFoundError:
+            return self.__read_packed_object(bytes.fromhex(object_name))
+        object_header, _, object_data = loose_object_data.partition(b"\0")
+        return object_header.split(b" ", 1)[0], object_data
+
+    def __read_packed_object(
+        self, binary_object_name: bytes
+    ) -> Optional[Tuple[bytes, bytes]]:
+        pack_directory = os.path.join(
+            self.__objects_directory, GitObjectReader.__PACK_DIRECTORY_NAME
+        )
+        try:
+            pack_file_names = os.listdir(pack_directory)
+        except FileNotFoundError:
+            return None
+        for next_file_name in pack_file_names:
+            if not next_file_name.endswith(".idx"):
+                continue
+            index_path = os.path.join(pack_directory, next_file_name)
+            if (
+                pack_offset := self.__find_pack_offset(index_path, binary_object_name)
+            ) is not None:
+                with open(index_path[:-4] + ".pack", "rb") as infile, mmap.mmap(
+                    infile.fileno(), 0, access=mmap.ACCESS_READ
+                ) as pack_data:
+                    return self.__read_pack_entry(pack_data, pack_offset, index_path, 0)
+        return None
+
+    def __find_pack_offset(
+        self, index_path: str, binary_object_name: bytes
+    ) -> Optional[int]:
+        """Find the offset of the object in the pack file, by searching the names in
+        the pack index that start with the same byte."""
+        with open(index_path, "rb") as infile, mmap.mmap(
+            infile.fileno(), 0, access=mmap.ACCESS_READ
+        ) as index_data:
+            if index_data[:8] != GitObjectReader.__PACK_INDEX_SIGNATURE + struct.pack(
+                ">L", 2
+            ):
+                LOGGER.debug("Pack index '%s' is not version 2.", index_path)
+                return None
+            fanout_offset = GitObjectReader.__PACK_INDEX_FANOUT_OFFSET
+            first_byte = binary_object_name[0]
+            lower_bound = (
+                struct.unpack_from(
+                    ">L", index_data, fanout_offset + (first_byte - 1) * 4
+                )[0]
+                if first_byte
+                else 0
+            )
+            upper_bound = struct.unpack_from(
+                ">L", index_data, fanout_offset + first_byte * 4
+            )[0]
+            object_count = struct.unpack_from(
+                ">L", index_data, fanout_offset + 255 * 4
+            )[0]
+
+            names_offset = fanout_offset + GitObjectReader.__PACK_INDEX_FANOUT_SIZE
+            name_length = self.__object_name_length
+
+            def get_name_at(object_index: int) -> bytes:
+                name_offset = names_offset + object_index * name_length
+                return index_data[name_offset : name_offset + name_length]
+
+            object_index = bisect.bisect_left(
+                range(object_count),
+                binary_object_name,
+                lower_bound,
+                upper_bound,
+                key=get_name_at,
+            )
+            if (
+                object_index == upper_bound
+                or get_name_at(object_index) != binary_object_name
+            ):
+                return None
+
+            offsets_offset = names_offset + object_count * (name_length + 4)
+            (pack_offset,) = struct.unpack_from(
+                ">L", index_data, offsets_offset + object_index * 4
+            )
+            if pack_offset & GitObjectReader.__LARGE_OFFSET_FLAG:
+                large_offset_index = pack_offset & ~GitObjectReader.__LARGE_OFFSET_FLAG
+                (pack_offset,) = struct.unpack_from(
+                    ">Q",
+                    index_data,
+                    offsets_offset + object_count * 4 + large_offset_index * 8,
+                )
+            return int(pack_offset)
+
+    def __read_pack_entry(
+        self, pack_data: mmap.mmap, pack_offset: int, index_path: str, delta_depth: int
+    ) -> Optional[Tuple[bytes, bytes]]:
+        if delta_depth > GitObjectReader.__MAXIMUM_DELTA_DEPTH:
+            return None
+        data_offset = pack_offset
+        next_byte = pack_data[data_offset]
+        data_offset += 1
+        entry_type = (next_byte >> 4) & 0x07
+        # The size of the entry follows its type, and is not needed to inflate it.
+        while next_byte & 0x80:
+            next_byte = pack_data[data_offset]
+            data_offset += 1
+
+        if object_type := GitObjectReader.__OBJECT_TYPES.get(entry_type):
+            return object_type, GitObjectReader.__inflate(pack_data, data_offset)
+
+        if entry_type == GitObjectReader.__OFFSET_DELTA_TYPE:
+            next_byte = pack_data[data_offset]
+            data_offset += 1
+            base_distance = next_byte & 0x7F
+            while next_byte & 0x80:
+                next_byte = pack_data[data_offset]
+                data_offset += 1
+                base_distance = ((base_distance + 1) << 7) + (next_byte & 0x7F)
+            base_object = self.__read_pack_entry(
+                pack_data, pack_offset - base_distance, index_path, delta_depth + 1
+            )
+        elif entry_type == GitObjectReader.__REFERENCE_DELTA_TYPE:
+            base_name = pack_data[data_offset : data_offset + self.__object_name_length]
+            data_offset += self.__object_name_length
+            base_offset = self.__find_pack_offset(index_path, base_name)
+            base_object = (
+                self.__read_pack_entry(
+                    pack_data, base_offset, index_path, delta_depth + 1
+                )
+                if base_offset is not None
+                else self.read_object(base_name.hex())
+            )
+        else:
+            return None
+        if base_object is None:
+            return None
+        return base_object[0], GitObjectReader.__apply_delta(
+            base_object[1], GitObjectReader.__inflate(pack_data, data_offset)
+        )
+
+    @staticmethod
+    def __inflate(pack_data: mmap.mmap, data_offset: int) -> bytes:
+        """Inflate the compressed data that starts at the offset, reading only as much
+        of the pack file as is needed."""
+        decompressor = zlib.decompressobj()
+        inflated_chunks: List[bytes] = []
+        while not decompressor.eof:
+            compressed_chunk = pack_data[
+                data_offset : data_offset + GitObjectReader.__INFLATE_CHUNK_SIZE
+            ]
+            if not compressed_chunk:
+                raise ValueError("Pack entry ends before its data is complete.")
+            inflated_chunks.append(decompressor.decompress(compressed_chunk))
+            data_offset += len(compressed_chunk)
+        return b"".join(inflated_chunks)
+
+    @staticmethod
+    def __apply_delta(base_data: bytes, delta_data: bytes) -> bytes:
+        """Build an object from its base and a delta that copies ranges of the base
+        or inserts new data."""
+        data_offset = 0
+        for _ in range(2):
+            # The sizes of the base and of the result are not needed.
+            while delta_data[data_offset] & 0x80:
+                data_offset += 1
+            data_offset += 1
+
+        result_chunks: List[bytes] = []
+        while data_offset < len(delta_data):
+            instruction = delta_data[data_offset]
+            data_offset += 1
+            if instruction & 0x80:
+                copy_offset = copy_size = 0
+                for bit_index in range(7):
+                    if instruction & (1 << bit_index):
+                        value_shift = 8 * (
+                            bit_index if bit_index < 4 else bit_index - 4
+                        )
+                        if bit_index < 4:
+                            copy_offset |= delta_data[data_offset] << value_shift
+                        else:
+                            copy_size |= delta_data[data_offset] << value_shift
+                        data_offset += 1
+                result_chunks.append(
+                    base_data[copy_offset : copy_offset + (copy_size or 0x10000)]
+                )
+            elif instruction:
+                result_chunks.append(
+                    delta_data[data_offset : data_offset + instruction]
+                )
+                data_offset += instruction
+            else:
+                raise ValueError("Delta has an instruction that is not supported.")
+        return b"".join(result_chunks)
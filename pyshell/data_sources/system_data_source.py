@@ -3,18 +3,44 @@
 
 import datetime
 import os
-import socket
+from typing import Optional
 
-from pyshell.data_sources.base_data_source import BaseDataSource, property_resolver
+from pyshell.data_sources.base_data_source import (
+    BaseDataSource,
+    PropertyMemoScope,
+    property_resolver,
+)
 from pyshell.file_path_helpers import FilePathHelpers
 
 
 class SystemDataSource(BaseDataSource):
     """Data source for simple system related data sources."""
 
+    __SHELL_TRANSLATIONS = {
+        "user_name": '@VARIABLE@="${USER-${USERNAME-unknown}}"',
+        "host_name": '@VARIABLE@="${HOSTNAME:-${HOST:-}}"',
+        "cwd": '@VARIABLE@="${PWD##*/}"',
+        "full_cwd": '@VARIABLE@="$PWD"',
+    }
+    __VOLATILE_PROPERTIES = ["date", "time_24", "time_12"]
+
     def __init__(self) -> None:
         super().__init__(name="system")
 
+    def get_shell_translation(
+        self, property_name: str, variable_name: str
+    ) -> Optional[str]:
+        """Get shell commands that assign the value of the property to the named shell variable."""
+        if shell_translation := SystemDataSource.__SHELL_TRANSLATIONS.get(
+            property_name
+        ):
+            return shell_translation.replace("@VARIABLE@", variable_name)
+        return super().get_shell_translation(property_name, variable_name)
+
+    def is_volatile_property(self, property_name: str) -> bool:
+        """The date and time change without any change to the current directory."""
+        return property_name in SystemDataSource.__VOLATILE_PROPERTIES
+
     def get_now(self) -> datetime.datetime:
         """Done to allow monkeypatching of datetime.now.  Must be public for tests to access it."""
         return datetime.datetime.now()
@@ -24,9 +50,14 @@ class SystemDataSource(BaseDataSource):
         # https://stackoverflow.com/questions/842059/is-there-a-portable-way-to-get-the-current-username-in-python
         return os.environ.get("USER", os.environ.get("USERNAME", "unknown"))
 
-    @property_resolver("host_name")  # \h
+    @property_resolver("host_name", memo_scope=PropertyMemoScope.BOOT)  # \h
     def __get_host_name(self) -> str:
         # https://stackoverflow.com/questions/4271740/how-can-i-use-python-to-get-the-system-hostname
+        # pylint: disable=import-outside-toplevel
+        import socket
+
+        # pylint: enable=import-outside-toplevel
+
         return socket.gethostname()
 
     @property_resolver("cwd")  # \W
@@ -3,7 +3,6 @@
 
 import logging
 import os
-import subprocess  # nosec blacklist
 from dataclasses import dataclass
 from typing import List
 
@@ -43,6 +42,44 @@ class FilePathHelpers:
 
         return absolute_path
 
+    @staticmethod
+    def get_cache_directory() -> str:
+        """Get the directory where the application may keep cached information.
+
+        This follows the XDG base directory specification where possible, with a
+        fallback to the local application data directory on Windows.
+        """
+        if cache_home := os.environ.get("XDG_CACHE_HOME"):
+            return os.path.join(cache_home, "pyshell")
+        if os.name.lower() == "nt" and (local_data := os.environ.get("LOCALAPPDATA")):
+            return os.path.join(local_data, "pyshell", "cache")
+        return os.path.join(os.path.expanduser("~"), ".cache", "pyshell")
+
+    @staticmethod
+    def write_file_atomically(file_path: str, file_contents: str) -> None:
+        """Write the contents to the file so that concurrent readers either see the
+        previous contents or the new contents, never a partially written file.  Each
+        write uses its own temporary file, so that writers in other threads of the
+        same process cannot publish each other's partial contents."""
+
+        # pylint: disable=import-outside-toplevel
+        import tempfile
+
+        # pylint: enable=import-outside-toplevel
+
+        file_directory = os.path.dirname(file_path)
+        os.makedirs(file_directory, exist_ok=True)
+        temporary_descriptor, temporary_path = tempfile.mkstemp(
+            prefix=f"{os.path.basename(file_path)}.", suffix=".tmp", dir=file_directory
+        )
+        try:
+            with os.fdopen(temporary_descriptor, "wt", encoding="utf-8") as outfile:
+                outfile.write(file_contents)
+            os.replace(temporary_path, file_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
     @staticmethod
     def __change_windows_path_to_posix(absolute_path: str) -> str:
         if FilePathHelpers.__MOUNT_RETURN_CODE < 0:
@@ -82,6 +119,11 @@ class FilePathHelpers:
         # C:/Users/brmay/AppData/Local/Temp         -        -         -    - /tmp
         # C:                                        -        -         -    - /c
 
+        # pylint: disable=import-outside-toplevel
+        import subprocess  # nosec blacklist
+
+        # pylint: enable=import-outside-toplevel
+
         cp = subprocess.run(  # nosec start_process_with_partial_path
             ["df", "-a"],
             text=True,
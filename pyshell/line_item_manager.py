@@ -2,13 +2,13 @@
 """
 
 from collections import OrderedDict
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from application_properties import ApplicationProperties
 
 from pyshell.data_sources.base_data_source import PropertyPath
 from pyshell.line_items.line_item import LineItem
-from pyshell.line_items.property_item import PropertyItem
+from pyshell.line_items.property_item import ItemRefreshMode, PropertyItem
 from pyshell.line_items.text_item import TextItem
 
 
@@ -17,6 +17,7 @@ class LineItemManager:
 
     def __init__(self) -> None:
         self.__line_items: List[LineItem] = []
+        self.__required_properties: Optional[List[PropertyPath]] = None
         self.__available_line_items = [TextItem, PropertyItem]
 
         self.__line_item_name_to_type_map = {}
@@ -31,16 +32,66 @@ class LineItemManager:
     def register_item(self, new_line_item: LineItem) -> None:
         """Register a new line item for the display."""
         self.__line_items.append(new_line_item)
+        self.__required_properties = None
+
+    @property
+    def line_items(self) -> List[LineItem]:
+        """Line items that have been registered, in display order."""
+        return self.__line_items[:]
 
     def get_properties_required_for_items(self) -> List[PropertyPath]:
         """Get any properties that are required by the items being managed."""
-        required_properties: List[PropertyPath] = []
-        required_properties.extend(
+        if self.__required_properties is None:
+            self.__required_properties = [
+                PropertyPath(
+                    next_line_item.data_source_name, next_line_item.data_item_name
+                )
+                for next_line_item in self.__line_items
+                if isinstance(next_line_item, PropertyItem)
+            ]
+        return self.__required_properties[:]
+
+    def get_property_deadlines(self) -> Dict[str, int]:
+        """Get the deadline, in milliseconds, that the items place on each property.
+        If more than one item shows the same property, the longest deadline is used.
+        """
+        property_deadlines: Dict[str, int] = {}
+        for next_line_item in self.__line_items:
+            if isinstance(next_line_item, PropertyItem) and next_line_item.deadline_ms:
+                full_property_name = PropertyPath(
+                    next_line_item.data_source_name, next_line_item.data_item_name
+                ).full_name
+                property_deadlines[full_property_name] = max(
+                    property_deadlines.get(full_property_name, 0),
+                    next_line_item.deadline_ms,
+                )
+        return property_deadlines
+
+    def get_properties_refreshed_in_background(self) -> List[PropertyPath]:
+        """Get the properties shown by items that are refreshed in the background."""
+        return [
             PropertyPath(next_line_item.data_source_name, next_line_item.data_item_name)
             for next_line_item in self.__line_items
             if isinstance(next_line_item, PropertyItem)
-        )
-        return required_properties
+            and next_line_item.refresh == ItemRefreshMode.BACKGROUND
+        ]
+
+    def from_plan(
+        self,
+        line_item_dicts: List[Dict[str, Any]],
+        required_properties: List[PropertyPath],
+    ) -> None:
+        """Load a list of already validated line items from a cached prompt plan."""
+        for next_line_item_dict in line_item_dicts:
+            line_item_type = self.__line_item_name_to_type_map[
+                next_line_item_dict["type"]
+            ]
+            self.register_item(
+                getattr(line_item_type, "from_plan_dict")(  # noqa: B009
+                    next_line_item_dict
+                )
+            )
+        self.__required_properties = required_properties[:]
 
     def from_properties(self, properties: ApplicationProperties) -> None:
         """Load a list of line items from the "items" field in the configuration."""
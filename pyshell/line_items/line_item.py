@@ -2,8 +2,9 @@
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, fields
+from enum import Enum
+from typing import Any, Dict, List, Optional
 
 from application_properties import ApplicationProperties
 
@@ -30,6 +31,62 @@ class LineItem(ABC):
         this item.
         """
 
+    def generate_shell_commands(
+        self, property_variables: Dict[str, str], output_variable: str
+    ) -> Optional[str]:
+        """Generate shell commands that append the text for this item to the named
+        shell variable, given the names of the shell variables holding the values
+        of the properties.  If the item cannot be translated, None is returned.
+        """
+        _ = (property_variables, output_variable)
+        return None
+
+    @staticmethod
+    def _quote_for_shell(text_to_quote: str) -> str:
+        """Quote the text so that a shell sees it as a single word, on a single line."""
+        if text_to_quote.isprintable():
+            # pylint: disable=import-outside-toplevel
+            import shlex
+
+            # pylint: enable=import-outside-toplevel
+
+            return shlex.quote(text_to_quote)
+        quoted_characters: List[str] = []
+        for next_character in text_to_quote:
+            if next_character in ("\\", "'"):
+                quoted_characters.append(f"\\{next_character}")
+            elif next_character == "\n":
+                quoted_characters.append("\\n")
+            elif next_character.isprintable():
+                quoted_characters.append(next_character)
+            elif ord(next_character) < 0x100:
+                quoted_characters.append(f"\\x{ord(next_character):02x}")
+            else:
+                quoted_characters.append(f"\\u{ord(next_character):04x}")
+        return "$'" + "".join(quoted_characters) + "'"
+
+    def to_plan_dict(self) -> Dict[str, Any]:
+        """Convert this already validated item into a dictionary that can be cached."""
+        plan_dict: Dict[str, Any] = {"type": self.get_name()}
+        for next_field in fields(self):
+            field_value = getattr(self, next_field.name)
+            plan_dict[next_field.name] = (
+                field_value.name if isinstance(field_value, Enum) else field_value
+            )
+        return plan_dict
+
+    @classmethod
+    def from_plan_dict(cls, plan_dict: Dict[str, Any]) -> "LineItem":
+        """Create an instance of this class from a dictionary created by to_plan_dict.
+        As the item was validated before it was cached, no validation is performed."""
+        field_values: Dict[str, Any] = {}
+        for next_field in fields(cls):
+            field_value = plan_dict[next_field.name]
+            if isinstance(next_field.type, type) and issubclass(next_field.type, Enum):
+                field_value = next_field.type[field_value]
+            field_values[next_field.name] = field_value
+        return cls(**field_values)
+
     @staticmethod
     def _get_component(
         properties: ApplicationProperties,
@@ -53,6 +110,25 @@ class LineItem(ABC):
             del all_properties_under_prefix[property_name_index]
         return dict_value
 
+    @staticmethod
+    def _get_integer_component(
+        properties: ApplicationProperties,
+        all_properties_under_prefix: List[str],
+        property_prefix: str,
+        property_name: str,
+    ) -> Optional[int]:
+
+        full_property_name = property_prefix + properties.separator + property_name
+        integer_value = properties.get_integer_property(full_property_name)
+        if full_property_name in all_properties_under_prefix:
+            if integer_value is None or integer_value <= 0:
+                raise ValueError(
+                    f"Property '{full_property_name}' is present, but not defined as a positive integer."
+                )
+            property_name_index = all_properties_under_prefix.index(full_property_name)
+            del all_properties_under_prefix[property_name_index]
+        return integer_value
+
     @staticmethod
     def _get_components_start(
         properties: ApplicationProperties, property_prefix: str, expected_type: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict
+from typing import Dict, Optional
 
 from application_properties import ApplicationProperties
 
@@ -12,6 +12,11 @@ class ItemDisplayModifier(Enum):
     NOT_EMPTY = 1
 
 
+class ItemRefreshMode(Enum):
+    FOREGROUND = 0
+    BACKGROUND = 1
+
+
 @dataclass(frozen=True)
 class PropertyItem(LineItem):
     """Item to display that is based on a property from a data source."""
@@ -21,6 +26,9 @@ class PropertyItem(LineItem):
     prefix: str = ""
     suffix: str = ""
     display_modifier: ItemDisplayModifier = ItemDisplayModifier.ALWAYS
+    deadline_ms: Optional[int] = None
+    placeholder: str = ""
+    refresh: ItemRefreshMode = ItemRefreshMode.FOREGROUND
 
     @staticmethod
     def get_name() -> str:
@@ -34,8 +42,26 @@ class PropertyItem(LineItem):
                 self.display_modifier == ItemDisplayModifier.NOT_EMPTY and cache_value
             ):
                 return self.prefix + cache_value + self.suffix
+        elif self.placeholder:
+            # The property did not resolve before its deadline, or it is refreshed
+            # in the background and has no last known value.
+            return self.prefix + self.placeholder + self.suffix
         return ""
 
+    def generate_shell_commands(
+        self, property_variables: Dict[str, str], output_variable: str
+    ) -> Optional[str]:
+        value_variable = property_variables[
+            f"{self.data_source_name}.{self.data_item_name}"
+        ]
+        append_command = (
+            f"{output_variable}+={LineItem._quote_for_shell(self.prefix)}"
+            + f'"${value_variable}"{LineItem._quote_for_shell(self.suffix)}'
+        )
+        if self.display_modifier == ItemDisplayModifier.NOT_EMPTY:
+            return f'[ -n "${value_variable}" ] && {append_command}'
+        return append_command
+
     @staticmethod
     def from_properties(
         properties: ApplicationProperties, property_prefix: str
@@ -98,6 +124,37 @@ class PropertyItem(LineItem):
                 ) from this_exception
         else:
             display_modifier = ItemDisplayModifier.ALWAYS
+        deadline_ms = LineItem._get_integer_component(
+            properties, all_properties_under_prefix, property_prefix, "deadline_ms"
+        )
+        placeholder = (
+            LineItem._get_component(
+                properties,
+                all_properties_under_prefix,
+                property_prefix,
+                "placeholder",
+                is_required=False,
+            )
+            or ""
+        )
+        if refresh_text := (
+            LineItem._get_component(
+                properties,
+                all_properties_under_prefix,
+                property_prefix,
+                "refresh",
+                is_required=False,
+            )
+            or ""
+        ):
+            try:
+                refresh_mode = ItemRefreshMode[refresh_text.upper()]
+            except KeyError as this_exception:
+                raise ValueError(
+                    f"Property '{property_prefix}.refresh' cannot be assigned the value '{refresh_text.upper()}'."
+                ) from this_exception
+        else:
+            refresh_mode = ItemRefreshMode.FOREGROUND
 
         LineItem._get_components_done(all_properties_under_prefix, property_prefix)
         return PropertyItem(
@@ -106,4 +163,7 @@ class PropertyItem(LineItem):
             prefix=text_prefix,
             suffix=text_suffix,
             display_modifier=display_modifier,
+            deadline_ms=deadline_ms,
+            placeholder=placeholder,
+            refresh=refresh_mode,
         )
@@ -2,7 +2,7 @@
 """
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 
 from application_properties import ApplicationProperties
 
@@ -23,6 +23,16 @@ class TextItem(LineItem):
         _ = value_cache
         return self.text
 
+    def generate_shell_commands(
+        self, property_variables: Dict[str, str], output_variable: str
+    ) -> Optional[str]:
+        _ = property_variables
+        return (
+            f"{output_variable}+={LineItem._quote_for_shell(self.text)}"
+            if self.text
+            else ""
+        )
+
     @staticmethod
     def from_properties(
         properties: ApplicationProperties, property_prefix: str
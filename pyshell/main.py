@@ -5,19 +5,27 @@ Main module for the project
 import argparse
 import logging
 import os
-import runpy
 import sys
 import traceback
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from application_properties import ApplicationProperties, ApplicationPropertiesUtilities
 
 from pyshell.application_configuration_helper import ApplicationConfigurationHelper
 from pyshell.application_logging import ApplicationLogging
 from pyshell.data_source_manager import DataSourceManager
+from pyshell.data_sources.base_data_source import PropertyPath
+from pyshell.file_path_helpers import FilePathHelpers
 from pyshell.line_item_manager import LineItemManager
+from pyshell.phase_timings import PhaseTimings
 from pyshell.pyshell_exception import PyShellException
 
+# Modules only needed by some commands are imported when those commands are used,
+# keeping them out of the import graph of the "run" command.
+if TYPE_CHECKING:  # pragma: no cover
+    from pyshell.prompt_plan_cache import PromptPlan, PromptPlanCache, PromptPlanKey
+    from pyshell.property_value_cache import PropertyValueCache
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -30,34 +38,79 @@ class PyShell:
     def __init__(
         self,
         show_stack_trace: bool = False,
+        daemon_already_tried: bool = False,
     ):
-        self.__version_number = PyShell.__get_semantic_version()
         self.__properties: ApplicationProperties = ApplicationProperties()
         self.__show_stack_trace = show_stack_trace
-        self.__logging = ApplicationLogging(
-            self.__properties,
-            default_log_level="CRITICAL",
-            show_stack_trace=show_stack_trace,
-        )
 
-        self.__dsm = DataSourceManager()
-        self.__lim = LineItemManager()
+        # Set if the thin client has already found that the daemon is not available,
+        # so that the "run --client" command does not wait to connect to it again.
+        self.__daemon_already_tried = daemon_already_tried
+        self.__phase_timings = PhaseTimings.from_environment()
+
+        # These are only created once the command being executed needs them.
+        self.__logging: Optional[ApplicationLogging] = None
+        self.__dsm: Optional[DataSourceManager] = None
+        self.__lim: Optional[LineItemManager] = None
         self.__was_invoked_from_ps1 = os.environ.get("IS_PYSHELL_PS1", 0)
         self.__did_error_on_config_load = False
+        self.__prompt_plan_cache: Optional["PromptPlanCache"] = None
+        self.__prompt_plan_key: Optional["PromptPlanKey"] = None
+        self.__prompt_plan: Optional["PromptPlan"] = None
 
     @staticmethod
     def __get_semantic_version() -> str:
-        file_path = __file__
-        assert os.path.isabs(
-            file_path
-        ), "This should hold on all operating systems.  This is to be sure of that assumption."
-        file_path = file_path.replace(os.sep, "/")
-        last_index = file_path.rindex("/")
-        file_path = f"{file_path[: last_index + 1]}version.py"
-        version_meta = runpy.run_path(file_path)
-        return str(version_meta["__version__"])
+        # pylint: disable=import-outside-toplevel
+        from pyshell.version import __version__
+
+        # pylint: enable=import-outside-toplevel
+
+        return __version__
+
+    @staticmethod
+    def parse_bare_run_arguments(
+        direct_args: Optional[List[str]],
+    ) -> Optional[argparse.Namespace]:
+        """
+        The prompt is usually rendered using the "run" command with no options.  In
+        that case, provide the parsed arguments without building the full parser.
+        """
+        if (sys.argv[1:] if direct_args is None else direct_args) != ["run"]:
+            return None
+        return argparse.Namespace(
+            configuration_file=None,
+            set_configuration=None,
+            strict_configuration=False,
+            show_stack_trace=False,
+            x_test_exception="",
+            log_level=None,
+            log_file=None,
+            primary_subparser="run",
+            use_client=False,
+            property_names=None,
+            refresh_property_names=None,
+            socket_path=None,
+        )
 
     def __parse_arguments(self, direct_args: Optional[List[str]]) -> argparse.Namespace:
+        if bare_run_arguments := PyShell.parse_bare_run_arguments(direct_args):
+            return bare_run_arguments
+
+        parser = PyShell.create_argument_parser()
+        parse_arguments = parser.parse_args(args=direct_args)
+        if not parse_arguments.primary_subparser:
+            parser.print_help()
+            sys.exit(2)
+        elif parse_arguments.primary_subparser == "version":
+            print(f"{PyShell.__get_semantic_version()}")
+            sys.exit(0)
+        return parse_arguments
+
+    @staticmethod
+    def create_argument_parser() -> argparse.ArgumentParser:
+        """
+        Create the parser for the full command line of the application.
+        """
         parser = argparse.ArgumentParser(description="Lint any found Markdown files.")
 
         ApplicationPropertiesUtilities.add_default_command_line_arguments(parser)
@@ -78,43 +131,167 @@ class PyShell:
         ApplicationLogging.add_default_command_line_arguments(parser)
 
         subparsers = parser.add_subparsers(dest="primary_subparser")
-        subparsers.add_parser("init", help="Initialize the...")
-        subparsers.add_parser("run", help="Initialize the...")
+        compile_parser = subparsers.add_parser(
+            "compile", help="Generate a shell function that renders the prompt."
+        )
+        compile_parser.add_argument(
+            "--shell",
+            dest="shell_name",
+            action="store",
+            default="bash",
+            choices=["bash", "zsh"],
+            help="shell to generate the function for",
+        )
+        init_parser = subparsers.add_parser(
+            "init", help="Generate the shell hook that keeps the prompt up to date."
+        )
+        init_parser.add_argument(
+            "--shell",
+            dest="shell_name",
+            action="store",
+            default=None,
+            choices=["bash", "zsh"],
+            help="shell to generate the hook for, detected from $SHELL if not given",
+        )
+        run_parser = subparsers.add_parser("run", help="Initialize the...")
+        run_parser.add_argument(
+            "--client",
+            dest="use_client",
+            action="store_true",
+            default=False,
+            help="render the prompt using a running 'serve' daemon, if available",
+        )
+        run_parser.add_argument(
+            "--property",
+            dest="property_names",
+            action="append",
+            metavar="PROPERTY",
+            type=PyShell.__validate_property_name,
+            help="print the value of the property, in the form 'source.item', instead of the prompt",
+        )
+        # Used by the prompt to refresh the values of items that are refreshed in
+        # the background, so it is not shown in the help.
+        run_parser.add_argument(
+            "--refresh",
+            dest="refresh_property_names",
+            action="append",
+            metavar="PROPERTY",
+            type=PyShell.__validate_property_name,
+            help=argparse.SUPPRESS,
+        )
+        PyShell.__add_socket_argument(run_parser)
+        serve_parser = subparsers.add_parser(
+            "serve", help="Run a daemon that renders prompts for clients."
+        )
+        PyShell.__add_socket_argument(serve_parser)
         subparsers.add_parser("version", help="Version of the application.")
+        return parser
 
-        parse_arguments = parser.parse_args(args=direct_args)
-        if not parse_arguments.primary_subparser:
-            parser.print_help()
-            sys.exit(2)
-        elif parse_arguments.primary_subparser == "version":
-            print(f"{self.__version_number}")
-            sys.exit(0)
-        return parse_arguments
+    @staticmethod
+    def __validate_property_name(argument: str) -> str:
+        split_argument = argument.split(".")
+        if len(split_argument) != 2 or not all(split_argument):
+            raise argparse.ArgumentTypeError(
+                f"Value '{argument}' is not of the form 'source.item'."
+            )
+        return argument
+
+    @staticmethod
+    def __add_socket_argument(parser_to_add_to: argparse.ArgumentParser) -> None:
+        parser_to_add_to.add_argument(
+            "--socket",
+            dest="socket_path",
+            action="store",
+            default=None,
+            help="path to the socket used to communicate with the 'serve' daemon",
+        )
 
-    def __set_initial_state(self, args: argparse.Namespace) -> None:
-        self.__logging.pre_initialize_with_args(args)
+    def __set_initial_state(
+        self, args: argparse.Namespace, application_logging: ApplicationLogging
+    ) -> None:
+        application_logging.pre_initialize_with_args(args)
 
-        if args.primary_subparser != "init":
-            self.__did_error_on_config_load = False
+        self.__did_error_on_config_load = False
+        if not self.__load_prompt_plan(args):
             ApplicationConfigurationHelper.apply_configuration_layers(
                 args, self.__properties, self.__handle_error2
             )
-            if self.__did_error_on_config_load and self.__was_invoked_from_ps1:
-                needed_arguments = sys.argv[:]
-                needed_arguments[0] = __file__
-                needed_arguments.insert(0, sys.executable)
-                print(
-                    "An error occurred. To debug the error, run the command line:\n  "
-                    + " ".join(needed_arguments)
-                )
-                self.__properties = ApplicationProperties()
-                self.__properties.load_from_dict(
-                    {"items": {"simple-prompt": {"type": "text", "text": "$ "}}}
+        if self.__did_error_on_config_load and self.__was_invoked_from_ps1:
+            needed_arguments = sys.argv[:]
+            needed_arguments[0] = __file__
+            needed_arguments.insert(0, sys.executable)
+            print(
+                "An error occurred. To debug the error, run the command line:\n  "
+                + " ".join(needed_arguments)
+            )
+            self.__properties = ApplicationProperties()
+            self.__properties.load_from_dict(
+                {"items": {"simple-prompt": {"type": "text", "text": "$ "}}}
+            )
+        LOGGER.info("Configuration loaded and applied.  Initial state setup completed.")
+
+    def __load_prompt_plan(self, args: argparse.Namespace) -> bool:
+        """
+        When invoked from the prompt, the results of parsing and validating the
+        configuration file are cached.  If the configuration file has not changed,
+        load the settings from the cache instead of parsing the file again.
+
+        Note that when invoked manually, the configuration is always parsed and
+        validated, so that any issues with it are reported.
+        """
+        if (
+            args.primary_subparser != "run"
+            or not self.__was_invoked_from_ps1
+            or args.set_configuration
+        ):
+            return False
+
+        # pylint: disable=import-outside-toplevel
+        from pyshell.prompt_plan_cache import PromptPlanCache
+
+        # pylint: enable=import-outside-toplevel
+
+        configuration_file = ApplicationConfigurationHelper.resolve_configuration_file(
+            args
+        )
+        self.__prompt_plan_cache = PromptPlanCache(
+            FilePathHelpers.get_cache_directory()
+        )
+        self.__prompt_plan_key = PromptPlanCache.compute_key(
+            configuration_file, args.strict_configuration
+        )
+        plan_line_item_manager = LineItemManager()
+        if self.__prompt_plan_key:
+            self.__prompt_plan = self.__prompt_plan_cache.load(
+                self.__prompt_plan_key, plan_line_item_manager
+            )
+        if not self.__prompt_plan:
+            return False
+        self.__lim = plan_line_item_manager
+
+        self.__prompt_plan.apply_settings(self.__properties)
+        ApplicationConfigurationHelper.apply_strict_mode(
+            args, self.__properties, self.__handle_error2
+        )
+        return True
+
+    def __save_prompt_plan(self, line_item_manager: LineItemManager) -> None:
+        # pylint: disable=import-outside-toplevel
+        from pyshell.prompt_plan_cache import PromptPlan
+
+        # pylint: enable=import-outside-toplevel
+
+        if (
+            self.__prompt_plan_cache
+            and self.__prompt_plan_key
+            and not self.__did_error_on_config_load
+            and (
+                new_prompt_plan := PromptPlan.from_managers(
+                    self.__properties, line_item_manager
                 )
-        else:
-            LOGGER.info(
-                "Configuration loaded and applied.  Initial state setup completed."
             )
+        ):
+            self.__prompt_plan_cache.save(self.__prompt_plan_key, new_prompt_plan)
 
     def __handle_error2(
         self,
@@ -135,7 +312,15 @@ class PyShell:
     ) -> argparse.Namespace:
 
         args = self.__parse_arguments(direct_args=direct_args)
-        self.__set_initial_state(args)
+        self.__phase_timings.mark("argparse")
+        application_logging = ApplicationLogging(
+            self.__properties,
+            default_log_level="CRITICAL",
+            show_stack_trace=self.__show_stack_trace,
+        )
+        self.__logging = application_logging
+        self.__set_initial_state(args, application_logging)
+        self.__phase_timings.mark("config_load")
 
         self.__show_stack_trace = args.show_stack_trace
         if not self.__show_stack_trace and self.__properties:
@@ -143,8 +328,9 @@ class PyShell:
                 "log.stack-trace"
             )
 
-        self.__logging.initialize(args)
+        application_logging.initialize(args)
         LOGGER.info("Logging subsystem setup completed.")
+        self.__phase_timings.mark("logging_init")
 
         # self.__initialize_plugins_and_extensions(args)
         LOGGER.info("Subsystems setup completed.")
@@ -175,34 +361,276 @@ class PyShell:
         assert exit_on_error
         sys.exit(1)
 
-    def __init(self) -> None:
-        self.__dsm.from_properties(self.__properties)
-        self.__lim.from_properties(self.__properties)
+    def __init(self, property_names: Optional[List[str]] = None) -> None:
+        """
+        Initialize the managers, only loading the data sources that are needed by
+        the line items and any properties named on the command line.
+        """
+        self.__dsm = DataSourceManager()
+        if not self.__prompt_plan or self.__lim is None:
+            self.__lim = LineItemManager()
+            self.__lim.from_properties(self.__properties)
+            self.__save_prompt_plan(self.__lim)
+        self.__dsm.from_properties(
+            self.__properties,
+            self.__lim.get_properties_required_for_items()
+            + [PropertyPath.from_one(i) for i in property_names or []],
+        )
+        self.__phase_timings.mark("managers_init")
 
-    def __handle_init(self) -> None:
+    def __handle_init(self, args: argparse.Namespace) -> None:
+        assert args.primary_subparser == "init"
+        # pylint: disable=import-outside-toplevel
+        from pyshell.prompt_hook import PromptHook
 
-        # export PS1="\$(/c/Users/jackd/.virtualenvs/pyshell-ebIUQutz/Scripts/python.exe /c/enlistements/pyshell/main.py run)"
-        # eval "$(python "c:\\enlistments\\pre-commit-test\\test.py" init)"
+        # pylint: enable=import-outside-toplevel
 
-        # print(os.getenv("PWD"))
-        # print(os.getenv("HOME"))
-        # print(sys.executable)
-        #
-        # C:\Users\jack\.virtualenvs\pyshell-lw4-13FC\Scripts\python.exe ==> /c/Users/jack/.virtualenvs/pyshell-lw4-13FC/Scripts/python.exe
-        print(
-            'export PS1="\\$(IS_PYSHELL_PS1=1 /c/Users/jack/.virtualenvs/pyshell-lw4-13FC/Scripts/python.exe /c/enlistments/pyshell/main.py run)"'
+        self.__init()
+        assert (
+            self.__dsm is not None and self.__lim is not None
+        ), "Managers must be initialized first."
+        use_render_cache = not any(
+            self.__dsm.is_volatile_property(next_property)
+            for next_property in self.__lim.get_properties_required_for_items()
         )
+        prompt_hook = PromptHook(
+            PyShell.__get_application_command(args),
+            FilePathHelpers.normalize_path(
+                ApplicationConfigurationHelper.resolve_configuration_file(args),
+                change_to_posix=True,
+            ),
+            use_render_cache,
+        )
+        print(prompt_hook.generate(args.shell_name or PromptHook.detect_shell()))
         LOGGER.info("Command 'init' completed successfully.")
-        sys.exit(0)
+
+    @staticmethod
+    def __get_application_command(
+        args: argparse.Namespace, change_to_posix: bool = True
+    ) -> List[str]:
+        """
+        Get the command that invokes this application from any directory.  The
+        package is not installed, so the "main.py" script next to it is used, as
+        "-m pyshell" only works from the directory that contains the package.
+        """
+        application_command = [
+            FilePathHelpers.normalize_path(
+                sys.executable, change_to_posix=change_to_posix
+            )
+        ]
+        entry_script = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py"
+        )
+        if os.path.isfile(entry_script):
+            application_command.append(
+                FilePathHelpers.normalize_path(
+                    entry_script, change_to_posix=change_to_posix
+                )
+            )
+        else:
+            application_command.extend(["-m", "pyshell"])
+        if args.configuration_file:
+            application_command.extend(
+                [
+                    "--config",
+                    FilePathHelpers.normalize_path(
+                        ApplicationConfigurationHelper.resolve_configuration_file(args),
+                        change_to_posix=change_to_posix,
+                    ),
+                ]
+            )
+        return application_command
+
+    def __render(
+        self,
+        value_store: Optional["PropertyValueCache"] = None,
+        properties_to_refresh: Optional[List[PropertyPath]] = None,
+    ) -> str:
+        assert (
+            self.__dsm is not None and self.__lim is not None
+        ), "Managers must be initialized first."
+        value_cache: Dict[str, str] = {}
+        stale_properties = self.__dsm.evaluate(value_cache, self.__lim, value_store)
+        if properties_to_refresh is not None:
+            properties_to_refresh.extend(stale_properties)
+        self.__phase_timings.mark("evaluate")
+        generated_prompt = self.__lim.generate(value_cache)
+        self.__phase_timings.mark("generate")
+        return generated_prompt
+
+    def __render_for_client(
+        self, current_directory: str, environment: Dict[str, str]
+    ) -> str:
+        saved_directory = os.getcwd()
+        saved_environment = dict(os.environ)
+        try:
+            os.chdir(current_directory)
+            os.environ.clear()
+            os.environ.update(environment)
+            return self.__render()
+        finally:
+            os.chdir(saved_directory)
+            os.environ.clear()
+            os.environ.update(saved_environment)
 
     def __handle_run(self, args: argparse.Namespace) -> None:
         assert args.primary_subparser == "run"
-        self.__init()
-        value_cache: Dict[str, str] = {}
-        self.__dsm.evaluate(value_cache, self.__lim)
-        print(self.__lim.generate(value_cache))
+        if args.use_client and not self.__daemon_already_tried:
+            # pylint: disable=import-outside-toplevel
+            from pyshell.prompt_client import PromptClient
+
+            # pylint: enable=import-outside-toplevel
+
+            client_output = PromptClient(
+                socket_path=args.socket_path,
+                configuration_file=args.configuration_file,
+                configuration_settings=args.set_configuration,
+            ).render_current()
+            if client_output is not None:
+                print(client_output)
+                LOGGER.info("Command 'run' completed successfully using the daemon.")
+                return
+        if args.use_client:
+            LOGGER.info("Daemon not available, rendering the prompt in-process.")
+        if args.refresh_property_names:
+            self.__refresh_property_values(args.refresh_property_names)
+            LOGGER.info("Command 'run' completed successfully.")
+            return
+        self.__init(args.property_names)
+        if args.property_names:
+            self.__print_property_values(args.property_names)
+        elif self.__was_invoked_from_ps1:
+            # Values that rarely change are shared between prompts.  When invoked
+            # manually, every value is resolved again.
+            # pylint: disable=import-outside-toplevel
+            from pyshell.property_value_cache import PropertyValueCache
+
+            # pylint: enable=import-outside-toplevel
+
+            value_store = PropertyValueCache(FilePathHelpers.get_cache_directory())
+            properties_to_refresh: List[PropertyPath] = []
+            print(self.__render(value_store, properties_to_refresh))
+            if properties_to_refresh:
+                self.__start_background_refresh(
+                    args, value_store, properties_to_refresh
+                )
+        else:
+            print(self.__render())
         LOGGER.info("Command 'run' completed successfully.")
 
+    def __start_background_refresh(
+        self,
+        args: argparse.Namespace,
+        value_store: "PropertyValueCache",
+        properties_to_refresh: List[PropertyPath],
+    ) -> None:
+        """
+        Start a detached process to refresh the values of items that are refreshed in
+        the background, unless one is already refreshing them.  The process releases
+        the lock once the new values are stored, or once it fails to store them.  Any
+        errors from the process are written to a log file next to the lock.
+        """
+        property_names = [i.full_name for i in properties_to_refresh]
+        if not value_store.acquire_refresh_lock(property_names):
+            LOGGER.info("Properties are already being refreshed in the background.")
+            return
+
+        # pylint: disable=import-outside-toplevel
+        import subprocess  # nosec blacklist
+
+        # pylint: enable=import-outside-toplevel
+
+        refresh_command = PyShell.__get_application_command(
+            args, change_to_posix=False
+        ) + ["run"]
+        for next_property_name in property_names:
+            refresh_command.extend(["--refresh", next_property_name])
+        try:
+            with open(
+                value_store.get_refresh_log_path(property_names), "wb"
+            ) as refresh_log_file:
+                # pylint: disable=consider-using-with
+                subprocess.Popen(  # nosec subprocess_without_shell_equals_true
+                    refresh_command,
+                    stdin=subprocess.DEVNULL,
+                    stdout=refresh_log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+                # pylint: enable=consider-using-with
+        except OSError as this_exception:
+            LOGGER.warning("Background refresh not started: %s", this_exception)
+            value_store.release_refresh_lock(property_names)
+            return
+        LOGGER.info("Background refresh of '%s' started.", "', '".join(property_names))
+
+    def __refresh_property_values(self, property_names: List[str]) -> None:
+        """
+        Refresh the properties for the prompt that started this process, releasing
+        the lock taken by that prompt whether or not the refresh succeeds.
+        """
+        # pylint: disable=import-outside-toplevel
+        from pyshell.property_value_cache import PropertyValueCache
+
+        # pylint: enable=import-outside-toplevel
+
+        value_store = PropertyValueCache(FilePathHelpers.get_cache_directory())
+        try:
+            self.__init(property_names)
+            assert self.__dsm is not None, "Managers must be initialized first."
+            self.__dsm.refresh_properties(
+                [PropertyPath.from_one(i) for i in property_names], value_store
+            )
+        finally:
+            value_store.release_refresh_lock(property_names)
+
+    def __print_property_values(self, property_names: List[str]) -> None:
+        assert self.__dsm is not None, "Managers must be initialized first."
+        value_cache: Dict[str, str] = {}
+        for next_property_name in property_names:
+            print(
+                self.__dsm.evaluate_property(
+                    value_cache, PropertyPath.from_one(next_property_name)
+                )
+            )
+
+    def __handle_compile(self, args: argparse.Namespace) -> None:
+        assert args.primary_subparser == "compile"
+        # pylint: disable=import-outside-toplevel
+        from pyshell.prompt_compiler import PromptCompiler
+
+        # pylint: enable=import-outside-toplevel
+
+        self.__init()
+        assert (
+            self.__dsm is not None and self.__lim is not None
+        ), "Managers must be initialized first."
+        prompt_compiler = PromptCompiler(
+            self.__dsm, self.__lim, PyShell.__get_application_command(args)
+        )
+        print(prompt_compiler.compile(args.shell_name))
+        LOGGER.info("Command 'compile' completed successfully.")
+
+    def __handle_serve(self, args: argparse.Namespace) -> None:
+        assert args.primary_subparser == "serve"
+        # pylint: disable=import-outside-toplevel
+        from pyshell.prompt_client import PromptClient
+        from pyshell.prompt_server import PromptServer
+
+        # pylint: enable=import-outside-toplevel
+
+        self.__init()
+        prompt_server = PromptServer(
+            args.socket_path or PromptClient.default_socket_path(),
+            self.__render_for_client,
+            configuration_file=args.configuration_file,
+            configuration_settings=args.set_configuration,
+        )
+        prompt_server.start()
+        prompt_server.handle_termination_signal()
+        prompt_server.serve_forever()
+        LOGGER.info("Command 'serve' completed successfully.")
+
     # pylint: disable=broad-exception-caught
     def main(self, direct_args: Optional[List[str]] = None) -> None:
         """
@@ -213,7 +641,11 @@ class PyShell:
 
             LOGGER.info("Processing command: %s", args.primary_subparser)
             if args.primary_subparser == "init":
-                self.__handle_init()
+                self.__handle_init(args)
+            elif args.primary_subparser == "serve":
+                self.__handle_serve(args)
+            elif args.primary_subparser == "compile":
+                self.__handle_compile(args)
             else:
                 self.__handle_run(args)
         except Exception as this_exception:
@@ -222,7 +654,9 @@ class PyShell:
             )
             self.__handle_error(formatted_error, this_exception)
         finally:
-            self.__logging.terminate()
+            if self.__logging:
+                self.__logging.terminate()
+            self.__phase_timings.write()
         sys.exit(0)
 
     # pylint: enable=broad-exception-caught
@@ -0,0 +1,60 @@
+"""
+Module to provide for the recording of how long each phase of a command takes.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+
+class PhaseTimings:
+    """
+    Class to provide for the recording of how long each phase of a command takes.
+
+    Timings are only recorded if the environment variable names a file to write
+    them to, as is done by the startup benchmark.  Otherwise, each call returns
+    without doing anything.
+    """
+
+    ENVIRONMENT_VARIABLE = "PYSHELL_PHASE_TIMINGS"
+
+    def __init__(self, output_path: Optional[str] = None) -> None:
+        self.__output_path = output_path
+        self.__phase_durations: Dict[str, float] = {}
+        self.__last_mark = time.perf_counter()
+
+    @staticmethod
+    def from_environment() -> "PhaseTimings":
+        """
+        Create an instance that records timings if requested by the environment.
+        """
+        return PhaseTimings(os.environ.get(PhaseTimings.ENVIRONMENT_VARIABLE))
+
+    @property
+    def phase_durations(self) -> Dict[str, float]:
+        """
+        Duration of each phase, in milliseconds, in the order they were first marked.
+        """
+        return dict(self.__phase_durations)
+
+    def mark(self, phase_name: str) -> None:
+        """
+        Record the time since the last mark as belonging to the named phase.
+        """
+        if not self.__output_path:
+            return
+        current_mark = time.perf_counter()
+        self.__phase_durations[phase_name] = self.__phase_durations.get(
+            phase_name, 0.0
+        ) + (1000.0 * (current_mark - self.__last_mark))
+        self.__last_mark = current_mark
+
+    def write(self) -> None:
+        """
+        Write the recorded timings to the requested file, if any.
+        """
+        if not self.__output_path:
+            return
+        with open(self.__output_path, "wt", encoding="utf-8") as outfile:
+            json.dump(self.__phase_durations, outfile)
@@ -0,0 +1,157 @@
+"""Module to provide for a thin client that asks a running prompt daemon to render
+the prompt.
+
+Note that this module is imported before anything else on the "run --client" path,
+so it must only depend on modules from the standard library that are cheap to load.
+"""
+
+import json
+import os
+import socket
+from typing import Dict, List, Optional
+
+
+class PromptClient:
+    """Class to provide for a thin client that asks a running prompt daemon to
+    render the prompt."""
+
+    DEFAULT_CONNECT_TIMEOUT = 0.05
+    "Maximum number of seconds to wait for a connection to the daemon."
+    DEFAULT_RESPONSE_TIMEOUT = 2.0
+    "Maximum number of seconds to wait for the daemon to respond."
+    SOCKET_ENVIRONMENT_VARIABLE = "PYSHELL_SOCKET"
+    "Environment variable that can be used to override the default socket path."
+    DEFAULT_CONFIGURATION_PATH = os.path.join("~", ".pyshell.cfg")
+    "Configuration file used if none is specified, the same as for the application."
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+        configuration_file: Optional[str] = None,
+        configuration_settings: Optional[List[str]] = None,
+    ) -> None:
+        self.__socket_path = socket_path or PromptClient.default_socket_path()
+        self.__connect_timeout = connect_timeout
+        self.__response_timeout = response_timeout
+        self.__configuration_path = PromptClient.resolve_configuration_path(
+            configuration_file
+        )
+        self.__configuration_settings = configuration_settings or []
+
+    @property
+    def socket_path(self) -> str:
+        """Path to the socket that the client connects to."""
+        return self.__socket_path
+
+    @property
+    def configuration_path(self) -> str:
+        """Path to the configuration file that the daemon must be using."""
+        return self.__configuration_path
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Determine if the current platform supports Unix domain sockets."""
+        return hasattr(socket, "AF_UNIX")
+
+    @staticmethod
+    def default_socket_path() -> str:
+        """Determine the path of the socket to use if none is specified."""
+        if socket_path := os.environ.get(PromptClient.SOCKET_ENVIRONMENT_VARIABLE):
+            return socket_path
+        if runtime_directory := os.environ.get("XDG_RUNTIME_DIR"):
+            return os.path.join(runtime_directory, "pyshell.sock")
+        user_id = os.getuid() if hasattr(os, "getuid") else 0
+        temporary_directory = os.environ.get(
+            "TMPDIR", "/tmp"
+        )  # nosec hardcoded_tmp_directory
+        return os.path.join(temporary_directory, f"pyshell-{user_id}.sock")
+
+    @staticmethod
+    def resolve_configuration_path(configuration_file: Optional[str]) -> str:
+        """Determine the absolute path of the configuration file, so that a client
+        and the daemon can tell if they are using the same one."""
+        return os.path.abspath(
+            os.path.expanduser(
+                configuration_file or PromptClient.DEFAULT_CONFIGURATION_PATH
+            )
+        )
+
+    @staticmethod
+    def parse_thin_arguments(arguments: List[str]) -> Optional["PromptClient"]:
+        """If the arguments are exactly a "run --client" invocation, with an
+        optional "--config" argument before it and an optional "--socket" argument
+        after it, return a client to use.  Any other form of arguments requires the
+        full application to handle them.
+        """
+        configuration_file: Optional[str] = None
+        if len(arguments) >= 2 and arguments[0] in ["--config", "-c"]:
+            configuration_file = arguments[1]
+            arguments = arguments[2:]
+        if len(arguments) < 2 or arguments[:2] != ["run", "--client"]:
+            return None
+        if len(arguments) == 2:
+            return PromptClient(configuration_file=configuration_file)
+        if len(arguments) == 4 and arguments[2] == "--socket":
+            return PromptClient(
+                socket_path=arguments[3], configuration_file=configuration_file
+            )
+        return None
+
+    def render(
+        self, current_directory: str, environment: Dict[str, str]
+    ) -> Optional[str]:
+        """Ask the daemon to render the prompt for the given directory and environment,
+        returning None if the daemon is not available or did not render the prompt.
+        The daemon does not render the prompt if it was started with a different
+        configuration than the client's.
+        """
+        if not PromptClient.is_supported():
+            return None
+
+        request = (
+            json.dumps(
+                {
+                    "cwd": current_directory,
+                    "env": environment,
+                    "config": self.__configuration_path,
+                    "settings": self.__configuration_settings,
+                }
+            )
+            + "\n"
+        )
+        with socket.socket(getattr(socket, "AF_UNIX"), socket.SOCK_STREAM) as client:
+            try:
+                client.settimeout(self.__connect_timeout)
+                client.connect(self.__socket_path)
+                client.settimeout(self.__response_timeout)
+                client.sendall(request.encode("utf-8"))
+                response_bytes = PromptClient.receive_line(client)
+            except OSError:
+                return None
+
+        try:
+            response = json.loads(response_bytes.decode("utf-8"))
+        except ValueError:
+            return None
+        output = response.get("output") if isinstance(response, dict) else None
+        return output if isinstance(output, str) else None
+
+    def render_current(self) -> Optional[str]:
+        """Ask the daemon to render the prompt for the current process's state."""
+        return self.render(os.getcwd(), dict(os.environ))
+
+    @staticmethod
+    def receive_line(connection: socket.socket) -> bytes:
+        """Receive bytes from the connection up to and including a newline character,
+        or until the other side closes the connection."""
+        received_chunks: List[bytes] = []
+        while True:
+            next_chunk = connection.recv(65536)
+            if not next_chunk:
+                break
+            received_chunks.append(next_chunk)
+            if next_chunk.endswith(b"\n"):
+                break
+        return b"".join(received_chunks)
@@ -0,0 +1,163 @@
+"""
+Module to provide for the compiling of the configured prompt into a shell function
+that renders it without starting the application.
+"""
+
+import logging
+import shlex
+from typing import Dict, List
+
+from pyshell.data_source_manager import DataSourceManager
+from pyshell.line_item_manager import LineItemManager
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PromptCompiler:
+    """
+    Class to provide for the compiling of the configured prompt into a shell function
+    that renders it without starting the application.
+
+    Each property is translated into shell commands by its data source.  Properties
+    without a translation are evaluated by a single invocation of the application
+    from within the function.  If a line item cannot be translated, the function
+    simply invokes the application to render the whole prompt.
+    """
+
+    SUPPORTED_SHELLS = ["bash", "zsh"]
+    FUNCTION_NAME = "__pyshell_prompt"
+
+    __OUTPUT_VARIABLE = "__pyshell_output"
+    __FALLBACK_VARIABLE = "__pyshell_fallback"
+    __PROPERTY_VARIABLE_PREFIX = "__pyshell_property_"
+
+    def __init__(
+        self,
+        data_source_manager: DataSourceManager,
+        line_item_manager: LineItemManager,
+        application_command: List[str],
+    ) -> None:
+        self.__data_source_manager = data_source_manager
+        self.__line_item_manager = line_item_manager
+        self.__application_command = application_command
+
+    def compile(self, shell_name: str) -> str:
+        """
+        Generate the shell script that defines the prompt function and installs it.
+        """
+        assert shell_name in PromptCompiler.SUPPORTED_SHELLS
+        function_body = self.__compile_function_body(shell_name)
+        script_lines = [
+            "# Generated by 'pyshell compile'.  Generate again if the configuration changes.",
+            f"{PromptCompiler.FUNCTION_NAME}() {{",
+        ]
+        script_lines.extend(
+            f"    {next_line}" if next_line else next_line
+            for next_line in function_body
+        )
+        script_lines.append("}")
+        if shell_name == "zsh":
+            script_lines.extend(
+                [
+                    "setopt PROMPT_SUBST",
+                    f"PROMPT='$({PromptCompiler.FUNCTION_NAME})'",
+                ]
+            )
+        else:
+            script_lines.append(f"PS1='$({PromptCompiler.FUNCTION_NAME})'")
+        return "\n".join(script_lines)
+
+    def __compile_function_body(self, shell_name: str) -> List[str]:
+        property_variables: Dict[str, str] = {}
+        translated_commands: List[str] = []
+        fallback_properties: List[str] = []
+        for property_index, next_property in enumerate(
+            self.__line_item_manager.get_properties_required_for_items()
+        ):
+            if next_property.full_name in property_variables:
+                continue
+            variable_name = (
+                f"{PromptCompiler.__PROPERTY_VARIABLE_PREFIX}{property_index}"
+            )
+            property_variables[next_property.full_name] = variable_name
+            if (
+                shell_translation := self.__data_source_manager.get_shell_translation(
+                    next_property, variable_name
+                )
+            ) is None:
+                fallback_properties.append(next_property.full_name)
+            else:
+                translated_commands.append(shell_translation)
+
+        item_commands: List[str] = []
+        for next_line_item in self.__line_item_manager.line_items:
+            if (
+                item_command := next_line_item.generate_shell_commands(
+                    property_variables, PromptCompiler.__OUTPUT_VARIABLE
+                )
+            ) is None:
+                LOGGER.warning(
+                    "Line item of type '%s' cannot be compiled, so the application renders the whole prompt.",
+                    next_line_item.get_name(),
+                )
+                return [self.__application_invocation(["run"])]
+            if item_command:
+                item_commands.append(item_command)
+
+        body_lines = [
+            "local "
+            + " ".join(
+                [PromptCompiler.__OUTPUT_VARIABLE, PromptCompiler.__FALLBACK_VARIABLE]
+                + list(property_variables.values())
+            ),
+            f"{PromptCompiler.__OUTPUT_VARIABLE}=''",
+        ]
+        for next_command in translated_commands:
+            body_lines.extend(next_command.split("\n"))
+        if fallback_properties:
+            LOGGER.info(
+                "Properties '%s' have no shell translation, so they are evaluated by the application.",
+                "', '".join(fallback_properties),
+            )
+            body_lines.extend(
+                self.__compile_fallback(fallback_properties, property_variables)
+            )
+        for next_command in item_commands:
+            body_lines.extend(next_command.split("\n"))
+        if shell_name == "zsh":
+            body_lines.append(
+                f"printf '%s' \"${{{PromptCompiler.__OUTPUT_VARIABLE}//\\%/%%}}\""
+            )
+        else:
+            body_lines.append(f"printf '%s' \"${PromptCompiler.__OUTPUT_VARIABLE}\"")
+        return body_lines
+
+    def __compile_fallback(
+        self, fallback_properties: List[str], property_variables: Dict[str, str]
+    ) -> List[str]:
+        # The application writes each value on its own line.  The final "." keeps
+        # the shell from removing the newline after the last value.
+        fallback_arguments = ["run"]
+        for next_property in fallback_properties:
+            fallback_arguments.extend(["--property", next_property])
+        fallback_lines = [
+            f'{PromptCompiler.__FALLBACK_VARIABLE}="$('
+            + self.__application_invocation(fallback_arguments)
+            + "; printf '.')\""
+        ]
+        for next_property in fallback_properties:
+            fallback_lines.extend(
+                [
+                    f"{property_variables[next_property]}="
+                    + f"\"${{{PromptCompiler.__FALLBACK_VARIABLE}%%$'\\n'*}}\"",
+                    f"{PromptCompiler.__FALLBACK_VARIABLE}="
+                    + f"\"${{{PromptCompiler.__FALLBACK_VARIABLE}#*$'\\n'}}\"",
+                ]
+            )
+        return fallback_lines
+
+    def __application_invocation(self, application_arguments: List[str]) -> str:
+        return "IS_PYSHELL_PS1=1 " + " ".join(
+            shlex.quote(next_argument)
+            for next_argument in self.__application_command + application_arguments
+        )
@@ -0,0 +1,163 @@
+"""
+Module to provide for the generating of the shell hook that keeps the prompt up to
+date, only invoking the application when the prompt may have changed.
+"""
+
+import os
+import shlex
+from typing import List
+
+from pyshell.data_sources.git_data_source import GitDataSource
+
+
+class PromptHook:
+    """
+    Class to provide for the generating of the shell hook that keeps the prompt up
+    to date.
+
+    The hook runs before each prompt is displayed and keeps the last rendered prompt
+    in a shell variable.  The application is only invoked again if the current
+    directory changes, or if the git HEAD file or the configuration file is newer
+    than a marker file that is written each time the prompt is rendered.  Each shell
+    has its own marker file, which is removed when the shell exits, and which is kept
+    if the hook is loaded again in the same shell.  If the prompt contains volatile
+    properties, such as the time, it is rendered every time.
+    """
+
+    SUPPORTED_SHELLS = ["bash", "zsh"]
+    HOOK_NAME = "__pyshell_prompt_hook"
+
+    __KEY_VARIABLE = "__pyshell_prompt_key"
+    __VALUE_VARIABLE = "__pyshell_prompt_value"
+    __MARKER_VARIABLE = "__pyshell_prompt_marker"
+    __REMOVE_MARKER_NAME = "__pyshell_prompt_remove_marker"
+
+    __BASH_INSTALL_COMMANDS = """case ";${PROMPT_COMMAND:-};" in
+    *";@HOOK@;"*) ;;
+    *) PROMPT_COMMAND="@HOOK@${PROMPT_COMMAND:+;$PROMPT_COMMAND}" ;;
+esac
+PS1='${@VALUE@}'"""
+
+    __ZSH_INSTALL_COMMANDS = """autoload -Uz add-zsh-hook
+add-zsh-hook precmd @HOOK@
+setopt PROMPT_SUBST
+PROMPT='${@VALUE@//\\%/%%}'"""
+
+    # Any EXIT trap that is already set is kept, running after the marker is removed.
+    __BASH_EXIT_COMMANDS = """__pyshell_prompt_trap() {
+    eval "set -- $(trap -p EXIT)"
+    case "${3:-}" in
+        *@REMOVE@*) ;;
+        *) trap "@REMOVE@${3:+; $3}" EXIT ;;
+    esac
+}
+__pyshell_prompt_trap
+unset -f __pyshell_prompt_trap"""
+
+    __ZSH_EXIT_COMMANDS = """add-zsh-hook zshexit @REMOVE@"""
+
+    def __init__(
+        self,
+        application_command: List[str],
+        configuration_file: str,
+        use_render_cache: bool,
+    ) -> None:
+        self.__application_command = application_command
+        self.__configuration_file = configuration_file
+        self.__use_render_cache = use_render_cache
+
+    @staticmethod
+    def detect_shell() -> str:
+        """
+        Detect the shell that the user is running, defaulting to bash.
+        """
+        shell_name = os.path.basename(os.environ.get("SHELL", ""))
+        return shell_name if shell_name in PromptHook.SUPPORTED_SHELLS else "bash"
+
+    def generate(self, shell_name: str) -> str:
+        """
+        Generate the shell script that defines the hook and installs it.
+        """
+        assert shell_name in PromptHook.SUPPORTED_SHELLS
+        script_lines = [
+            "# Generated by 'pyshell init'.  Load it with: eval \"$(pyshell init)\"",
+            f'{PromptHook.__KEY_VARIABLE}=""',
+            f'{PromptHook.__VALUE_VARIABLE}=""',
+        ]
+        if self.__use_render_cache:
+            script_lines.extend(
+                [
+                    f'if [ ! -f "${{{PromptHook.__MARKER_VARIABLE}:-}}" ]; then',
+                    f"    {PromptHook.__MARKER_VARIABLE}="
+                    + '"$(mktemp "${TMPDIR:-/tmp}/pyshell-prompt.XXXXXX")"',
+                    "fi",
+                    f"{PromptHook.__REMOVE_MARKER_NAME}() {{",
+                    f'    rm -f "${PromptHook.__MARKER_VARIABLE}"',
+                    "}",
+                ]
+            )
+        script_lines.append(f"{PromptHook.HOOK_NAME}() {{")
+        script_lines.extend(
+            f"    {next_line}" if next_line else next_line
+            for next_line in self.__generate_hook_body()
+        )
+        script_lines.append("}")
+        install_commands = (
+            PromptHook.__ZSH_INSTALL_COMMANDS
+            if shell_name == "zsh"
+            else PromptHook.__BASH_INSTALL_COMMANDS
+        )
+        script_lines.extend(
+            install_commands.replace("@HOOK@", PromptHook.HOOK_NAME)
+            .replace("@VALUE@", PromptHook.__VALUE_VARIABLE)
+            .split("\n")
+        )
+        if self.__use_render_cache:
+            exit_commands = (
+                PromptHook.__ZSH_EXIT_COMMANDS
+                if shell_name == "zsh"
+                else PromptHook.__BASH_EXIT_COMMANDS
+            )
+            script_lines.extend(
+                exit_commands.replace(
+                    "@REMOVE@", PromptHook.__REMOVE_MARKER_NAME
+                ).split("\n")
+            )
+        return "\n".join(script_lines)
+
+    def __generate_hook_body(self) -> List[str]:
+        render_command = "IS_PYSHELL_PS1=1 " + " ".join(
+            shlex.quote(next_argument)
+            for next_argument in self.__application_command + ["run"]
+        )
+        if not self.__use_render_cache:
+            return [
+                "local __pyshell_status=$?",
+                f'{PromptHook.__VALUE_VARIABLE}="$({render_command})"',
+                "return $__pyshell_status",
+            ]
+
+        # The marker is written before rendering, so that a change made while the
+        # application is running still causes the next prompt to be rendered again.
+        marker_reference = f'"${PromptHook.__MARKER_VARIABLE}"'
+        body_lines = ["local __pyshell_status=$?"]
+        body_lines.extend(
+            GitDataSource.FIND_GIT_DIRECTORY_COMMANDS.rstrip().split("\n")
+        )
+        body_lines.extend(
+            [
+                'local __pyshell_key="$PWD:$__pyshell_git_dir"',
+                f'if [ "$__pyshell_key" != "${PromptHook.__KEY_VARIABLE}" ] \\',
+                f'    || [ "$__pyshell_git_dir/HEAD" -nt {marker_reference} ] \\',
+                f"    || [ {shlex.quote(self.__configuration_file)} -nt {marker_reference} ]; then",
+                f"    printf '%s' \"$__pyshell_key\" 2>/dev/null > {marker_reference}",
+                f'    if {PromptHook.__VALUE_VARIABLE}="$({render_command})"; then',
+                f'        {PromptHook.__KEY_VARIABLE}="$__pyshell_key"',
+                "    else",
+                f'        {PromptHook.__KEY_VARIABLE}=""',
+                "    fi",
+                "fi",
+                "return $__pyshell_status",
+            ]
+        )
+        return body_lines
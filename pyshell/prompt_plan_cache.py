@@ -0,0 +1,177 @@
+"""Module to provide for a cache of compiled prompt plans, allowing the parsing and
+validation of an unchanged configuration file to be skipped.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from application_properties import ApplicationProperties
+
+from pyshell.data_sources.base_data_source import PropertyPath
+from pyshell.file_path_helpers import FilePathHelpers
+from pyshell.line_item_manager import LineItemManager
+from pyshell.version import __version__
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PromptPlanKey:
+    """Identity of the configuration file that a prompt plan was compiled from."""
+
+    configuration_file: str
+    "Normalized path to the configuration file."
+    file_size: int
+    "Size of the configuration file, in bytes."
+    modified_time_ns: int
+    "Modification time of the configuration file, in nanoseconds."
+    content_hash: str
+    "SHA-256 hash of the contents of the configuration file."
+    application_version: str
+    "Version of the application that compiled the plan."
+    strict_configuration: bool
+    "Whether strict configuration was requested on the command line."
+
+
+@dataclass(frozen=True)
+class PromptPlan:
+    """Results of parsing and validating a configuration file."""
+
+    settings: Dict[str, Any]
+    "Flattened properties from the configuration, excluding the line items."
+    line_items: List[Dict[str, Any]]
+    "Validated line items, in display order."
+    required_properties: List[str]
+    "Full names of the properties required by the line items."
+
+    @staticmethod
+    def from_managers(
+        properties: ApplicationProperties, line_item_manager: LineItemManager
+    ) -> Optional["PromptPlan"]:
+        """Create a plan from properties and line items that have been validated.
+        If the properties cannot be faithfully restored from a plan, None is returned.
+        """
+        settings: Dict[str, Any] = {}
+        for next_property_name in properties.property_names:
+            if next_property_name.startswith("items."):
+                continue
+            if "'" in next_property_name:
+                return None
+            settings[next_property_name] = properties.get_property(
+                next_property_name, object
+            )
+        return PromptPlan(
+            settings=settings,
+            line_items=[
+                next_line_item.to_plan_dict()
+                for next_line_item in line_item_manager.line_items
+            ],
+            required_properties=[
+                next_property.full_name
+                for next_property in line_item_manager.get_properties_required_for_items()
+            ],
+        )
+
+    def apply_settings(self, properties: ApplicationProperties) -> None:
+        """Load the settings from the plan into the properties object."""
+        settings_map: Dict[str, Any] = {}
+        for next_property_name, next_value in self.settings.items():
+            current_map = settings_map
+            split_property_name = next_property_name.split(properties.separator)
+            for next_name_part in split_property_name[:-1]:
+                current_map = current_map.setdefault(next_name_part, {})
+            current_map[split_property_name[-1]] = next_value
+        properties.load_from_dict(settings_map)
+
+    def apply_line_items(self, line_item_manager: LineItemManager) -> None:
+        """Load the line items from the plan into the line item manager."""
+        line_item_manager.from_plan(
+            self.line_items,
+            [PropertyPath.from_one(i) for i in self.required_properties],
+        )
+
+
+class PromptPlanCache:
+    """Class to provide for a cache of compiled prompt plans."""
+
+    __PLAN_DIRECTORY_NAME = "plans"
+
+    def __init__(self, cache_directory: str) -> None:
+        self.__plan_directory = os.path.join(
+            cache_directory, PromptPlanCache.__PLAN_DIRECTORY_NAME
+        )
+
+    @staticmethod
+    def compute_key(
+        configuration_file: str, strict_configuration: bool
+    ) -> Optional[PromptPlanKey]:
+        """Compute the key that identifies the current contents of the configuration file."""
+        try:
+            file_status = os.stat(configuration_file)
+            with open(configuration_file, "rb") as infile:
+                content_hash = hashlib.sha256(infile.read()).hexdigest()
+        except OSError:
+            return None
+        return PromptPlanKey(
+            configuration_file=configuration_file,
+            file_size=file_status.st_size,
+            modified_time_ns=file_status.st_mtime_ns,
+            content_hash=content_hash,
+            application_version=__version__,
+            strict_configuration=strict_configuration,
+        )
+
+    def __plan_path(self, configuration_file: str) -> str:
+        path_hash = hashlib.sha256(configuration_file.encode("utf-8")).hexdigest()
+        return os.path.join(self.__plan_directory, f"{path_hash[:32]}.json")
+
+    def load(
+        self,
+        plan_key: PromptPlanKey,
+        line_item_manager: Optional[LineItemManager] = None,
+    ) -> Optional[PromptPlan]:
+        """Load the plan for the key, if one exists and it was compiled from the
+        same configuration file contents.  If a line item manager is given, the line
+        items from the plan are loaded into it, and a plan whose line items cannot be
+        loaded, such as one that was edited or truncated, is not loaded either.  The
+        manager must then be discarded."""
+        plan_path = self.__plan_path(plan_key.configuration_file)
+        try:
+            with open(plan_path, "rt", encoding="utf-8") as infile:
+                plan_document = json.load(infile)
+            if plan_document["key"] != asdict(plan_key):
+                LOGGER.debug("Prompt plan '%s' is out of date.", plan_path)
+                return None
+            loaded_plan = PromptPlan(**plan_document["plan"])
+            if line_item_manager is not None:
+                loaded_plan.apply_line_items(line_item_manager)
+        except (
+            OSError,
+            ValueError,
+            KeyError,
+            TypeError,
+            AttributeError,
+        ) as this_exception:
+            LOGGER.debug("Prompt plan '%s' not loaded: %s", plan_path, this_exception)
+            return None
+        LOGGER.info("Prompt plan '%s' loaded.", plan_path)
+        return loaded_plan
+
+    def save(self, plan_key: PromptPlanKey, plan: PromptPlan) -> None:
+        """Save the plan for the key, replacing any existing plan."""
+        plan_path = self.__plan_path(plan_key.configuration_file)
+        try:
+            plan_contents = json.dumps({"key": asdict(plan_key), "plan": asdict(plan)})
+        except TypeError as this_exception:
+            LOGGER.debug("Prompt plan cannot be serialized: %s", this_exception)
+            return
+        try:
+            FilePathHelpers.write_file_atomically(plan_path, plan_contents)
+        except OSError as this_exception:
+            LOGGER.warning("Prompt plan '%s' not saved: %s", plan_path, this_exception)
+            return
+        LOGGER.info("Prompt plan '%s' saved.", plan_path)
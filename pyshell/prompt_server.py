@@ -0,0 +1,176 @@
+"""Module to provide for a daemon that keeps a warmed prompt renderer resident
+behind a Unix domain socket.
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional
+
+from pyshell.prompt_client import PromptClient
+from pyshell.pyshell_exception import PyShellException
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PromptServer:
+    """Class to provide for a daemon that keeps a warmed prompt renderer resident
+    behind a Unix domain socket.
+
+    Requests are handled one at a time, as rendering a prompt changes the current
+    directory and the environment of the process to match those of the client.  A
+    client that does not send its request in time is dropped, so that it cannot
+    keep the prompts of other clients from being rendered.  A client that uses a
+    different configuration file, or different configuration settings, than the
+    daemon is refused, so that it can render its own prompt instead.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        render_function: Callable[[str, Dict[str, str]], str],
+        request_timeout: float = PromptClient.DEFAULT_RESPONSE_TIMEOUT,
+        configuration_file: Optional[str] = None,
+        configuration_settings: Optional[List[str]] = None,
+    ) -> None:
+        self.__socket_path = socket_path
+        self.__render_function = render_function
+        self.__request_timeout = request_timeout
+        self.__configuration_path = PromptClient.resolve_configuration_path(
+            configuration_file
+        )
+        self.__configuration_settings = configuration_settings or []
+        self.__server_socket: Optional[socket.socket] = None
+        self.__is_stopping = False
+
+    @property
+    def socket_path(self) -> str:
+        """Path to the socket that the server listens on."""
+        return self.__socket_path
+
+    def start(self) -> None:
+        """Bind the server to its socket and start listening for requests."""
+        if not PromptClient.is_supported():
+            raise PyShellException(
+                "The 'serve' command requires support for Unix domain sockets."
+            )
+        self.__remove_stale_socket()
+
+        server_socket = socket.socket(getattr(socket, "AF_UNIX"), socket.SOCK_STREAM)
+        try:
+            # The socket is created without access for other users, instead of being
+            # changed after it has been created and may already have been connected to.
+            previous_umask = os.umask(0o077)
+            try:
+                server_socket.bind(self.__socket_path)
+            finally:
+                os.umask(previous_umask)
+            server_socket.listen()
+        except OSError:
+            server_socket.close()
+            raise
+        self.__server_socket = server_socket
+        LOGGER.info("Prompt daemon listening on '%s'.", self.__socket_path)
+
+    def stop(self) -> None:
+        """Stop listening for requests and remove the socket."""
+        self.__is_stopping = True
+        if self.__server_socket:
+            self.__server_socket.close()
+            self.__server_socket = None
+            if os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
+            LOGGER.info("Prompt daemon on '%s' stopped.", self.__socket_path)
+
+    def handle_termination_signal(self) -> None:
+        """Treat a termination signal like an interrupt, so that the socket is
+        removed when the daemon is stopped.  Must be called from the main thread."""
+
+        def handle_signal(signal_number: int, frame: Optional[FrameType]) -> None:
+            _ = (signal_number, frame)
+            raise KeyboardInterrupt()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    def serve_forever(self) -> None:
+        """Handle requests until the server is stopped or interrupted."""
+        try:
+            while not self.__is_stopping:
+                self.handle_next_request()
+        except KeyboardInterrupt:
+            LOGGER.info("Prompt daemon interrupted.")
+        finally:
+            self.stop()
+
+    def handle_next_request(self) -> None:
+        """Wait for the next connection and render a prompt for it."""
+        assert self.__server_socket is not None, "Server must be started first."
+        try:
+            connection, _ = self.__server_socket.accept()
+        except OSError:
+            if self.__is_stopping:
+                return
+            raise
+        with connection:
+            try:
+                connection.settimeout(self.__request_timeout)
+                request_bytes = PromptClient.receive_line(connection)
+                response = self.__process_request(request_bytes)
+                connection.sendall((json.dumps(response) + "\n").encode("utf-8"))
+            except socket.timeout:
+                LOGGER.warning(
+                    "Prompt daemon dropped a client that did not respond within %.1f seconds.",
+                    self.__request_timeout,
+                )
+            except OSError as this_exception:
+                LOGGER.warning("Prompt daemon request failed: %s", this_exception)
+
+    # pylint: disable=broad-exception-caught
+    def __process_request(self, request_bytes: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(request_bytes.decode("utf-8"))
+            current_directory = request["cwd"]
+            environment = request["env"]
+            if not isinstance(current_directory, str) or not isinstance(
+                environment, dict
+            ):
+                raise ValueError("Request is not properly formed.")
+            if (
+                request.get("config") != self.__configuration_path
+                or request.get("settings") != self.__configuration_settings
+            ):
+                LOGGER.info(
+                    "Prompt daemon refused a client using configuration '%s'.",
+                    request.get("config"),
+                )
+                return {"error": "Client configuration does not match the daemon."}
+            return {"output": self.__render_function(current_directory, environment)}
+        except Exception as this_exception:
+            LOGGER.warning(
+                "Prompt daemon could not render prompt: %s",
+                this_exception,
+                exc_info=this_exception,
+            )
+            return {"error": f"{type(this_exception).__name__}: {this_exception}"}
+
+    # pylint: enable=broad-exception-caught
+
+    def __remove_stale_socket(self) -> None:
+        if not os.path.exists(self.__socket_path):
+            return
+        with socket.socket(getattr(socket, "AF_UNIX"), socket.SOCK_STREAM) as probe:
+            try:
+                probe.settimeout(PromptClient.DEFAULT_CONNECT_TIMEOUT)
+                probe.connect(self.__socket_path)
+                is_in_use = True
+            except OSError:
+                is_in_use = False
+        if is_in_use:
+            raise PyShellException(
+                f"A prompt daemon is already listening on '{self.__socket_path}'."
+            )
+        LOGGER.info("Removing stale prompt daemon socket '%s'.", self.__socket_path)
+        os.remove(self.__socket_path)
@@ -0,0 +1,337 @@
+"""Module to provide for a cache of resolved property values that is shared by the
+prompts of every shell, so that values that rarely change are not resolved again
+for every prompt.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pyshell.data_sources.base_data_source import (
+    PropertyCachePolicy,
+    PropertyCacheScope,
+)
+from pyshell.file_path_helpers import FilePathHelpers
+
+LOGGER = logging.getLogger(__name__)
+
+# The inode, size and modification time of each file, or None if it does not exist.
+FileFingerprint = List[Optional[List[int]]]
+
+
+class PropertyValueCache:
+    """
+    Class to provide for a cache of resolved property values.
+
+    Values are kept in one file for each scope, such as the current directory, and
+    each value expires once its time to live has passed, or once any of the files
+    that it depends on change.  Expired values are kept as the last known values,
+    to be shown while they are refreshed in the background, until they have been
+    expired for the retention period.  The cache is loaded on first use and any new
+    values are merged into the file when it is saved, under a lock, so that shells
+    that share the cache only ever replace the values that they resolved.  When a
+    new scope file is written, the files of scopes that have not been saved within
+    the retention period are removed.
+    """
+
+    __VALUES_DIRECTORY_NAME = "values"
+    __LOCKS_DIRECTORY_NAME = "locks"
+
+    BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+    # A refresh that has held its lock for this long is assumed to have died.
+    REFRESH_LOCK_TIMEOUT_SECONDS = 60.0
+
+    # How long to wait for another shell to finish saving the same scope, before
+    # giving up on saving the new values.
+    SAVE_LOCK_WAIT_SECONDS = 0.5
+    __SAVE_LOCK_RETRY_SECONDS = 0.01
+
+    # Expired values, and the files of scopes, are kept for this long, and each
+    # scope keeps at most this many of the values stored most recently.
+    RETENTION_SECONDS = 7 * 24 * 60 * 60
+    MAXIMUM_SCOPE_ENTRIES = 256
+
+    def __init__(
+        self, cache_directory: str, current_directory: Optional[str] = None
+    ) -> None:
+        self.__values_directory = os.path.join(
+            cache_directory, PropertyValueCache.__VALUES_DIRECTORY_NAME
+        )
+        self.__locks_directory = os.path.join(
+            cache_directory, PropertyValueCache.__LOCKS_DIRECTORY_NAME
+        )
+        self.__current_directory = FilePathHelpers.normalize_path(
+            current_directory or os.getcwd()
+        )
+        self.__repository_root: Optional[str] = None
+        self.__loaded_scopes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.__pending_values: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    @staticmethod
+    def compute_fingerprint(file_paths: List[str]) -> FileFingerprint:
+        """Compute a fingerprint that changes whenever any of the files is changed,
+        replaced, created or deleted."""
+        file_fingerprint: FileFingerprint = []
+        for next_path in file_paths:
+            try:
+                file_status = os.stat(next_path)
+            except OSError:
+                file_fingerprint.append(None)
+                continue
+            file_fingerprint.append(
+                [file_status.st_ino, file_status.st_size, file_status.st_mtime_ns]
+            )
+        return file_fingerprint
+
+    def get(
+        self,
+        property_name: str,
+        cache_policy: PropertyCachePolicy,
+        file_fingerprint: Optional[FileFingerprint] = None,
+    ) -> Optional[str]:
+        """Get the cached value of the property, if it has one that has not expired and
+        that was resolved when the files it depends on had the same fingerprint."""
+        if (
+            (scope_key := self.__get_scope_key(cache_policy.scope)) is None
+            or (cached_entry := self.__load_scope(scope_key).get(property_name)) is None
+            or PropertyValueCache.__has_expired(cached_entry, time.time())
+            or cached_entry.get("fingerprint") != file_fingerprint
+        ):
+            return None
+        return str(cached_entry["value"])
+
+    def get_last_known(
+        self, property_name: str, cache_policy: PropertyCachePolicy
+    ) -> Optional[str]:
+        """Get the last value stored for the property, even if it has expired."""
+        if (scope_key := self.__get_scope_key(cache_policy.scope)) is None or (
+            cached_entry := self.__load_scope(scope_key).get(property_name)
+        ) is None:
+            return None
+        return str(cached_entry["value"])
+
+    def set(
+        self,
+        property_name: str,
+        cache_policy: PropertyCachePolicy,
+        value: str,
+        file_fingerprint: Optional[FileFingerprint] = None,
+    ) -> None:
+        """Set the value of the property, to be written when the cache is saved."""
+        if (scope_key := self.__get_scope_key(cache_policy.scope)) is None:
+            return
+        new_entry = {
+            "value": value,
+            "stored": time.time(),
+            "expires": (
+                time.time() + cache_policy.ttl_seconds
+                if cache_policy.ttl_seconds is not None
+                else None
+            ),
+            "fingerprint": file_fingerprint,
+        }
+        self.__load_scope(scope_key)[property_name] = new_entry
+        self.__pending_values.setdefault(scope_key, {})[property_name] = new_entry
+
+    def save(self) -> None:
+        """Merge any new values into the files for their scopes, removing any values
+        that have been expired for longer than the retention period."""
+        for scope_key, pending_values in self.__pending_values.items():
+            lock_path = self.__get_lock_path(f"save:{scope_key}")
+            if not self.__acquire_lock(
+                lock_path, PropertyValueCache.SAVE_LOCK_WAIT_SECONDS
+            ):
+                LOGGER.info("Property values for '%s' not saved.", scope_key)
+                continue
+            try:
+                scope_path, scope_values = self.__read_scope_file(scope_key)
+                is_new_scope = not os.path.exists(scope_path)
+                scope_values.update(pending_values)
+                current_time = time.time()
+                PropertyValueCache.__prune_entries(scope_values, current_time)
+                FilePathHelpers.write_file_atomically(
+                    scope_path, json.dumps({"scope": scope_key, "values": scope_values})
+                )
+                if is_new_scope:
+                    self.__remove_stale_scope_files(current_time)
+            except OSError as this_exception:
+                LOGGER.warning(
+                    "Property values for '%s' not saved: %s", scope_key, this_exception
+                )
+            finally:
+                PropertyValueCache.__release_lock(lock_path)
+        self.__pending_values.clear()
+
+    @staticmethod
+    def __prune_entries(
+        scope_values: Dict[str, Dict[str, Any]], current_time: float
+    ) -> None:
+        for next_name, next_entry in list(scope_values.items()):
+            if PropertyValueCache.__has_expired(
+                next_entry, current_time - PropertyValueCache.RETENTION_SECONDS
+            ):
+                del scope_values[next_name]
+        if len(scope_values) > PropertyValueCache.MAXIMUM_SCOPE_ENTRIES:
+            for next_name in sorted(
+                scope_values, key=lambda i: scope_values[i].get("stored", 0.0)
+            )[: len(scope_values) - PropertyValueCache.MAXIMUM_SCOPE_ENTRIES]:
+                del scope_values[next_name]
+
+    def __remove_stale_scope_files(self, current_time: float) -> None:
+        for next_file_name in os.listdir(self.__values_directory):
+            scope_path = os.path.join(self.__values_directory, next_file_name)
+            try:
+                if (
+                    current_time - os.path.getmtime(scope_path)
+                    > PropertyValueCache.RETENTION_SECONDS
+                ):
+                    LOGGER.info("Removing stale property values '%s'.", scope_path)
+                    os.remove(scope_path)
+            except OSError as this_exception:
+                LOGGER.debug(
+                    "Property values '%s' not removed: %s", scope_path, this_exception
+                )
+
+    def acquire_refresh_lock(self, property_names: List[str]) -> bool:
+        """Take the lock for refreshing the properties in the current directory,
+        returning False if another refresh of them is already running."""
+        return self.__acquire_lock(self.__get_refresh_lock_path(property_names))
+
+    def release_refresh_lock(self, property_names: List[str]) -> None:
+        """Release the lock for refreshing the properties in the current directory."""
+        PropertyValueCache.__release_lock(self.__get_refresh_lock_path(property_names))
+
+    def get_refresh_log_path(self, property_names: List[str]) -> str:
+        """Get the file that the output from refreshing the properties in the current
+        directory is written to, next to the lock for refreshing them."""
+        os.makedirs(self.__locks_directory, exist_ok=True)
+        return (
+            f"{os.path.splitext(self.__get_refresh_lock_path(property_names))[0]}.log"
+        )
+
+    def __acquire_lock(self, lock_path: str, wait_seconds: float = 0.0) -> bool:
+        """Take the lock by creating its file, waiting for up to the given number of
+        seconds for another process to release it.  A lock that has been held for
+        longer than any process should hold it is assumed to have been left behind."""
+        wait_deadline = time.monotonic() + wait_seconds
+        while True:
+            try:
+                os.makedirs(self.__locks_directory, exist_ok=True)
+                if (
+                    os.path.exists(lock_path)
+                    and time.time() - os.path.getmtime(lock_path)
+                    > PropertyValueCache.REFRESH_LOCK_TIMEOUT_SECONDS
+                ):
+                    LOGGER.info("Lock '%s' has expired.", lock_path)
+                    os.remove(lock_path)
+                lock_descriptor = os.open(
+                    lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                )
+                break
+            except OSError as this_exception:
+                if time.monotonic() >= wait_deadline:
+                    LOGGER.info("Lock '%s' not taken: %s", lock_path, this_exception)
+                    return False
+            time.sleep(PropertyValueCache.__SAVE_LOCK_RETRY_SECONDS)
+        with os.fdopen(lock_descriptor, "wt", encoding="utf-8") as outfile:
+            outfile.write(str(os.getpid()))
+        return True
+
+    @staticmethod
+    def __release_lock(lock_path: str) -> None:
+        try:
+            os.remove(lock_path)
+        except OSError as this_exception:
+            LOGGER.debug("Lock '%s' not removed: %s", lock_path, this_exception)
+
+    def __get_refresh_lock_path(self, property_names: List[str]) -> str:
+        return self.__get_lock_path(
+            "\n".join([self.__current_directory] + sorted(property_names))
+        )
+
+    def __get_lock_path(self, lock_key: str) -> str:
+        path_hash = hashlib.sha256(lock_key.encode("utf-8")).hexdigest()
+        return os.path.join(self.__locks_directory, f"{path_hash[:32]}.lock")
+
+    @staticmethod
+    def __has_expired(cached_entry: Dict[str, Any], current_time: float) -> bool:
+        return (
+            cached_entry["expires"] is not None
+            and cached_entry["expires"] <= current_time
+        )
+
+    def __get_scope_key(self, cache_scope: PropertyCacheScope) -> Optional[str]:
+        if cache_scope == PropertyCacheScope.GLOBAL:
+            return str(cache_scope.value)
+        if cache_scope in (PropertyCacheScope.SESSION, PropertyCacheScope.BOOT):
+            if (
+                session_key := PropertyValueCache.__get_session_key(cache_scope)
+            ) is None:
+                return None
+            return f"{cache_scope.value}:{session_key}"
+        if cache_scope == PropertyCacheScope.REPOSITORY:
+            if self.__repository_root is None:
+                self.__repository_root = self.__find_repository_root()
+            if self.__repository_root:
+                return f"{cache_scope.value}:{self.__repository_root}"
+        return f"{PropertyCacheScope.DIRECTORY.value}:{self.__current_directory}"
+
+    @staticmethod
+    def __get_session_key(cache_scope: PropertyCacheScope) -> Optional[str]:
+        """Get a key that changes when the machine is restarted and, for the session
+        scope, when the login session changes.  Where the machine does not expose
+        these, None is returned and the values are not stored."""
+        try:
+            with open(
+                PropertyValueCache.BOOT_ID_PATH, "rt", encoding="utf-8"
+            ) as infile:
+                boot_key = infile.read().strip()
+        except OSError:
+            return None
+        if cache_scope == PropertyCacheScope.BOOT:
+            return boot_key
+        # Processes started from the same terminal share its session.
+        if not hasattr(os, "getsid"):
+            return None
+        try:
+            terminal_name = os.ttyname(0)
+        except OSError:
+            terminal_name = ""
+        return f"{boot_key}:{os.getsid(0)}:{terminal_name}"
+
+    def __find_repository_root(self) -> str:
+        searched_directories: Set[str] = set()
+        next_directory = self.__current_directory
+        while next_directory not in searched_directories:
+            if os.path.exists(os.path.join(next_directory, ".git")):
+                return next_directory
+            searched_directories.add(next_directory)
+            next_directory = os.path.dirname(next_directory)
+        return ""
+
+    def __load_scope(self, scope_key: str) -> Dict[str, Dict[str, Any]]:
+        if scope_key not in self.__loaded_scopes:
+            self.__loaded_scopes[scope_key] = self.__read_scope_file(scope_key)[1]
+        return self.__loaded_scopes[scope_key]
+
+    def __read_scope_file(
+        self, scope_key: str
+    ) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+        path_hash = hashlib.sha256(scope_key.encode("utf-8")).hexdigest()
+        scope_path = os.path.join(self.__values_directory, f"{path_hash[:32]}.json")
+        try:
+            with open(scope_path, "rt", encoding="utf-8") as infile:
+                scope_document = json.load(infile)
+            if scope_document["scope"] != scope_key:
+                return scope_path, {}
+            scope_values: Dict[str, Dict[str, Any]] = scope_document["values"]
+        except (OSError, ValueError, KeyError, TypeError) as this_exception:
+            LOGGER.debug(
+                "Property values '%s' not loaded: %s", scope_path, this_exception
+            )
+            return scope_path, {}
+        return scope_path, scope_values
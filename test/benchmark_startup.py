@@ -0,0 +1,303 @@
+"""
+Module to provide for a benchmark of how long the "run" command takes to start up
+when invoked from the prompt, broken down by phase and by import.
+
+The application is started through its entry script, as the prompt hook starts it,
+with the same environment variable that the hook sets, so that the cached prompt
+plan and the stored property values are used as they are for a real prompt.  The
+wall times and phases are measured without "-X importtime", which slows down every
+import, and the import times are collected by separate runs of the application.
+The time spent in imports is reported on its own, and is not subtracted from the
+phases, as modules that are imported lazily are imported within the phase that
+first needs them.  The time outside of the phases is the starting and stopping of
+the interpreter, along with the imports that happen before the first phase.
+
+To run the benchmark from the root of the project:
+
+    python -m test.benchmark_startup --count 50
+
+The results are written to publish/startup-benchmark.json.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyshell.phase_timings import PhaseTimings
+
+DEFAULT_SPAWN_COUNT = 20
+ENTRY_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py"
+)
+DEFAULT_OUTPUT_PATH = os.path.join("publish", "startup-benchmark.json")
+REPORTED_IMPORT_COUNT = 15
+PERCENTILES = [50, 95, 99]
+
+IMPORT_TIME_LINE_PATTERN = re.compile(
+    r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$"
+)
+
+
+class SpawnResult:
+    """
+    Class to provide for the measurements taken from a single spawn of the application.
+    """
+
+    def __init__(
+        self,
+        wall_time_ms: float,
+        phase_durations: Dict[str, float],
+        import_times: List[Tuple[str, float, float, int]],
+    ):
+        self.wall_time_ms = wall_time_ms
+        self.phase_durations = phase_durations
+        self.import_times = import_times
+
+    @property
+    def import_time_ms(self) -> float:
+        """
+        Total time spent importing modules, in milliseconds.
+        """
+        return sum(
+            cumulative_ms
+            for _, _, cumulative_ms, nesting_level in self.import_times
+            if nesting_level == 0
+        )
+
+    @property
+    def outside_phases_time_ms(self) -> float:
+        """
+        Time not accounted for by the application's own phases, which includes the
+        imports that happen before the first phase.
+        """
+        return max(0.0, self.wall_time_ms - sum(self.phase_durations.values()))
+
+
+def parse_import_times(import_time_output: str) -> List[Tuple[str, float, float, int]]:
+    """
+    Parse the output from "-X importtime" into tuples of the module name, the time
+    spent in the module itself, the cumulative time including the modules it
+    imported, and how deeply nested the import was.  Times are in milliseconds.
+    """
+    import_times = []
+    for next_line in import_time_output.splitlines():
+        if line_match := IMPORT_TIME_LINE_PATTERN.match(next_line):
+            import_times.append(
+                (
+                    line_match.group(4),
+                    int(line_match.group(1)) / 1000.0,
+                    int(line_match.group(2)) / 1000.0,
+                    (len(line_match.group(3)) - 1) // 2,
+                )
+            )
+    return import_times
+
+
+def calculate_percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Calculate the reported percentiles of the samples, using the nearest rank method.
+    """
+    if not samples:
+        return {}
+    sorted_samples = sorted(samples)
+    percentile_map = {
+        f"p{next_percentile}": sorted_samples[
+            max(0, math.ceil(next_percentile / 100.0 * len(sorted_samples)) - 1)
+        ]
+        for next_percentile in PERCENTILES
+    }
+    percentile_map["mean"] = sum(sorted_samples) / len(sorted_samples)
+    return percentile_map
+
+
+def spawn_application(
+    application_arguments: List[str],
+    environment: Dict[str, str],
+    measure_imports: bool = False,
+) -> SpawnResult:
+    """
+    Spawn the application once, as it is spawned by the prompt, returning the
+    measurements taken from it.  Only if asked are the import times measured, as
+    measuring them makes the application slower.
+    """
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        timings_path = os.path.join(temporary_directory, "timings.json")
+        spawn_environment = dict(environment)
+        spawn_environment[PhaseTimings.ENVIRONMENT_VARIABLE] = timings_path
+        spawn_environment["IS_PYSHELL_PS1"] = "1"
+
+        start_time = time.perf_counter()
+        completed_process = (
+            subprocess.run(  # nosec subprocess_without_shell_equals_true
+                [sys.executable]
+                + (["-X", "importtime"] if measure_imports else [])
+                + [ENTRY_SCRIPT_PATH]
+                + application_arguments,
+                env=spawn_environment,
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+        )
+        wall_time_ms = 1000.0 * (time.perf_counter() - start_time)
+        if completed_process.returncode:
+            raise AssertionError(
+                f"Application failed with return code {completed_process.returncode}:\n"
+                + completed_process.stderr
+            )
+
+        phase_durations: Dict[str, float] = {}
+        if os.path.exists(timings_path):
+            with open(timings_path, "rt", encoding="utf-8") as infile:
+                phase_durations = json.load(infile)
+    return SpawnResult(
+        wall_time_ms, phase_durations, parse_import_times(completed_process.stderr)
+    )
+
+
+def summarize_spawns(
+    spawn_results: List[SpawnResult], import_results: List[SpawnResult]
+) -> Dict[str, Any]:
+    """
+    Summarize the measurements from a series of spawns, taking the import times
+    from a separate series of spawns that measured them.
+    """
+    phase_samples: Dict[str, List[float]] = {
+        "outside_phases": [i.outside_phases_time_ms for i in spawn_results],
+    }
+    for next_result in spawn_results:
+        for phase_name, phase_duration in next_result.phase_durations.items():
+            phase_samples.setdefault(phase_name, []).append(phase_duration)
+
+    self_import_samples: Dict[str, List[float]] = {}
+    for next_result in import_results:
+        for module_name, self_ms, _, _ in next_result.import_times:
+            self_import_samples.setdefault(module_name, []).append(self_ms)
+    slowest_imports = sorted(
+        (
+            (module_name, sorted(samples)[len(samples) // 2])
+            for module_name, samples in self_import_samples.items()
+        ),
+        key=lambda module_and_time: module_and_time[1],
+        reverse=True,
+    )[:REPORTED_IMPORT_COUNT]
+
+    return {
+        "spawns": len(spawn_results),
+        "wall_ms": calculate_percentiles([i.wall_time_ms for i in spawn_results]),
+        "imports_ms": calculate_percentiles([i.import_time_ms for i in import_results]),
+        "phases_ms": {
+            phase_name: calculate_percentiles(samples)
+            for phase_name, samples in phase_samples.items()
+        },
+        "slowest_imports_ms": dict(slowest_imports),
+    }
+
+
+def run_benchmark(spawn_count: int, application_arguments: List[str]) -> Dict[str, Any]:
+    """
+    Measure the application when cold, with no compiled bytecode or cached prompt
+    information available, and when warm, with both left by an earlier run.
+    """
+    base_environment = dict(os.environ)
+    base_environment.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    with tempfile.TemporaryDirectory() as cache_directory:
+        warm_environment = dict(base_environment)
+        warm_environment["XDG_CACHE_HOME"] = cache_directory
+        spawn_application(application_arguments, warm_environment)
+        warm_results = [
+            spawn_application(application_arguments, warm_environment)
+            for _ in range(spawn_count)
+        ]
+        warm_import_results = [
+            spawn_application(application_arguments, warm_environment, True)
+            for _ in range(spawn_count)
+        ]
+
+    cold_results = []
+    cold_import_results = []
+    for measure_imports in (False, True):
+        for _ in range(spawn_count):
+            with tempfile.TemporaryDirectory() as cold_directory:
+                cold_environment = dict(base_environment)
+                cold_environment["PYTHONPYCACHEPREFIX"] = os.path.join(
+                    cold_directory, "bytecode"
+                )
+                cold_environment["XDG_CACHE_HOME"] = os.path.join(
+                    cold_directory, "cache"
+                )
+                (cold_import_results if measure_imports else cold_results).append(
+                    spawn_application(
+                        application_arguments, cold_environment, measure_imports
+                    )
+                )
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "arguments": application_arguments,
+        "cold": summarize_spawns(cold_results, cold_import_results),
+        "warm": summarize_spawns(warm_results, warm_import_results),
+    }
+
+
+def main(direct_args: Optional[List[str]] = None) -> None:
+    """
+    Run the benchmark and write the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the startup latency of the 'run' command."
+    )
+    parser.add_argument(
+        "--count",
+        dest="spawn_count",
+        type=int,
+        default=DEFAULT_SPAWN_COUNT,
+        help="number of times to spawn the application for each measurement",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output_path",
+        default=DEFAULT_OUTPUT_PATH,
+        help="file to write the JSON results to",
+    )
+    parser.add_argument(
+        "application_arguments",
+        nargs="*",
+        default=["run"],
+        help="arguments to pass to the application, defaulting to 'run'",
+    )
+    args = parser.parse_args(args=direct_args)
+
+    benchmark_results = run_benchmark(args.spawn_count, args.application_arguments)
+    output_directory = os.path.dirname(args.output_path)
+    if output_directory:
+        os.makedirs(output_directory, exist_ok=True)
+    with open(args.output_path, "wt", encoding="utf-8") as outfile:
+        json.dump(benchmark_results, outfile, indent=2)
+
+    for run_type in ("cold", "warm"):
+        run_results = benchmark_results[run_type]
+        print(
+            f"{run_type}: p50={run_results['wall_ms']['p50']:.1f}ms "
+            + f"p95={run_results['wall_ms']['p95']:.1f}ms "
+            + f"p99={run_results['wall_ms']['p99']:.1f}ms "
+            + f"imports p50={run_results['imports_ms']['p50']:.1f}ms"
+        )
+        for phase_name, phase_percentiles in run_results["phases_ms"].items():
+            print(f"  {phase_name}: p50={phase_percentiles['p50']:.2f}ms")
+    print(f"Results written to '{args.output_path}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from typing import List
 import pytest
 
 from pyshell.application_configuration_helper import ApplicationConfigurationHelper
+from pyshell.data_sources.git_data_source import GitDataSource
 from pyshell.data_sources.system_data_source import SystemDataSource
 from pyshell.file_path_helpers import FilePathHelpers
 
@@ -57,25 +58,53 @@ def mock_gethostname_impl(monkeypatch):
     monkeypatch.setattr(socket, "gethostname", mock_return)
 
 
+class MockPopen:
+    """Stand-in for a process started with subprocess.Popen, that has already
+    completed with the given output."""
+
+    def __init__(self, return_code: int, out_text: str, out_error: str) -> None:
+        self.returncode = return_code
+        self.pid = 0
+        self.__out_text = out_text
+        self.__out_error = out_error
+
+    def __enter__(self) -> "MockPopen":
+        return self
+
+    def __exit__(self, *args) -> None:
+        _ = args
+
+    def communicate(self, timeout=None):
+        """Return the output of the process."""
+        _ = timeout
+        return self.__out_text, self.__out_error
+
+    def kill(self) -> None:
+        """Nothing to kill, as the process has already completed."""
+
+
 @pytest.fixture(name="mock_subprocess_run_git_branch")
 def mock_subprocess_run_git_branch_impl(monkeypatch):
-    """Mock for our own os.path.abspath that can somewhat handle windows and linux."""
+    """Mock for reading the current branch from the HEAD file, or for starting git
+    to ask for it."""
+
+    def mock_read_head(git_directory: str) -> str:
+        _ = git_directory
+        return f"ref: refs/heads/{MOCK_GIT_BRANCH_NAME}"
 
     def mock_return(cargs: List[str], *args, **kwargs):
 
-        _ = args
+        _ = (args, kwargs)
         if cargs[0] == "git" and cargs[1] == "branch":
             out_text = f"* {MOCK_GIT_BRANCH_NAME}"
             out_error = ""
         else:
             out_text = ""
             out_error = ""
+        return MockPopen(0, out_text, out_error)
 
-        std_output = out_text if "text" in kwargs else io.StringIO(out_text)
-        std_error = out_error if "text" in kwargs else io.StringIO(out_error)
-        return InProcessResult(0, std_output, std_error)
-
-    monkeypatch.setattr(subprocess, "run", mock_return)
+    monkeypatch.setattr(GitDataSource, "_read_head", staticmethod(mock_read_head))
+    monkeypatch.setattr(subprocess, "Popen", mock_return)
 
 
 @pytest.fixture(name="mock_subprocess_run_df")
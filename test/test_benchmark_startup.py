@@ -0,0 +1,145 @@
+"""Module to provide tests for the startup benchmark and the phase timings it uses.
+"""
+
+import json
+import os
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+from test.benchmark_startup import (
+    ENTRY_SCRIPT_PATH,
+    SpawnResult,
+    calculate_percentiles,
+    parse_import_times,
+    spawn_application,
+    summarize_spawns,
+)
+from test.test_main_line import ApplicationMainline
+from test.utils import create_temporary_configuration_file
+
+from pyshell.phase_timings import PhaseTimings
+
+
+def test_benchmark_startup_parse_import_times() -> None:
+    """Test to verify that the output from "-X importtime" is parsed."""
+
+    # Arrange
+    import_time_output = """import time: self [us] | cumulative | imported package
+import time:       150 |        150 | _io
+import time:      1200 |       1500 |   yaml.reader
+import time:       500 |       2000 | yaml
+not an import line
+"""
+
+    # Act
+    import_times = parse_import_times(import_time_output)
+
+    # Assert
+    assert import_times == [
+        ("_io", 0.15, 0.15, 0),
+        ("yaml.reader", 1.2, 1.5, 1),
+        ("yaml", 0.5, 2.0, 0),
+    ]
+
+
+def test_benchmark_startup_calculate_percentiles() -> None:
+    """Test to verify that percentiles are calculated using the nearest rank method."""
+
+    # Arrange
+    samples = [float(i) for i in range(100, 0, -1)]
+
+    # Act
+    percentiles = calculate_percentiles(samples)
+
+    # Assert
+    assert percentiles == {"p50": 50.0, "p95": 95.0, "p99": 99.0, "mean": 50.5}
+
+
+def test_benchmark_startup_summarize_spawns() -> None:
+    """Test to verify that the time spent in imports is taken from the runs that
+    measured it and reported separately, while the wall time and the phases are
+    taken from the runs that did not."""
+
+    # Arrange
+    spawn_result = SpawnResult(100.0, {"config_load": 20.0, "evaluate": 30.0}, [])
+    import_result = SpawnResult(
+        150.0,
+        {"config_load": 25.0, "evaluate": 35.0},
+        [("yaml.reader", 1.0, 1.0, 1), ("yaml", 9.0, 10.0, 0), ("json", 5.0, 5.0, 0)],
+    )
+
+    # Act
+    spawn_summary = summarize_spawns([spawn_result], [import_result])
+
+    # Assert
+    assert spawn_summary["wall_ms"]["p50"] == 100.0
+    assert spawn_summary["imports_ms"]["p50"] == 15.0
+    assert {
+        phase_name: phase_percentiles["p50"]
+        for phase_name, phase_percentiles in spawn_summary["phases_ms"].items()
+    } == {"outside_phases": 50.0, "config_load": 20.0, "evaluate": 30.0}
+    assert spawn_summary["slowest_imports_ms"] == {
+        "yaml": 9.0,
+        "json": 5.0,
+        "yaml.reader": 1.0,
+    }
+
+
+def test_benchmark_startup_spawn_application(monkeypatch) -> None:
+    """Test to verify that the application is spawned through its entry script as
+    if invoked from the prompt, and that "-X importtime" is only used when the
+    import times are being measured."""
+
+    # Arrange
+    spawned_processes = []
+
+    def record_process(process_arguments, env, **_):
+        spawned_processes.append((process_arguments, env))
+        return subprocess.CompletedProcess(process_arguments, 0, "", "")
+
+    monkeypatch.setattr(subprocess, "run", record_process)
+
+    # Act
+    spawn_application(["run"], {})
+    spawn_application(["run"], {}, True)
+
+    # Assert
+    assert spawned_processes[0][0] == [sys.executable, ENTRY_SCRIPT_PATH, "run"]
+    assert spawned_processes[1][0] == [
+        sys.executable,
+        "-X",
+        "importtime",
+        ENTRY_SCRIPT_PATH,
+        "run",
+    ]
+    assert all(i[1]["IS_PYSHELL_PS1"] == "1" for i in spawned_processes)
+
+
+def test_mainline_phase_timings_written(monkeypatch) -> None:
+    """Test to verify that when requested, the duration of each phase of the "run"
+    command is written to the requested file."""
+
+    # Arrange
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        timings_path = os.path.join(temporary_directory, "timings.json")
+        monkeypatch.setenv(PhaseTimings.ENVIRONMENT_VARIABLE, timings_path)
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = ["--config", config_path, "run"]
+
+            # Act
+            execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+        # Assert
+        execute_result.assert_results("-->\a".replace("\a", " "), "", 0)
+        with open(timings_path, "rt", encoding="utf-8") as infile:
+            phase_durations = json.load(infile)
+    assert list(phase_durations.keys()) == [
+        "argparse",
+        "config_load",
+        "logging_init",
+        "managers_init",
+        "evaluate",
+        "generate",
+    ]
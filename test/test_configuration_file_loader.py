@@ -0,0 +1,118 @@
+"""Module to provide tests for the ConfigurationFileLoader class.
+"""
+
+from test.utils import create_temporary_configuration_file
+from typing import List, Optional, Tuple
+
+from application_properties import ApplicationProperties
+
+from pyshell.configuration_file_loader import ConfigurationFileLoader
+
+JSON_FORMAT = ConfigurationFileLoader.JSON_FORMAT
+YAML_FORMAT = ConfigurationFileLoader.YAML_FORMAT
+TOML_FORMAT = ConfigurationFileLoader.TOML_FORMAT
+
+
+def test_configuration_file_loader_guess_formats_from_extension() -> None:
+    """Test to verify that the extension of the file decides the format tried first."""
+
+    # Arrange
+    files_to_check = [
+        ("config.json", [JSON_FORMAT, YAML_FORMAT, TOML_FORMAT]),
+        ("config.YAML", [YAML_FORMAT, JSON_FORMAT, TOML_FORMAT]),
+        ("config.yml", [YAML_FORMAT, JSON_FORMAT, TOML_FORMAT]),
+        ("config.toml", [TOML_FORMAT, JSON_FORMAT, YAML_FORMAT]),
+    ]
+
+    # Act
+    # Assert
+    for file_name, expected_formats in files_to_check:
+        assert (
+            ConfigurationFileLoader.guess_formats(file_name, b'{"a": 1}')
+            == expected_formats
+        ), file_name
+
+
+def test_configuration_file_loader_guess_formats_from_contents() -> None:
+    """Test to verify that without a known extension, the contents of the file
+    decide the format tried first."""
+
+    # Arrange
+    contents_to_check = [
+        (b'  {"a": 1}', JSON_FORMAT),
+        (b"a: 1\n", YAML_FORMAT),
+        (b"# comment\n\n[items.prompt]\ntype = 'text'\n", TOML_FORMAT),
+        (b"a = 1\n", TOML_FORMAT),
+        (b"- [a, b]\n", YAML_FORMAT),
+        (b"", YAML_FORMAT),
+    ]
+
+    # Act
+    # Assert
+    for file_contents, expected_format in contents_to_check:
+        assert (
+            ConfigurationFileLoader.guess_formats(".pyshell.cfg", file_contents)[0]
+            == expected_format
+        ), str(file_contents)
+
+
+def test_configuration_file_loader_parse_falls_back() -> None:
+    """Test to verify that if the most likely format cannot parse the contents, the
+    other formats are tried."""
+
+    # Arrange
+    contents_to_check: List[Tuple[str, bytes, Optional[str]]] = [
+        ("config.toml", b'{"a": 1}', JSON_FORMAT),
+        ("config.json", b"a: 1\n", YAML_FORMAT),
+        ("config.yaml", b"[a]\nb = 1\n", TOML_FORMAT),
+        ("config.cfg", b"abc", None),
+    ]
+
+    # Act
+    # Assert
+    for file_name, file_contents, expected_format in contents_to_check:
+        file_format, _ = ConfigurationFileLoader.parse(file_name, file_contents)
+        assert file_format == expected_format, file_name
+
+
+def test_configuration_file_loader_load_and_set_toml() -> None:
+    """Test to verify that a TOML file is loaded into the properties."""
+
+    # Arrange
+    properties = ApplicationProperties()
+    reported_errors: List[str] = []
+    with create_temporary_configuration_file(
+        "[items.prompt]\ntype = 'text'\ntext = '$ '\n"
+    ) as configuration_file:
+
+        # Act
+        ConfigurationFileLoader.load_and_set(
+            properties,
+            configuration_file,
+            lambda message, _: reported_errors.append(message),
+        )
+
+    # Assert
+    assert not reported_errors
+    assert properties.get_string_property("items.prompt.text") == "$ "
+
+
+def test_configuration_file_loader_load_and_set_not_a_map() -> None:
+    """Test to verify that a file whose contents are not a map is reported."""
+
+    # Arrange
+    properties = ApplicationProperties()
+    reported_errors: List[str] = []
+    with create_temporary_configuration_file("- a\n- b\n") as configuration_file:
+
+        # Act
+        ConfigurationFileLoader.load_and_set(
+            properties,
+            configuration_file,
+            lambda message, _: reported_errors.append(message),
+        )
+
+        # Assert
+        assert reported_errors == [
+            f"Specified configuration file '{configuration_file}' is not a valid YAML file."
+        ]
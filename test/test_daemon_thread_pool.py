@@ -0,0 +1,77 @@
+"""
+Tests for the DaemonThreadPool class.
+"""
+
+import threading
+
+import pytest
+
+from pyshell.daemon_thread_pool import DaemonThreadPool
+
+
+def test_daemon_thread_pool_results() -> None:
+    """Test to verify that the result, or the exception, of each piece of work is
+    given to its future."""
+
+    # Arrange
+    thread_pool = DaemonThreadPool(2, "test-pool")
+
+    # Act
+    good_future = thread_pool.submit(pow, 2, 10)
+    bad_future = thread_pool.submit(int, "not a number")
+
+    # Assert
+    assert good_future.result(timeout=5) == 1024
+    with pytest.raises(ValueError):
+        bad_future.result(timeout=5)
+
+
+def test_daemon_thread_pool_bounded() -> None:
+    """Test to verify that work that is stuck does not cause more threads to be
+    started than the pool allows, and that its threads are daemon threads."""
+
+    # Arrange
+    thread_pool = DaemonThreadPool(2, "test-pool")
+    release_event = threading.Event()
+
+    # Act
+    try:
+        stuck_futures = [thread_pool.submit(release_event.wait, 5) for _ in range(5)]
+        stuck_thread_count = thread_pool.thread_count
+        pool_threads = [
+            i for i in threading.enumerate() if i.name.startswith("test-pool-")
+        ]
+    finally:
+        release_event.set()
+    stuck_results = [i.result(timeout=5) for i in stuck_futures]
+
+    # Assert
+    assert stuck_thread_count == 2
+    assert pool_threads and all(i.daemon for i in pool_threads)
+    assert stuck_results == [True] * 5
+    assert thread_pool.thread_count == 2
+
+
+def test_daemon_thread_pool_raise_max_workers() -> None:
+    """Test to verify that raising the number of threads the pool allows lets new
+    work start while the existing threads are stuck, and that it is never lowered."""
+
+    # Arrange
+    thread_pool = DaemonThreadPool(1, "test-pool")
+    release_event = threading.Event()
+
+    # Act
+    try:
+        stuck_future = thread_pool.submit(release_event.wait, 5)
+        thread_pool.max_workers = 2
+        next_result = thread_pool.submit(pow, 2, 3).result(timeout=5)
+        thread_pool.max_workers = 1
+        lowered_max_workers = thread_pool.max_workers
+    finally:
+        release_event.set()
+
+    # Assert
+    assert next_result == 8
+    assert lowered_max_workers == 2
+    assert stuck_future.result(timeout=5)
+    assert thread_pool.thread_count == 2
@@ -2,11 +2,39 @@
 Tests for the DataSourceManager module.
 """
 
-from test.test_data_sources import OtherTestDataSource, SimpleTestDataSource
+import asyncio
+import json
+import logging
+import os
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+import threading
+import time
+from test.test_data_sources import (
+    AsyncTestDataSource,
+    CachedTestDataSource,
+    ComposedTestDataSource,
+    ConcurrentTestDataSource,
+    OtherTestDataSource,
+    SimpleTestDataSource,
+    SlowTestDataSource,
+)
+from typing import List
+
+import pytest
+from application_properties import ApplicationProperties
 
 from pyshell.data_source_manager import DataSourceManager
-from pyshell.data_sources.base_data_source import PropertyPath
+from pyshell.data_sources.base_data_source import (
+    BaseDataSource,
+    PropertyDependency,
+    PropertyPath,
+    property_resolver,
+)
 from pyshell.line_item_manager import LineItemManager, PropertyItem, TextItem
+from pyshell.line_items.property_item import ItemRefreshMode
+from pyshell.property_value_cache import PropertyValueCache
 from pyshell.pyshell_exception import PyShellException
 
 
@@ -559,3 +587,873 @@ def test_data_source_evaluate_redirect_dynamic_not_present() -> None:
 
     # Assert
     assert value_cache == {"simple_test.dynamic_a": ""}
+
+
+def test_data_source_evaluate_parallel_resolves_at_same_time() -> None:
+    """Test to verify that with more than one worker, independent properties are
+    resolved at the same time."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(max_workers=2)
+    data_source_manager.register_data_source(
+        ConcurrentTestDataSource(["slow_a", "slow_b"])
+    )
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("concurrent_test", "slow_a"))
+    line_item_manager.register_item(PropertyItem("concurrent_test", "slow_b"))
+
+    value_cache = {}
+
+    # Act
+    data_source_manager.evaluate(value_cache, line_item_manager)
+
+    # Assert
+    assert value_cache == {
+        "concurrent_test.slow_a": "slow_a",
+        "concurrent_test.slow_b": "slow_b",
+    }
+
+
+def test_data_source_evaluate_parallel_first_alternatives() -> None:
+    """Test to verify that with more than one worker, the first alternative of a
+    composed property is resolved at the same time as the properties referenced
+    directly, and that the later alternatives are never resolved once the first
+    one has a value."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(max_workers=4)
+    concurrent_data_source = ConcurrentTestDataSource(["slow_a", "slow_b"])
+    data_source_manager.register_data_source(concurrent_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("concurrent_test", "first_of"))
+    line_item_manager.register_item(PropertyItem("concurrent_test", "slow_b"))
+
+    value_cache = {}
+
+    # Act
+    data_source_manager.evaluate(value_cache, line_item_manager)
+
+    # Assert
+    assert value_cache == {
+        "concurrent_test.slow_a": "slow_a",
+        "concurrent_test.first_of": "slow_a",
+        "concurrent_test.slow_b": "slow_b",
+    }
+    assert sorted(concurrent_data_source.resolved_names) == ["slow_a", "slow_b"]
+
+
+def test_data_source_evaluate_parallel_keeps_composer_order() -> None:
+    """Test to verify that with more than one worker, a composed property whose
+    first alternative is empty still goes on to take the next non-empty
+    alternative."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(max_workers=4)
+    concurrent_data_source = ConcurrentTestDataSource(["slow_a", "slow_b"])
+    data_source_manager.register_data_source(concurrent_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("concurrent_test", "empty_first_of"))
+    line_item_manager.register_item(PropertyItem("concurrent_test", "slow_a"))
+    line_item_manager.register_item(PropertyItem("concurrent_test", "slow_b"))
+
+    value_cache = {}
+
+    # Act
+    data_source_manager.evaluate(value_cache, line_item_manager)
+
+    # Assert
+    assert value_cache == {
+        "concurrent_test.empty": "",
+        "concurrent_test.other": "other",
+        "concurrent_test.empty_first_of": "other",
+        "concurrent_test.slow_a": "slow_a",
+        "concurrent_test.slow_b": "slow_b",
+    }
+    assert concurrent_data_source.resolved_names.count("other") == 1
+
+
+def test_data_source_evaluate_parallel_cyclic() -> None:
+    """Test to verify that with more than one worker, cycles are reported in the
+    same way."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(max_workers=2)
+    data_source_manager.register_data_source(SimpleTestDataSource())
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("simple_test", "static_a"))
+    line_item_manager.register_item(PropertyItem("simple_test", "long_cycle_1"))
+
+    value_cache = {}
+
+    # Act
+    try:
+        data_source_manager.evaluate(value_cache, line_item_manager)
+
+        # Assert
+        assert False, "Should have cycled by now"  # noqa: B011
+    except PyShellException as this_exception:
+        assert (
+            str(this_exception)
+            == "Dependency cycle encountered: simple_test.long_cycle_1->simple_test.long_cycle_2->simple_test.long_cycle_3->simple_test.long_cycle_1"
+        )
+
+
+def test_data_source_evaluate_async_properties_on_one_event_loop() -> None:
+    """Test to verify that "async" resolvers are all awaited at the same time, on a
+    single event loop, alongside normal resolvers."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    async_data_source = AsyncTestDataSource()
+    data_source_manager.register_data_source(async_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("async_test", "ping"))
+    line_item_manager.register_item(PropertyItem("async_test", "sync"))
+    line_item_manager.register_item(PropertyItem("async_test", "pong"))
+    line_item_manager.register_item(PropertyItem("async_test", "echo"))
+
+    value_cache = {}
+
+    # Act
+    data_source_manager.evaluate(value_cache, line_item_manager)
+
+    # Assert
+    assert value_cache == {
+        "async_test.ping": "ping",
+        "async_test.sync": "sync",
+        "async_test.pong": "pong",
+        "async_test.echo": "echo",
+    }
+    assert len(async_data_source.event_loops) == 2
+    assert async_data_source.event_loops[0] is async_data_source.event_loops[1]
+
+
+def test_data_source_get_property_async_resolver() -> None:
+    """Test to verify that a property with an "async" resolver can be fetched on its
+    own, without a running event loop."""
+
+    # Arrange
+    async_data_source = AsyncTestDataSource()
+
+    # Act
+    property_value = async_data_source.get_property("echo")
+
+    # Assert
+    assert async_data_source.is_async_property("echo")
+    assert not async_data_source.is_async_property("sync")
+    assert property_value == "echo"
+
+
+def test_data_source_execute_subprocess_async_failure() -> None:
+    """Test to verify that a failing process raises an error if asked to check for
+    success."""
+
+    # Arrange
+    async_data_source = AsyncTestDataSource()
+    failing_arguments = [sys.executable, "-c", "import sys; sys.exit(3)"]
+
+    # Act
+    completed_process = asyncio.run(
+        async_data_source._execute_subprocess_async(
+            failing_arguments, check_for_success=False
+        )
+    )
+    try:
+        asyncio.run(async_data_source._execute_subprocess_async(failing_arguments))
+
+        # Assert
+        assert False, "Should have raised an exception by now."  # noqa: B011
+    except subprocess.CalledProcessError as this_exception:
+        assert this_exception.returncode == 3
+    assert completed_process.returncode == 3
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups not supported")
+def test_data_source_execute_subprocess_timeout() -> None:
+    """Test to verify that a process that runs for too long is killed, along with
+    the processes that it started, and is treated as having failed with no output."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    simple_data_source = SimpleTestDataSource()
+    data_source_manager.register_data_source(simple_data_source)
+    data_source_manager.registration_completed()
+    start_time = time.monotonic()
+
+    # Act
+    completed_process = simple_data_source._execute_subprocess(
+        ["sh", "-c", "echo partial; sleep 30 & wait"],
+        check_for_success=False,
+        timeout=0.2,
+    )
+
+    # Assert
+    assert time.monotonic() - start_time < 5
+    assert completed_process.returncode != 0
+    assert completed_process.stdout == ""
+    assert simple_data_source.subprocess_timeout_count == 1
+    assert data_source_manager.subprocess_timeout_count == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups not supported")
+def test_data_source_execute_subprocess_timeout_when_checked() -> None:
+    """Test to verify that a process that runs for too long has an empty result even
+    if success is asked for, and that processes timing out on several threads at
+    once are all counted."""
+
+    # Arrange
+    simple_data_source = SimpleTestDataSource()
+    completed_processes = []
+
+    def execute_sleeping_process() -> None:
+        completed_processes.append(
+            simple_data_source._execute_subprocess(
+                [sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.2
+            )
+        )
+
+    executing_threads = [
+        threading.Thread(target=execute_sleeping_process) for _ in range(4)
+    ]
+
+    # Act
+    for next_thread in executing_threads:
+        next_thread.start()
+    for next_thread in executing_threads:
+        next_thread.join()
+
+    # Assert
+    assert [i.stdout for i in completed_processes] == [""] * 4
+    assert simple_data_source.subprocess_timeout_count == 4
+
+
+def test_data_source_execute_subprocess_async_timeout() -> None:
+    """Test to verify that the timeout of the data source applies to processes
+    started by "async" resolvers, unless another timeout is asked for."""
+
+    # Arrange
+    async_data_source = AsyncTestDataSource(subprocess_timeout=0.2)
+    sleeping_arguments = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+    # Act
+    completed_process = asyncio.run(
+        async_data_source._execute_subprocess_async(sleeping_arguments)
+    )
+    other_completed_process = asyncio.run(
+        async_data_source._execute_subprocess_async(
+            [sys.executable, "-c", "print('echo')"], timeout=5
+        )
+    )
+
+    # Assert
+    assert completed_process.returncode != 0
+    assert completed_process.stdout == ""
+    assert other_completed_process.stdout.strip() == "echo"
+    assert async_data_source.subprocess_timeout_count == 1
+
+
+def test_data_source_registration_composer_cycle() -> None:
+    """Test to verify that a cycle between composed properties is reported when the
+    registration is completed, before any evaluation."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    data_source_manager.register_data_source(
+        ComposedTestDataSource(
+            "composed_test",
+            [
+                ("first", "composed_test.second"),
+                ("second", "composed_test.third"),
+                ("third", "composed_test.first"),
+            ],
+        )
+    )
+
+    # Act
+    try:
+        data_source_manager.registration_completed()
+
+        # Assert
+        assert False, "Should have cycled by now"  # noqa: B011
+    except PyShellException as this_exception:
+        assert (
+            str(this_exception)
+            == "Dependency cycle encountered: composed_test.first->composed_test.second->composed_test.third->composed_test.first"
+        )
+
+
+def test_data_source_registration_dynamic_dependency_cycle() -> None:
+    """Test to verify that a cycle closed by dynamic dependencies between two data
+    sources is reported when the registration is completed."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    data_source_manager.register_data_source(
+        ComposedTestDataSource(
+            "composed_test",
+            [("first", "composed_test.leaf")],
+            dependencies_to_inject=[
+                PropertyDependency(
+                    "first", PropertyPath.from_one("other_composed.first")
+                )
+            ],
+        )
+    )
+    data_source_manager.register_data_source(
+        ComposedTestDataSource(
+            "other_composed",
+            [("first", "other_composed.leaf")],
+            dependencies_to_inject=[
+                PropertyDependency(
+                    "first", PropertyPath.from_one("composed_test.first")
+                )
+            ],
+        )
+    )
+
+    # Act
+    try:
+        data_source_manager.registration_completed()
+
+        # Assert
+        assert False, "Should have cycled by now"  # noqa: B011
+    except PyShellException as this_exception:
+        assert (
+            str(this_exception)
+            == "Dependency cycle encountered: composed_test.first->other_composed.first->composed_test.first"
+        )
+
+
+def test_data_source_evaluate_long_composer_chain() -> None:
+    """Test to verify that a chain of composed properties that is longer than the
+    recursion limit can be evaluated."""
+
+    # Arrange
+    chain_length = sys.getrecursionlimit() + 100
+    data_source_manager = DataSourceManager()
+    data_source_manager.register_data_source(
+        ComposedTestDataSource(
+            "composed_test",
+            [
+                (f"chain_{i}", f"composed_test.chain_{i + 1}")
+                for i in range(chain_length)
+            ]
+            + [(f"chain_{chain_length}", "composed_test.leaf")],
+        )
+    )
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("composed_test", "chain_0"))
+
+    value_cache = {}
+
+    # Act
+    data_source_manager.evaluate(value_cache, line_item_manager)
+
+    # Assert
+    assert value_cache["composed_test.chain_0"] == "leaf"
+    assert value_cache[f"composed_test.chain_{chain_length}"] == "leaf"
+    assert len(value_cache) == chain_length + 2
+
+
+def test_data_source_long_composer_chain_volatile_and_translation() -> None:
+    """Test to verify that the volatility and the shell translation of a chain of
+    composed properties that is longer than the recursion limit can be found."""
+
+    # Arrange
+    chain_length = sys.getrecursionlimit() + 100
+    data_source_manager = DataSourceManager()
+    data_source_manager.register_data_source(
+        ComposedTestDataSource(
+            "composed_test",
+            [
+                (f"chain_{i}", f"composed_test.chain_{i + 1}")
+                for i in range(chain_length)
+            ]
+            + [(f"chain_{chain_length}", "composed_test.leaf")],
+        )
+    )
+    data_source_manager.registration_completed()
+
+    # Act
+    is_volatile = data_source_manager.is_volatile_property(
+        PropertyPath("composed_test", "chain_0")
+    )
+    shell_translation = data_source_manager.get_shell_translation(
+        PropertyPath("composed_test", "chain_0"), "value"
+    )
+
+    # Assert
+    assert not is_volatile
+    assert shell_translation == 'value=""'
+
+
+def test_data_source_evaluate_global_deadline(caplog) -> None:
+    """Test to verify that a property that does not resolve within the deadline is
+    left out of the cache, along with any composed property that depends on it."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(deadline_ms=100)
+    slow_data_source = SlowTestDataSource()
+    data_source_manager.register_data_source(slow_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("slow_test", "fast"))
+    line_item_manager.register_item(PropertyItem("slow_test", "slow"))
+    line_item_manager.register_item(PropertyItem("slow_test", "first_of"))
+
+    value_cache = {}
+
+    # Act
+    try:
+        with caplog.at_level(logging.WARNING):
+            data_source_manager.evaluate(value_cache, line_item_manager)
+    finally:
+        slow_data_source.release_event.set()
+
+    # Assert
+    assert value_cache == {"slow_test.fast": "fast"}
+    assert (
+        "Property 'slow_test.slow' did not resolve within its deadline of 100 ms."
+        in caplog.text
+    )
+
+
+def test_data_source_evaluate_item_deadline() -> None:
+    """Test to verify that a deadline given for a single item only applies to the
+    properties needed by that item."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    slow_data_source = SlowTestDataSource()
+    data_source_manager.register_data_source(slow_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(
+        PropertyItem("slow_test", "slow", deadline_ms=50, placeholder="?")
+    )
+    line_item_manager.register_item(PropertyItem("slow_test", "fast", prefix=" "))
+
+    value_cache = {}
+
+    # Act
+    try:
+        data_source_manager.evaluate(value_cache, line_item_manager)
+    finally:
+        slow_data_source.release_event.set()
+    rendered_line = "".join(
+        next_item.generate_line_segements(value_cache)
+        for next_item in line_item_manager.line_items
+    )
+
+    # Assert
+    assert value_cache == {"slow_test.fast": "fast"}
+    assert rendered_line == "? fast"
+
+
+def test_data_source_evaluate_deadline_reuses_stuck_resolver() -> None:
+    """Test to verify that a property still being resolved after its deadline is not
+    resolved again by later prompts, and that no more threads are started than the
+    number of properties with deadlines."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(deadline_ms=20)
+    slow_data_source = SlowTestDataSource()
+    data_source_manager.register_data_source(slow_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("slow_test", "slow"))
+    line_item_manager.register_item(PropertyItem("slow_test", "fast"))
+    threads_before = threading.active_count()
+
+    # Act
+    try:
+        stuck_caches = []
+        for _ in range(5):
+            stuck_caches.append({})
+            data_source_manager.evaluate(stuck_caches[-1], line_item_manager)
+        stuck_thread_count = threading.active_count() - threads_before
+        stuck_slow_count = slow_data_source.slow_count
+    finally:
+        slow_data_source.release_event.set()
+    released_cache = {}
+    data_source_manager.evaluate(released_cache, line_item_manager)
+
+    # Assert
+    assert all(i == {"slow_test.fast": "fast"} for i in stuck_caches)
+    assert stuck_thread_count <= 2
+    assert stuck_slow_count == 1
+    assert released_cache == {"slow_test.slow": "slow", "slow_test.fast": "fast"}
+
+
+def test_data_source_evaluate_deadline_new_context(monkeypatch) -> None:
+    """Test to verify that a resolver still running from an earlier prompt is not
+    reused once the current directory or the environment changes, as its value may
+    belong to the earlier directory or environment."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(deadline_ms=20)
+    slow_data_source = SlowTestDataSource()
+    data_source_manager.register_data_source(slow_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("slow_test", "slow"))
+    line_item_manager.register_item(PropertyItem("slow_test", "fast"))
+
+    # Act
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_directory = os.path.join(temporary_directory, "first")
+        second_directory = os.path.join(temporary_directory, "second")
+        os.makedirs(first_directory)
+        os.makedirs(second_directory)
+        try:
+            stuck_caches = []
+            monkeypatch.chdir(first_directory)
+            for _ in range(2):
+                stuck_caches.append({})
+                data_source_manager.evaluate(stuck_caches[-1], line_item_manager)
+            same_context_slow_count = slow_data_source.slow_count
+            monkeypatch.chdir(second_directory)
+            stuck_caches.append({})
+            data_source_manager.evaluate(stuck_caches[-1], line_item_manager)
+            monkeypatch.setenv("PYSHELL_TEST_CONTEXT", "other")
+            stuck_caches.append({})
+            data_source_manager.evaluate(stuck_caches[-1], line_item_manager)
+            new_context_slow_count = slow_data_source.slow_count
+        finally:
+            slow_data_source.release_event.set()
+            monkeypatch.undo()
+
+    # Assert
+    assert stuck_caches == [{"slow_test.fast": "fast"}] * 4
+    assert same_context_slow_count == 1
+    assert new_context_slow_count == 3
+
+
+def test_data_source_evaluate_deadline_first_alternatives() -> None:
+    """Test to verify that with a deadline, only the first alternative of a composed
+    property is resolved once it has a value."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(deadline_ms=1000)
+    concurrent_data_source = ConcurrentTestDataSource(["slow_a"])
+    data_source_manager.register_data_source(concurrent_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("concurrent_test", "first_of"))
+
+    value_cache = {}
+
+    # Act
+    data_source_manager.evaluate(value_cache, line_item_manager)
+
+    # Assert
+    assert value_cache == {
+        "concurrent_test.slow_a": "slow_a",
+        "concurrent_test.first_of": "slow_a",
+    }
+    assert concurrent_data_source.resolved_names == ["slow_a"]
+
+
+def test_data_source_evaluate_deadline_not_starved_by_stuck_resolver() -> None:
+    """Test to verify that with the default number of workers, a property that is
+    stuck does not keep the properties after it from resolving within their
+    deadlines, on this prompt or on later ones."""
+
+    # Arrange
+    data_source_manager = DataSourceManager(deadline_ms=100)
+    slow_data_source = SlowTestDataSource()
+    data_source_manager.register_data_source(slow_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("slow_test", "slow"))
+    line_item_manager.register_item(PropertyItem("slow_test", "fast"))
+
+    # Act
+    try:
+        stuck_caches = []
+        for _ in range(3):
+            stuck_caches.append({})
+            data_source_manager.evaluate(stuck_caches[-1], line_item_manager)
+    finally:
+        slow_data_source.release_event.set()
+
+    # Assert
+    assert stuck_caches == [{"slow_test.fast": "fast"}] * 3
+
+
+def test_data_source_evaluate_with_value_store() -> None:
+    """Test to verify that a stored value is used instead of resolving the property
+    again, but only for properties that may be reused."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    cached_data_source = CachedTestDataSource()
+    data_source_manager.register_data_source(cached_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("cached_test", "cached"))
+    line_item_manager.register_item(PropertyItem("cached_test", "uncached"))
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        data_source_manager.evaluate(
+            {}, line_item_manager, PropertyValueCache(temporary_directory)
+        )
+        value_cache = {}
+
+        # Act
+        data_source_manager.evaluate(
+            value_cache, line_item_manager, PropertyValueCache(temporary_directory)
+        )
+
+    # Assert
+    assert value_cache == {
+        "cached_test.cached": "cached",
+        "cached_test.uncached": "uncached",
+    }
+    assert cached_data_source.resolve_counts == {"cached": 1, "uncached": 2}
+
+
+def test_data_source_get_cache_policy_from_configuration() -> None:
+    """Test to verify that the configuration can change how long a property may be
+    reused for, or turn reuse off."""
+
+    # Arrange
+    properties = ApplicationProperties()
+    properties.load_from_dict(
+        {"cache": {"ttl-seconds": {"system": {"host_name": 0, "cwd": 5}}}}
+    )
+    data_source_manager = DataSourceManager()
+    data_source_manager.from_properties(properties)
+
+    # Act
+    host_name_policy = data_source_manager.get_cache_policy(
+        PropertyPath("system", "host_name")
+    )
+    cwd_policy = data_source_manager.get_cache_policy(PropertyPath("system", "cwd"))
+    git_policy = data_source_manager.get_cache_policy(
+        PropertyPath("git", "root_directory")
+    )
+
+    # Assert
+    assert host_name_policy is None
+    assert cwd_policy is not None and cwd_policy.ttl_seconds == 5
+    assert git_policy is not None and git_policy.ttl_seconds is None
+    assert git_policy.file_dependencies is not None
+
+
+def get_data_source_modules_loaded_for(property_names: List[str]) -> List[str]:
+    """Get the data source modules that are imported when loading the data sources
+    for the properties, in a new interpreter."""
+    script_to_run = f"""
+import json
+import sys
+from application_properties import ApplicationProperties
+from pyshell.data_source_manager import DataSourceManager
+from pyshell.data_sources.base_data_source import PropertyPath
+DataSourceManager().from_properties(
+    ApplicationProperties(), [PropertyPath.from_one(i) for i in {property_names!r}]
+)
+print(json.dumps(sorted(i for i in sys.modules if i.startswith("pyshell.data_sources."))))
+"""
+    project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    completed_process = subprocess.run(  # nosec subprocess_without_shell_equals_true
+        [sys.executable, "-c", script_to_run],
+        cwd=project_directory,
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return list(json.loads(completed_process.stdout))
+
+
+def test_data_source_from_properties_loads_only_required_sources() -> None:
+    """Test to verify that only the data sources needed by the required properties
+    are imported and registered."""
+
+    # Arrange
+
+    # Act
+    loaded_modules = get_data_source_modules_loaded_for(["system.cwd"])
+
+    # Assert
+    assert loaded_modules == [
+        "pyshell.data_sources.base_data_source",
+        "pyshell.data_sources.system_data_source",
+    ]
+
+
+def test_data_source_from_properties_loads_dependent_sources() -> None:
+    """Test to verify that loading a data source also loads the data sources that its
+    composed properties depend on, and any that inject dependencies into them."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+
+    # Act
+    data_source_manager.from_properties(
+        ApplicationProperties(), [PropertyPath("project", "root_directory")]
+    )
+
+    # Assert
+    root_directory_translation = data_source_manager.get_shell_translation(
+        PropertyPath("project", "root_directory"), "root"
+    )
+    assert root_directory_translation is not None
+    assert root_directory_translation.split("\n")[1:] == [
+        'if [ -z "$root" ]; then',
+        '    root="$PWD"',
+        "fi",
+    ]
+
+
+def test_data_source_evaluate_refreshed_in_background() -> None:
+    """Test to verify that a property refreshed in the background is not resolved
+    while rendering, showing its last known value instead."""
+
+    # Arrange
+    data_source_manager = DataSourceManager()
+    cached_data_source = CachedTestDataSource()
+    data_source_manager.register_data_source(cached_data_source)
+    data_source_manager.registration_completed()
+
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(
+        PropertyItem("cached_test", "uncached", refresh=ItemRefreshMode.BACKGROUND)
+    )
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_value_cache = {}
+        first_refresh = data_source_manager.evaluate(
+            first_value_cache,
+            line_item_manager,
+            PropertyValueCache(temporary_directory),
+        )
+        data_source_manager.refresh_properties(
+            first_refresh, PropertyValueCache(temporary_directory)
+        )
+        second_value_cache = {}
+
+        # Act
+        second_refresh = data_source_manager.evaluate(
+            second_value_cache,
+            line_item_manager,
+            PropertyValueCache(temporary_directory),
+        )
+
+    # Assert
+    assert not first_value_cache
+    assert first_refresh == [PropertyPath("cached_test", "uncached")]
+    assert second_value_cache == {"cached_test.uncached": "uncached"}
+    assert second_refresh == [PropertyPath("cached_test", "uncached")]
+    assert cached_data_source.resolve_counts == {"uncached": 1}
+
+
+def test_data_source_get_property_memo_scope() -> None:
+    """Test to verify that a property that cannot change while the process is running
+    is only resolved once, while other properties are resolved every time."""
+
+    # Arrange
+    cached_data_source = CachedTestDataSource()
+
+    # Act
+    resolved_values = [
+        cached_data_source.get_property(next_property_name)
+        for next_property_name in ["process", "uncached", "process", "uncached"]
+    ]
+
+    # Assert
+    assert resolved_values == ["process", "uncached", "process", "uncached"]
+    assert cached_data_source.resolve_counts == {"process": 1, "uncached": 2}
+    assert cached_data_source.get_cache_policy("process") is None
+
+
+def test_data_source_resolvers_inherited_from_bases() -> None:
+    """Test to verify that a data source has the resolvers of its base classes, and
+    that a function replacing an inherited resolver takes its place."""
+
+    # Arrange
+    class ParentDataSource(BaseDataSource):
+        """Data source with resolvers to be inherited."""
+
+        def __init__(self) -> None:
+            super().__init__("parent")
+
+        @property_resolver("kept")
+        def __get_kept(self) -> str:
+            return "parent kept"
+
+        @property_resolver("replaced")
+        def _get_replaced(self) -> str:
+            return "parent replaced"
+
+    class ChildDataSource(ParentDataSource):
+        """Data source that adds to and replaces the inherited resolvers."""
+
+        @property_resolver("added")
+        def __get_added(self) -> str:
+            return "child added"
+
+        def _get_replaced(self) -> str:
+            return "child replaced"
+
+    # Act
+    child_data_source = ChildDataSource()
+
+    # Assert
+    assert sorted(ChildDataSource.property_resolver_table) == ["added", "kept"]
+    assert sorted(ParentDataSource.property_resolver_table) == ["kept", "replaced"]
+    assert child_data_source.get_property("kept") == "parent kept"
+    assert child_data_source.get_property("added") == "child added"
+    assert child_data_source.get_property("replaced") == ""
+
+
+def test_data_source_resolvers_of_classes_with_same_name() -> None:
+    """Test to verify that data source classes with the same name only have their
+    own resolvers."""
+
+    # Arrange
+    def create_data_source_class(property_name: str) -> type:
+        class SameNameDataSource(BaseDataSource):
+            """Data source with a resolver for the given property."""
+
+            def __init__(self) -> None:
+                super().__init__("same_name")
+
+            @property_resolver(property_name)
+            def __get_value(self) -> str:
+                return property_name
+
+        return SameNameDataSource
+
+    first_class = create_data_source_class("first")
+    second_class = create_data_source_class("second")
+
+    # Act
+    first_data_source = first_class()
+    second_data_source = second_class()
+
+    # Assert
+    assert first_data_source.get_property("first") == "first"
+    assert first_data_source.get_property("second") == ""
+    assert second_data_source.get_property("second") == "second"
+    assert second_data_source.get_property("first") == ""
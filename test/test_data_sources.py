@@ -1,13 +1,19 @@
 """Module to contain the test data sources.
 """
 
+import asyncio
+import sys
+import threading
 from typing import List
 
 from pyshell.data_sources.base_data_source import (
     BaseDataSource,
     ComposerPriorityLevel,
+    PropertyComposer,
     PropertyDependency,
+    PropertyMemoScope,
     PropertyPath,
+    property_resolver,
 )
 
 
@@ -98,3 +104,150 @@ class OtherTestDataSource(BaseDataSource):
             return_value = "a"
 
         return return_value
+
+
+class ConcurrentTestDataSource(BaseDataSource):
+    """Class to provide for a data source whose properties can only be resolved if
+    they are all resolved at the same time."""
+
+    def __init__(self, concurrent_property_names: List[str]):
+        super().__init__("concurrent_test")
+        self.__concurrent_property_names = concurrent_property_names
+        self.__barrier = threading.Barrier(len(concurrent_property_names), timeout=5)
+        self.resolved_names: List[str] = []
+
+    def get_property_dependencies(self, property_name: str) -> List[PropertyPath]:
+        if property_name == "first_of":
+            return [
+                PropertyPath(self.name, next_name)
+                for next_name in self.__concurrent_property_names[:1]
+                + ["empty", "other"]
+            ]
+        if property_name == "empty_first_of":
+            return [
+                PropertyPath(self.name, next_name) for next_name in ["empty", "other"]
+            ]
+        return []
+
+    def get_property(self, property_name: str) -> str:
+        """Get the property from the data source that is associated with the given property name."""
+
+        self.resolved_names.append(property_name)
+        if property_name == "other":
+            return "other"
+        if property_name in self.__concurrent_property_names:
+            self.__barrier.wait()
+            return property_name
+        return ""
+
+
+class SlowTestDataSource(BaseDataSource):
+    """Class to provide for a data source with a "slow" property that does not
+    resolve until it is released, and a "fast" property that resolves right away."""
+
+    def __init__(self):
+        super().__init__("slow_test")
+        self.release_event = threading.Event()
+        self.slow_count = 0
+
+    def get_property_dependencies(self, property_name: str) -> List[PropertyPath]:
+        if property_name == "first_of":
+            return [PropertyPath(self.name, "slow"), PropertyPath(self.name, "fast")]
+        return []
+
+    def get_property(self, property_name: str) -> str:
+        """Get the property from the data source that is associated with the given property name."""
+
+        if property_name == "slow":
+            self.slow_count += 1
+            self.release_event.wait(timeout=5)
+            return "slow"
+        return "fast" if property_name == "fast" else ""
+
+
+class CachedTestDataSource(BaseDataSource):
+    """Class to provide for a data source whose "cached" property may be reused by
+    later prompts, counting how many times each property is resolved."""
+
+    def __init__(self):
+        super().__init__("cached_test")
+        self.resolve_counts = {}
+
+    def __count(self, property_name: str) -> str:
+        self.resolve_counts[property_name] = (
+            self.resolve_counts.get(property_name, 0) + 1
+        )
+        return property_name
+
+    @property_resolver("cached", ttl_seconds=60)
+    def __get_cached(self) -> str:
+        return self.__count("cached")
+
+    @property_resolver("uncached")
+    def __get_uncached(self) -> str:
+        return self.__count("uncached")
+
+    @property_resolver("process", memo_scope=PropertyMemoScope.PROCESS)
+    def __get_process(self) -> str:
+        return self.__count("process")
+
+
+class AsyncTestDataSource(BaseDataSource):
+    """Class to provide for a data source with "async" resolvers.  The "ping" and
+    "pong" properties can only be resolved if they are awaited at the same time."""
+
+    def __init__(self, subprocess_timeout=None):
+        super().__init__("async_test", subprocess_timeout=subprocess_timeout)
+        self.event_loops = []
+        self.__ping_event = None
+        self.__pong_event = None
+
+    async def __exchange(self, event_to_set_name: str, event_to_wait_name: str):
+        self.event_loops.append(asyncio.get_running_loop())
+        if self.__ping_event is None:
+            self.__ping_event = asyncio.Event()
+            self.__pong_event = asyncio.Event()
+        events = {"ping": self.__ping_event, "pong": self.__pong_event}
+        events[event_to_set_name].set()
+        await asyncio.wait_for(events[event_to_wait_name].wait(), timeout=5)
+
+    @property_resolver("ping")
+    async def __get_ping(self) -> str:
+        await self.__exchange("ping", "pong")
+        return "ping"
+
+    @property_resolver("pong")
+    async def __get_pong(self) -> str:
+        await self.__exchange("pong", "ping")
+        return "pong"
+
+    @property_resolver("echo")
+    async def __get_echo(self) -> str:
+        completed_process = await self._execute_subprocess_async(
+            [sys.executable, "-c", "print('echo')"]
+        )
+        return completed_process.stdout.strip()
+
+    @property_resolver("sync")
+    def __get_sync(self) -> str:
+        return "sync"
+
+
+class ComposedTestDataSource(BaseDataSource):
+    """Class to provide for a data source whose properties are composed from each
+    other, as described by a list of composer names and their default properties."""
+
+    def __init__(self, name, composer_defaults, dependencies_to_inject=None):
+        super().__init__(
+            name,
+            dependencies_to_inject=dependencies_to_inject,
+            property_composers=[
+                PropertyComposer(composer_name, PropertyPath.from_one(default_name))
+                for composer_name, default_name in composer_defaults
+            ],
+        )
+
+    def get_property(self, property_name: str) -> str:
+        """Get the property from the data source that is associated with the given property name."""
+
+        return "leaf" if property_name == "leaf" else ""
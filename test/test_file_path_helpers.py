@@ -5,6 +5,9 @@ for testing that will work on Linux and Windows systems.
 """
 
 # pylint: disable=unused-import
+import os
+import tempfile
+import threading
 from test.patches import (  # noqa: F401
     lock_and_clear_file_path_helpers_singleton,
     mock_abspath_impl,
@@ -228,3 +231,35 @@ def test_normalize_path_windows_mounts_only_replaces_if_mounted(
 
     # Assert
     assert expected_file_path == normalized_path
+
+
+def test_write_file_atomically_from_threads() -> None:
+    """Test to verify that threads of the same process writing the same file never
+    leave a mix of their contents, or any temporary files, behind."""
+
+    # Arrange
+    writer_contents = [f"{i}" * 100000 for i in range(8)]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        file_path = os.path.join(temporary_directory, "values", "shared.json")
+
+        def write_repeatedly(file_contents: str) -> None:
+            for _ in range(20):
+                FilePathHelpers.write_file_atomically(file_path, file_contents)
+
+        writer_threads = [
+            threading.Thread(target=write_repeatedly, args=(i,))
+            for i in writer_contents
+        ]
+
+        # Act
+        for next_thread in writer_threads:
+            next_thread.start()
+        for next_thread in writer_threads:
+            next_thread.join()
+        with open(file_path, "rt", encoding="utf-8") as infile:
+            written_contents = infile.read()
+        directory_contents = os.listdir(os.path.dirname(file_path))
+
+    # Assert
+    assert written_contents in writer_contents
+    assert directory_contents == ["shared.json"]
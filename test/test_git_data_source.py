@@ -3,6 +3,8 @@
 
 import os
 import subprocess
+import tempfile
+from test.patches import MockPopen
 from typing import List, Optional
 
 from pyshell.data_sources.git_data_source import GitDataSource
@@ -262,3 +264,634 @@ def test_git_data_source_get_property_root_directory_sub_root_directory() -> Non
 
     # Assert
     assert generated_value == ""
+
+
+def test_git_data_source_get_file_dependencies_branch() -> None:
+    """Test to verify that the branch depends on the ".git" entries up to the
+    repository, and on the HEAD and packed refs files within it."""
+
+    # Arrange
+    data_source = GitDataSource()
+    root_path = os.getcwd()
+    tests_path = os.path.join(root_path, "test")
+
+    # Act
+    try:
+        os.chdir(tests_path)
+        file_dependencies = data_source.get_file_dependencies("branch")
+    finally:
+        os.chdir(root_path)
+
+    # Assert
+    assert file_dependencies == [
+        os.path.join(tests_path, ".git"),
+        os.path.join(root_path, ".git"),
+        os.path.join(root_path, ".git", "HEAD"),
+        os.path.join(root_path, ".git", "packed-refs"),
+    ]
+
+
+def test_git_data_source_resolve_git_directory_from_file() -> None:
+    """Test to verify that a ".git" file, as used by worktrees, is followed to the
+    git directory that it names."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        git_entry = os.path.join(temporary_directory, ".git")
+        with open(git_entry, "wt", encoding="utf-8") as outfile:
+            outfile.write("gitdir: ../main/.git/worktrees/other\n")
+
+        # Act
+        git_directory = GitDataSource._resolve_git_directory(git_entry)
+
+    # Assert
+    assert git_directory == os.path.join(
+        temporary_directory, "../main/.git/worktrees/other"
+    )
+
+
+def create_git_directory(git_directory: str, head_contents: str) -> None:
+    """Create a git directory with the given HEAD file."""
+    os.makedirs(git_directory, exist_ok=True)
+    with open(os.path.join(git_directory, "HEAD"), "wt", encoding="utf-8") as outfile:
+        outfile.write(f"{head_contents}\n")
+
+
+def get_properties_in_directory(
+    data_source: GitDataSource, working_directory: str, property_names: List[str]
+) -> List[str]:
+    """Get the values of the properties with the working directory as the current
+    directory."""
+    root_path = os.getcwd()
+    try:
+        os.chdir(working_directory)
+        return [data_source.get_property(i) for i in property_names]
+    finally:
+        os.chdir(root_path)
+
+
+def test_git_data_source_get_property_branch_read_from_head(monkeypatch) -> None:
+    """Test to verify that the branch and root directory are read from the files in
+    the repository, without running git."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setattr(subprocess, "Popen", None)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_git_directory(
+            os.path.join(temporary_directory, ".git"), "ref: refs/heads/feature/new"
+        )
+        tests_path = os.path.join(temporary_directory, "test")
+        os.makedirs(tests_path)
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, tests_path, ["branch", "root_directory"]
+        )
+
+    # Assert
+    assert generated_values == [
+        "feature/new",
+        FilePathHelpers.normalize_path(temporary_directory),
+    ]
+
+
+def test_git_data_source_get_property_branch_detached_head(monkeypatch) -> None:
+    """Test to verify that a detached HEAD is shown as the abbreviated name of the
+    commit that it refers to."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setattr(subprocess, "Popen", None)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_git_directory(
+            os.path.join(temporary_directory, ".git"),
+            "0123456789abcdef0123456789abcdef01234567",
+        )
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, temporary_directory, ["branch"]
+        )
+
+    # Assert
+    assert generated_values == ["(HEAD detached at 0123456)"]
+
+
+def test_git_data_source_get_property_branch_outside_repository(monkeypatch) -> None:
+    """Test to verify that outside of a repository, the branch and root directory
+    are empty, without running git."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setattr(subprocess, "Popen", None)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        assert GitDataSource._find_repository(temporary_directory) == ("", "")
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, temporary_directory, ["branch", "root_directory"]
+        )
+
+    # Assert
+    assert generated_values == ["", ""]
+
+
+def test_git_data_source_get_property_branch_worktree(monkeypatch) -> None:
+    """Test to verify that the branch of a worktree is read from its own HEAD file,
+    with the packed references being found in the common directory."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setattr(subprocess, "Popen", None)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        main_git_directory = os.path.join(temporary_directory, "main", ".git")
+        create_git_directory(main_git_directory, "ref: refs/heads/main")
+        worktree_git_directory = os.path.join(main_git_directory, "worktrees", "other")
+        create_git_directory(worktree_git_directory, "ref: refs/heads/other")
+        with open(
+            os.path.join(worktree_git_directory, "commondir"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("../..\n")
+        worktree_path = os.path.join(temporary_directory, "other")
+        os.makedirs(worktree_path)
+        with open(
+            os.path.join(worktree_path, ".git"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("gitdir: ../main/.git/worktrees/other\n")
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, worktree_path, ["branch"]
+        )
+        root_path = os.getcwd()
+        try:
+            os.chdir(worktree_path)
+            file_dependencies = data_source.get_file_dependencies("branch")
+        finally:
+            os.chdir(root_path)
+
+    # Assert
+    assert generated_values == ["other"]
+    assert file_dependencies is not None
+    assert os.path.normpath(file_dependencies[-1]) == os.path.join(
+        main_git_directory, "packed-refs"
+    )
+
+
+def test_git_data_source_get_property_branch_git_dir_set(monkeypatch) -> None:
+    """Test to verify that if the environment tells git where the repository is, git
+    is asked for the branch."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setenv("GIT_DIR", "/somewhere/else")
+    monkeypatch.setattr(
+        subprocess, "Popen", lambda *args, **kwargs: MockPopen(0, "* elsewhere\n", "")
+    )
+
+    # Act
+    generated_value = data_source.get_property("branch")
+
+    # Assert
+    assert generated_value == "elsewhere"
+
+
+def create_repository_with_changes(repository_path: str) -> None:
+    """Create a repository with a staged file, a changed file, and an untracked file."""
+    get_exec_success(["git", "init", "-q", "-b", "main"], repository_path)
+    for next_name in ["changed.txt", "staged.txt"]:
+        with open(
+            os.path.join(repository_path, next_name), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("first\n")
+    get_exec_success(["git", "add", "."], repository_path)
+    get_exec_success(
+        [
+            "git",
+            "-c",
+            "user.name=test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            "first",
+        ],
+        repository_path,
+    )
+    for next_name in ["changed.txt", "staged.txt", "untracked.txt"]:
+        with open(
+            os.path.join(repository_path, next_name), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("second\n")
+    get_exec_success(["git", "add", "staged.txt"], repository_path)
+
+
+def count_started_processes(
+    monkeypatch, started_environments: Optional[List[Optional[dict]]] = None
+) -> List[List[str]]:
+    """Record the arguments of each process that is started, and optionally the
+    environment that it is started with."""
+    started_processes: List[List[str]] = []
+    original_popen = subprocess.Popen
+
+    def record_popen(subprocess_args, *args, **kwargs):
+        started_processes.append(list(subprocess_args))
+        if started_environments is not None:
+            started_environments.append(kwargs.get("env"))
+        return original_popen(subprocess_args, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", record_popen)
+    return started_processes
+
+
+def test_git_data_source_get_property_status_counts(monkeypatch) -> None:
+    """Test to verify that the status counts are all taken from a single run of git,
+    with counts of zero being empty."""
+
+    # Arrange
+    data_source = GitDataSource()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_changes(temporary_directory)
+        started_environments: List[Optional[dict]] = []
+        started_processes = count_started_processes(monkeypatch, started_environments)
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, temporary_directory, GitDataSource.STATUS_PROPERTY_NAMES
+        )
+
+    # Assert
+    assert generated_values == ["1", "1", "1", "", "", ""]
+    assert started_processes == [["git", "status", "--porcelain=v2", "--branch"]]
+    assert started_environments[0]["GIT_OPTIONAL_LOCKS"] == "0"
+
+
+def test_git_data_source_get_property_status_options(monkeypatch) -> None:
+    """Test to verify that untracked files and submodules are not looked at if only
+    the counts for the branch are needed."""
+
+    # Arrange
+    data_source = GitDataSource(status_property_names=["ahead", "behind", "branch"])
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_changes(temporary_directory)
+        started_processes = count_started_processes(monkeypatch)
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, temporary_directory, ["ahead", "behind"]
+        )
+
+    # Assert
+    assert generated_values == ["", ""]
+    assert started_processes == [
+        [
+            "git",
+            "status",
+            "--porcelain=v2",
+            "--branch",
+            "--untracked-files=no",
+            "--ignore-submodules=all",
+        ]
+    ]
+
+
+class StatusProcess:
+    """Stand-in for a "git status" process, recording how much of its output is read
+    and whether it is stopped."""
+
+    def __init__(self, output_lines: List[str]) -> None:
+        self.pid = 0
+        self.returncode = 0
+        self.lines_read: List[str] = []
+        self.was_killed = False
+        self.__output_lines = output_lines
+
+    @property
+    def stdout(self):
+        """Provide the output of the process one line at a time."""
+        for next_line in self.__output_lines:
+            self.lines_read.append(next_line)
+            yield f"{next_line}\n"
+
+    def kill(self) -> None:
+        """Record that the process was stopped."""
+        self.was_killed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        _ = args
+
+
+def test_git_data_source_get_property_status_stops_early(monkeypatch) -> None:
+    """Test to verify that git is stopped once the counts for the branch are read, if
+    those are the only counts that are needed."""
+
+    # Arrange
+    data_source = GitDataSource(status_property_names=["ahead", "behind"])
+    status_process = StatusProcess(
+        [
+            "# branch.oid 0123456789abcdef0123456789abcdef01234567",
+            "# branch.head main",
+            "# branch.upstream origin/main",
+            "# branch.ab +2 -1",
+            "1 .M N... 100644 100644 100644 0123456 0123456 changed.txt",
+            "? untracked.txt",
+        ]
+    )
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_changes(temporary_directory)
+        monkeypatch.setattr(subprocess, "Popen", lambda *args, **kwargs: status_process)
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, temporary_directory, ["ahead", "behind"]
+        )
+
+    # Assert
+    assert generated_values == ["2", "1"]
+    assert status_process.lines_read[-1] == "# branch.ab +2 -1"
+    assert status_process.was_killed
+
+
+def test_git_data_source_get_property_status_each_render(monkeypatch) -> None:
+    """Test to verify that the status is taken again for each render, and not at all
+    outside of a repository."""
+
+    # Arrange
+    data_source = GitDataSource()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        repository_path = os.path.join(temporary_directory, "repository")
+        os.makedirs(repository_path)
+        create_repository_with_changes(repository_path)
+        started_processes = count_started_processes(monkeypatch)
+
+        # Act
+        first_values = get_properties_in_directory(
+            data_source, repository_path, ["untracked"]
+        )
+        get_exec_success(["git", "add", "."], repository_path)
+        data_source.begin_render()
+        second_values = get_properties_in_directory(
+            data_source, repository_path, ["untracked", "staged"]
+        )
+        data_source.begin_render()
+        outside_values = get_properties_in_directory(
+            data_source, temporary_directory, ["untracked"]
+        )
+
+    # Assert
+    assert first_values == ["1"]
+    assert second_values == ["", "3"]
+    assert outside_values == [""]
+    assert [i[1] for i in started_processes] == ["status", "add", "status"]
+
+
+def test_git_data_source_get_property_dirty(monkeypatch) -> None:
+    """Test to verify that a tracked file differing from the index is found from the
+    index, without running git, and that git is run if the index cannot be read."""
+
+    # Arrange
+    data_source = GitDataSource()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_changes(temporary_directory)
+        get_exec_success(["git", "add", "."], temporary_directory)
+        started_processes = count_started_processes(monkeypatch)
+
+        # Act
+        clean_values = get_properties_in_directory(
+            data_source, temporary_directory, ["dirty"]
+        )
+        with open(
+            os.path.join(temporary_directory, "changed.txt"), "at", encoding="utf-8"
+        ) as outfile:
+            outfile.write("third\n")
+        dirty_values = get_properties_in_directory(
+            data_source, temporary_directory, ["dirty"]
+        )
+        get_exec_success(["git", "update-index", "--split-index"], temporary_directory)
+        split_values = get_properties_in_directory(
+            data_source, temporary_directory, ["dirty"]
+        )
+
+    # Assert
+    assert clean_values == [""]
+    assert dirty_values == ["*"]
+    assert split_values == ["*"]
+    assert [i[1] for i in started_processes] == ["update-index", "diff"]
+
+
+def test_git_data_source_read_operation_state() -> None:
+    """Test to verify that each operation in progress is found from the files that it
+    leaves in the git directory."""
+
+    # Arrange
+    operation_files = [
+        ([], ("", "", "")),
+        (["MERGE_HEAD"], ("MERGING", "", "")),
+        (["CHERRY_PICK_HEAD"], ("CHERRY-PICKING", "", "")),
+        (["REVERT_HEAD"], ("REVERTING", "", "")),
+        (["BISECT_LOG"], ("BISECTING", "", "")),
+        (["rebase-apply/next", "rebase-apply/last"], ("AM/REBASE", "1", "3")),
+        (["rebase-apply/applying", "rebase-apply/next"], ("AM", "1", "")),
+        (["rebase-apply/rebasing", "rebase-apply/last"], ("REBASE", "", "3")),
+        (
+            ["rebase-merge/msgnum", "rebase-merge/end", "MERGE_HEAD"],
+            ("REBASE", "2", "5"),
+        ),
+    ]
+    file_contents = {"next": "1", "last": "3", "msgnum": "2", "end": "5"}
+
+    # Act
+    operation_states = []
+    for next_file_names, _ in operation_files:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            for next_file_name in next_file_names:
+                file_path = os.path.join(temporary_directory, next_file_name)
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "wt", encoding="utf-8") as outfile:
+                    outfile.write(
+                        file_contents.get(os.path.basename(file_path), "") + "\n"
+                    )
+            operation_states.append(
+                GitDataSource._read_operation_state(temporary_directory)
+            )
+
+    # Assert
+    assert operation_states == [i[1] for i in operation_files]
+
+
+def test_git_data_source_get_property_operation(monkeypatch) -> None:
+    """Test to verify that the operation in progress, and its progress, are read from
+    the git directory without running git."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setattr(subprocess, "Popen", None)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        git_directory = os.path.join(temporary_directory, ".git")
+        create_git_directory(git_directory, "0123456789abcdef0123456789abcdef01234567")
+        os.makedirs(os.path.join(git_directory, "rebase-merge"))
+        for next_file_name, next_contents in [("msgnum", "4"), ("end", "7")]:
+            with open(
+                os.path.join(git_directory, "rebase-merge", next_file_name),
+                "wt",
+                encoding="utf-8",
+            ) as outfile:
+                outfile.write(f"{next_contents}\n")
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source,
+            temporary_directory,
+            ["operation", "operation_step", "operation_total"],
+        )
+
+    # Assert
+    assert generated_values == ["REBASE", "4", "7"]
+    assert data_source.is_volatile_property("operation")
+
+
+def test_git_data_source_get_property_head_commit(monkeypatch) -> None:
+    """Test to verify that the commit that HEAD refers to is read from the objects in
+    the repository, through a packed branch, without running git."""
+
+    # Arrange
+    data_source = GitDataSource()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_changes(temporary_directory)
+        get_exec_success(["git", "gc", "-q"], temporary_directory)
+        object_name = get_exec_success(
+            ["git", "rev-parse", "HEAD"], temporary_directory
+        ).strip()
+        assert not os.path.exists(
+            os.path.join(temporary_directory, ".git", "refs", "heads", "main")
+        )
+        monkeypatch.setattr(subprocess, "Popen", None)
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source,
+            temporary_directory,
+            ["head_sha", "head_short_sha", "head_age", "head_subject"],
+        )
+
+    # Assert
+    assert generated_values[:2] == [object_name, object_name[:7]]
+    assert generated_values[2].endswith("s")
+    assert generated_values[3] == "first"
+    assert data_source.is_volatile_property("head_sha")
+
+
+def test_git_data_source_get_property_head_commit_unborn(monkeypatch) -> None:
+    """Test to verify that a branch without any commits has no HEAD commit."""
+
+    # Arrange
+    data_source = GitDataSource()
+    monkeypatch.setattr(subprocess, "Popen", None)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_git_directory(
+            os.path.join(temporary_directory, ".git"), "ref: refs/heads/main"
+        )
+
+        # Act
+        generated_values = get_properties_in_directory(
+            data_source, temporary_directory, ["head_sha", "head_subject"]
+        )
+
+    # Assert
+    assert generated_values == ["", ""]
+
+
+def use_only_repository_config(monkeypatch, temporary_directory: str) -> None:
+    """Make sure that no system or global configuration is read by git or by the data
+    source, with an empty global configuration file."""
+    global_path = os.path.join(temporary_directory, "global.gitconfig")
+    with open(global_path, "wt", encoding="utf-8") as outfile:
+        outfile.write("")
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", global_path)
+
+
+def test_git_data_source_read_core_settings(monkeypatch) -> None:
+    """Test to verify that the core settings are read from the global and repository
+    configuration, and that configuration that includes other files is not read."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        use_only_repository_config(monkeypatch, temporary_directory)
+        with open(
+            os.path.join(temporary_directory, "global.gitconfig"),
+            "wt",
+            encoding="utf-8",
+        ) as outfile:
+            outfile.write("[core]\n\tautocrlf = input\n\tfileMode = true\n")
+        with open(
+            os.path.join(temporary_directory, "config"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write(
+                '[core]\n\tfilemode = false ; comment\n\tbare\n[core "other"]\n'
+                "\tautocrlf = true\n[user]\n\tname = someone\n"
+            )
+
+        # Act
+        core_settings = GitDataSource._read_core_settings(temporary_directory)
+        with open(
+            os.path.join(temporary_directory, "config"), "at", encoding="utf-8"
+        ) as outfile:
+            outfile.write("[include]\n\tpath = other.gitconfig\n")
+        included_settings = GitDataSource._read_core_settings(temporary_directory)
+
+    # Assert
+    assert core_settings == {"autocrlf": "input", "filemode": "false", "bare": "true"}
+    assert included_settings is None
+
+
+def test_git_data_source_get_property_dirty_conversions(monkeypatch) -> None:
+    """Test to verify that git is asked if the files may be converted before being
+    compared, and that the executable bit is only compared if git would."""
+
+    # Arrange
+    data_source = GitDataSource()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        use_only_repository_config(monkeypatch, temporary_directory)
+        repository_path = os.path.join(temporary_directory, "repository")
+        os.makedirs(repository_path)
+        create_repository_with_changes(repository_path)
+        get_exec_success(["git", "add", "."], repository_path)
+        get_exec_success(["git", "config", "core.fileMode", "false"], repository_path)
+        os.chmod(os.path.join(repository_path, "changed.txt"), 0o755)
+        started_processes = count_started_processes(monkeypatch)
+
+        # Act
+        file_mode_values = get_properties_in_directory(
+            data_source, repository_path, ["dirty"]
+        )
+        get_exec_success(["git", "config", "core.autocrlf", "true"], repository_path)
+        autocrlf_values = get_properties_in_directory(
+            data_source, repository_path, ["dirty"]
+        )
+        get_exec_success(["git", "config", "core.autocrlf", "false"], repository_path)
+        with open(
+            os.path.join(repository_path, ".gitattributes"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("*.txt text\n")
+        get_exec_success(["git", "add", ".gitattributes"], repository_path)
+        attributes_values = get_properties_in_directory(
+            data_source, repository_path, ["dirty"]
+        )
+
+    # Assert
+    assert file_mode_values == [""]
+    assert autocrlf_values == [""]
+    assert attributes_values == [""]
+    assert [i[1] for i in started_processes] == [
+        "config",
+        "diff",
+        "config",
+        "add",
+        "diff",
+    ]
@@ -0,0 +1,131 @@
+"""Module to provide tests for the GitIndexReader class.
+"""
+
+import os
+import tempfile
+import time
+from test.test_git_data_source import create_repository_with_changes, get_exec_success
+
+import pytest
+
+from pyshell.data_sources.git_index_reader import GitIndexReader
+
+
+def create_clean_repository(repository_path: str, index_version: int) -> None:
+    """Create a repository with a commit, an index of the given version, and nothing
+    changed since then."""
+    create_repository_with_changes(repository_path)
+    os.makedirs(os.path.join(repository_path, "nested", "directory"))
+    with open(
+        os.path.join(repository_path, "nested", "directory", "file.txt"),
+        "wt",
+        encoding="utf-8",
+    ) as outfile:
+        outfile.write("nested\n")
+    get_exec_success(["git", "add", "."], repository_path)
+    get_exec_success(
+        ["git", "update-index", "--index-version", str(index_version)], repository_path
+    )
+    # Make sure that no file was changed too close to when the index was written.
+    time.sleep(0.01)
+    os.utime(os.path.join(repository_path, ".git", "index"))
+
+
+@pytest.mark.parametrize("index_version", [2, 3, 4])
+def test_git_index_reader_read_versions(index_version: int) -> None:
+    """Test to verify that each version of the index is read with the same paths that
+    git lists."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_clean_repository(temporary_directory, index_version)
+        expected_paths = get_exec_success(["git", "ls-files"], temporary_directory)
+
+        # Act
+        index_entries = GitIndexReader.read(
+            os.path.join(temporary_directory, ".git", "index")
+        )
+
+    # Assert
+    assert index_entries is not None
+    assert [i.decode() for i in index_entries.paths] == expected_paths.split()
+
+
+@pytest.mark.parametrize("index_version", [2, 4])
+def test_git_index_reader_find_modified_paths(index_version: int) -> None:
+    """Test to verify that only the files that differ from the index are found, even
+    if other files have been touched."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_clean_repository(temporary_directory, index_version)
+        index_path = os.path.join(temporary_directory, ".git", "index")
+        clean_entries = GitIndexReader.read(index_path)
+        assert clean_entries is not None
+        clean_paths = clean_entries.find_modified_paths(
+            temporary_directory, os.stat(index_path).st_mtime_ns
+        )
+
+        os.utime(os.path.join(temporary_directory, "staged.txt"))
+        for next_path in [
+            "changed.txt",
+            os.path.join("nested", "directory", "file.txt"),
+        ]:
+            with open(
+                os.path.join(temporary_directory, next_path), "at", encoding="utf-8"
+            ) as outfile:
+                outfile.write("more\n")
+        os.remove(os.path.join(temporary_directory, "untracked.txt"))
+
+        # Act
+        index_entries = GitIndexReader.read(index_path)
+        assert index_entries is not None
+        first_path = index_entries.find_modified_paths(
+            temporary_directory, os.stat(index_path).st_mtime_ns
+        )
+        modified_paths = index_entries.find_modified_paths(
+            temporary_directory, os.stat(index_path).st_mtime_ns, stop_at_first=False
+        )
+
+    # Assert
+    assert not clean_paths
+    assert first_path == [b"changed.txt"]
+    assert modified_paths == [
+        b"changed.txt",
+        b"nested/directory/file.txt",
+        b"untracked.txt",
+    ]
+
+
+def test_git_index_reader_read_required_extension() -> None:
+    """Test to verify that an index with a required extension, such as a split index,
+    is not read."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_clean_repository(temporary_directory, 2)
+        get_exec_success(["git", "update-index", "--split-index"], temporary_directory)
+
+        # Act
+        index_entries = GitIndexReader.read(
+            os.path.join(temporary_directory, ".git", "index")
+        )
+
+    # Assert
+    assert index_entries is None
+
+
+def test_git_index_reader_read_not_an_index() -> None:
+    """Test to verify that a file that is not an index is not read."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        index_path = os.path.join(temporary_directory, "index")
+        with open(index_path, "wb") as outfile:
+            outfile.write(b"DIRC\0\0\0\x09\0\0\0\0")
+
+        # Act
+        index_entries = GitIndexReader.read(index_path)
+
+    # Assert
+    assert index_entries is None
@@ -0,0 +1,141 @@
+"""Module to provide tests for the GitObjectReader class.
+"""
+
+import os
+import subprocess  # nosec blacklist
+import tempfile
+from test.test_git_data_source import get_exec_success
+
+from pyshell.data_sources.git_object_reader import GitCommit, GitObjectReader
+
+
+def commit_all_files(repository_path: str, commit_message: str) -> None:
+    """Commit every file in the repository, with the given message."""
+    get_exec_success(["git", "add", "."], repository_path)
+    get_exec_success(
+        [
+            "git",
+            "-c",
+            "user.name=test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            commit_message,
+        ],
+        repository_path,
+    )
+
+
+def create_repository_with_history(repository_path: str) -> None:
+    """Create a repository with a few commits of a file that changes a little each
+    time, so that packing it stores most of its versions as deltas."""
+    get_exec_success(["git", "init", "-q", "-b", "main"], repository_path)
+    file_lines = [f"line {i} of the file that is being changed\n" for i in range(200)]
+    for commit_index in range(4):
+        file_lines[commit_index * 50] = f"changed by commit {commit_index}\n"
+        with open(
+            os.path.join(repository_path, "file.txt"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("".join(file_lines))
+        commit_all_files(
+            repository_path, f"Commit number {commit_index}\n\nWith a body."
+        )
+
+
+def read_objects_with_git(repository_path: str) -> dict:
+    """Read the type and contents of every object in the repository using git."""
+    object_lines = get_exec_success(
+        ["git", "cat-file", "--batch-all-objects", "--batch-check"], repository_path
+    ).splitlines()
+    git_objects = {}
+    for object_name, object_type, _ in (i.split(" ") for i in object_lines):
+        git_objects[object_name] = (
+            object_type.encode(),
+            subprocess.run(  # nosec subprocess_without_shell_equals_true
+                ["git", "cat-file", object_type, object_name],
+                stdout=subprocess.PIPE,
+                check=True,
+                cwd=repository_path,
+            ).stdout,
+        )
+    return git_objects
+
+
+def test_git_object_reader_read_loose_commit() -> None:
+    """Test to verify that a loose commit is read with the same subject and time that
+    git shows for it."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_history(temporary_directory)
+        object_name, committer_time, subject = get_exec_success(
+            ["git", "log", "-1", "--format=%H %ct %s"], temporary_directory
+        ).split(" ", 2)
+        object_reader = GitObjectReader(os.path.join(temporary_directory, ".git"))
+
+        # Act
+        head_commit = object_reader.read_commit(object_name)
+
+    # Assert
+    assert head_commit == GitCommit(
+        object_name, int(committer_time), subject.rstrip("\n")
+    )
+
+
+def test_git_object_reader_read_packed_objects() -> None:
+    """Test to verify that every object in a pack, including those stored as deltas,
+    is read with the same type and contents that git shows for it."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_history(temporary_directory)
+        get_exec_success(["git", "repack", "-adfq"], temporary_directory)
+        get_exec_success(["git", "prune-packed"], temporary_directory)
+        git_objects = read_objects_with_git(temporary_directory)
+        object_reader = GitObjectReader(os.path.join(temporary_directory, ".git"))
+
+        # Act
+        read_objects = {i: object_reader.read_object(i) for i in git_objects}
+
+    # Assert
+    assert read_objects == git_objects
+
+
+def test_git_object_reader_read_commit_missing() -> None:
+    """Test to verify that a commit that is not in the repository is not read."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_history(temporary_directory)
+        get_exec_success(["git", "gc", "-q"], temporary_directory)
+        object_reader = GitObjectReader(os.path.join(temporary_directory, ".git"))
+
+        # Act
+        missing_commit = object_reader.read_commit("00" * 20)
+
+    # Assert
+    assert missing_commit is None
+
+
+def test_git_object_reader_read_commit_cache_bounded(monkeypatch) -> None:
+    """Test to verify that only the commits that were read most recently are kept,
+    so that a long running process does not keep every commit that it has read."""
+
+    # Arrange
+    monkeypatch.setattr(GitObjectReader, "MAXIMUM_CACHED_COMMITS", 2)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        create_repository_with_history(temporary_directory)
+        object_names = get_exec_success(
+            ["git", "log", "--format=%H", "--reverse"], temporary_directory
+        ).split()
+        object_reader = GitObjectReader(os.path.join(temporary_directory, ".git"))
+        first_commits = [object_reader.read_commit(i) for i in object_names]
+
+    # Act
+    second_commits = [object_reader.read_commit(i) for i in object_names]
+
+    # Assert
+    assert None not in first_commits
+    assert second_commits == [None, None] + first_commits[2:]
@@ -0,0 +1,83 @@
+"""Module to provide tests that keep the import graph of the application in check.
+"""
+
+import json
+import os
+import subprocess  # nosec blacklist
+import sys
+from typing import List
+
+# Number of modules that importing pyshell.main may add on top of those imported by
+# the application_properties package.  If this needs to grow, make sure that the new
+# modules are really needed on the "run" path first.
+IMPORT_BUDGET = 16
+
+# Modules that are only needed by some commands or data sources, and should only
+# be imported when those are used.
+DEFERRED_MODULES = [
+    "asyncio",
+    "concurrent.futures",
+    "pyshell.daemon_thread_pool",
+    "pyshell.data_sources.git_data_source",
+    "pyshell.data_sources.git_index_reader",
+    "pyshell.data_sources.git_object_reader",
+    "pyshell.data_sources.project_data_source",
+    "pyshell.data_sources.system_data_source",
+    "pyshell.prompt_client",
+    "pyshell.prompt_compiler",
+    "pyshell.prompt_hook",
+    "pyshell.prompt_plan_cache",
+    "pyshell.prompt_server",
+    "pyshell.property_value_cache",
+    "runpy",
+    "shlex",
+    "socket",
+    "subprocess",
+]
+
+
+def get_modules_imported_by_main() -> List[str]:
+    """Get the modules that are imported by the main module, in a new interpreter."""
+    script_to_run = """
+import json
+import sys
+import application_properties
+modules_before = set(sys.modules)
+import pyshell.main
+print(json.dumps(sorted(set(sys.modules) - modules_before)))
+"""
+    project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    completed_process = subprocess.run(  # nosec subprocess_without_shell_equals_true
+        [sys.executable, "-c", script_to_run],
+        cwd=project_directory,
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return list(json.loads(completed_process.stdout))
+
+
+def test_import_budget_main_within_budget() -> None:
+    """Test to verify that importing the main module stays within its import budget."""
+
+    # Arrange
+
+    # Act
+    imported_modules = get_modules_imported_by_main()
+
+    # Assert
+    assert len(imported_modules) <= IMPORT_BUDGET, str(imported_modules)
+
+
+def test_import_budget_main_defers_modules() -> None:
+    """Test to verify that importing the main module does not import modules that
+    are only needed by some commands or data sources."""
+
+    # Arrange
+
+    # Act
+    imported_modules = get_modules_imported_by_main()
+
+    # Assert
+    assert not set(DEFERRED_MODULES) & set(imported_modules)
@@ -7,6 +7,7 @@ from test.utils import assert_that_exception_is_raised
 from application_properties import ApplicationProperties
 
 from pyshell.line_item_manager import PropertyItem
+from pyshell.line_items.property_item import ItemRefreshMode
 
 
 def test_line_item_property_basic_properties() -> None:
@@ -462,3 +463,116 @@ def test_line_item_property_extended_explicit_display_modifier_not_empty_with_em
 
     # Assert
     assert line_output == expected_text
+
+
+def test_line_item_property_placeholder_with_missing_value() -> None:
+    """Test to verify that the placeholder is shown if the property did not resolve
+    before its deadline."""
+
+    # Arrange
+    ap = ApplicationProperties()
+    data_source = "system"
+    data_item = "user_name"
+    ap.load_from_dict(
+        {
+            "bob": {
+                "type": "property",
+                "data_source": data_source,
+                "data_item": data_item,
+                "prefix": "[",
+                "suffix": "]",
+                "deadline_ms": 50,
+                "placeholder": "...",
+            }
+        }
+    )
+    cached_values = {}
+    expected_text = "[...]"
+
+    # Act
+    line_item = PropertyItem.from_properties(ap, "bob")
+    line_output = line_item.generate_line_segements(cached_values)
+
+    # Assert
+    assert line_item.deadline_ms == 50
+    assert line_output == expected_text
+
+
+def test_line_item_property_deadline_bad() -> None:
+    """Test to verify that a deadline that is not a positive integer generates an
+    error."""
+
+    # Arrange
+    ap = ApplicationProperties()
+    data_source = "system"
+    data_item = "user_name"
+    ap.load_from_dict(
+        {
+            "bob": {
+                "type": "property",
+                "data_source": data_source,
+                "data_item": data_item,
+                "deadline_ms": 0,
+            }
+        }
+    )
+
+    # Act
+    # Assert
+    assert_that_exception_is_raised(
+        ValueError,
+        "Property 'bob.deadline_ms' is present, but not defined as a positive integer.",
+        PropertyItem.from_properties,
+        ap,
+        "bob",
+    )
+
+
+def test_line_item_property_refresh_background() -> None:
+    """Test to verify that an item can be refreshed in the background."""
+
+    # Arrange
+    ap = ApplicationProperties()
+    ap.load_from_dict(
+        {
+            "bob": {
+                "type": "property",
+                "data_source": "git",
+                "data_item": "branch",
+                "refresh": "background",
+            }
+        }
+    )
+
+    # Act
+    line_item = PropertyItem.from_properties(ap, "bob")
+
+    # Assert
+    assert line_item.refresh == ItemRefreshMode.BACKGROUND
+
+
+def test_line_item_property_refresh_bad() -> None:
+    """Test to verify that a bad refresh mode generates an error."""
+
+    # Arrange
+    ap = ApplicationProperties()
+    ap.load_from_dict(
+        {
+            "bob": {
+                "type": "property",
+                "data_source": "git",
+                "data_item": "branch",
+                "refresh": "sometimes",
+            }
+        }
+    )
+
+    # Act
+    # Assert
+    assert_that_exception_is_raised(
+        ValueError,
+        "Property 'bob.refresh' cannot be assigned the value 'SOMETIMES'.",
+        PropertyItem.from_properties,
+        ap,
+        "bob",
+    )
@@ -5,6 +5,7 @@ Tests for the mainline of the application.
 # pylint: disable=unused-import
 import os
 import string
+import sys
 from test.patches import (  # noqa: F401
     MOCK_GIT_BRANCH_NAME,
     mock_gethostname_impl,
@@ -24,6 +25,10 @@ from pyshell.main import PyShell
 
 # pylint: enable=unused-import
 
+ENTRY_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py"
+)
+
 
 class ApplicationMainline(InProcessExecution):
     """
@@ -64,14 +69,17 @@ def test_mainline_no_command() -> None:
                [--strict-config] [--stack-trace]
                [--log-level {CRITICAL,ERROR,WARNING,INFO,DEBUG}]
                [--log-file LOG_FILE]
-               {init,run,version} ...
+               {compile,init,run,serve,version} ...
 
 Lint any found Markdown files.
 
 positional arguments:
-  {init,run,version}
-    init                Initialize the...
+  {compile,init,run,serve,version}
+    compile             Generate a shell function that renders the prompt.
+    init                Generate the shell hook that keeps the prompt up to
+                        date.
     run                 Initialize the...
+    serve               Run a daemon that renders prompts for clients.
     version             Version of the application.
 
 options:
@@ -110,14 +118,17 @@ def test_mainline_help_command() -> None:
                [--strict-config] [--stack-trace]
                [--log-level {CRITICAL,ERROR,WARNING,INFO,DEBUG}]
                [--log-file LOG_FILE]
-               {init,run,version} ...
+               {compile,init,run,serve,version} ...
 
 Lint any found Markdown files.
 
 positional arguments:
-  {init,run,version}
-    init                Initialize the...
+  {compile,init,run,serve,version}
+    compile             Generate a shell function that renders the prompt.
+    init                Generate the shell hook that keeps the prompt up to
+                        date.
     run                 Initialize the...
+    serve               Run a daemon that renders prompts for clients.
     version             Version of the application.
 
 options:
@@ -158,7 +169,7 @@ def test_mainline_log_level_unknown() -> None:
                [--strict-config] [--stack-trace]
                [--log-level {CRITICAL,ERROR,WARNING,INFO,DEBUG}]
                [--log-file LOG_FILE]
-               {init,run,version} ...
+               {compile,init,run,serve,version} ...
 main.py: error: argument --log-level: invalid validate_log_level_type value: 'unknown'"""
     expected_return_code = 2
 
@@ -177,10 +188,11 @@ def test_mainline_log_level_debug() -> None:
 
     # Arrange
     application_runner = ApplicationMainline()
-    arguments_to_use = ["--log-level", "DEBUG", "init"]
+    arguments_to_use = ["--log-level", "DEBUG", "init", "--shell", "bash"]
 
-    expected_output = """export PS1="\\$(IS_PYSHELL_PS1=1 /c/Users/jack/.virtualenvs/pyshell-lw4-13FC/Scripts/python.exe /c/enlistments/pyshell/main.py run)"
-"""
+    expected_render_command = (
+        f"IS_PYSHELL_PS1=1 {sys.executable} {ENTRY_SCRIPT_PATH} run"
+    )
     expected_error = ""
     expected_return_code = 0
 
@@ -188,7 +200,9 @@ def test_mainline_log_level_debug() -> None:
     execute_result = application_runner.invoke_main(arguments=arguments_to_use)
 
     # Assert
-    execute_result.assert_results(expected_output, expected_error, expected_return_code)
+    assert execute_result.return_code == expected_return_code
+    assert execute_result.std_err.getvalue() == expected_error
+    assert expected_render_command in execute_result.std_out.getvalue()
 
 
 def test_mainline_log_file() -> None:
@@ -205,10 +219,13 @@ def test_mainline_log_file() -> None:
             "--log-level",
             "DEBUG",
             "init",
+            "--shell",
+            "bash",
         ]
 
-        expected_output = """export PS1="\\$(IS_PYSHELL_PS1=1 /c/Users/jack/.virtualenvs/pyshell-lw4-13FC/Scripts/python.exe /c/enlistments/pyshell/main.py run)"
-"""
+        expected_render_command = (
+            f"IS_PYSHELL_PS1=1 {sys.executable} {ENTRY_SCRIPT_PATH} run"
+        )
         expected_error = ""
         expected_return_code = 0
 
@@ -216,9 +233,9 @@ def test_mainline_log_file() -> None:
         execute_result = application_runner.invoke_main(arguments=arguments_to_use)
 
         # Assert
-        execute_result.assert_results(
-            expected_output, expected_error, expected_return_code
-        )
+        assert execute_result.return_code == expected_return_code
+        assert execute_result.std_err.getvalue() == expected_error
+        assert expected_render_command in execute_result.std_out.getvalue()
 
         ss = read_contents_of_text_file(configuration_file_name)
         assert "Logging subsystem setup completed." in ss
@@ -305,8 +322,8 @@ def test_mainline_unknown() -> None:
                [--strict-config] [--stack-trace]
                [--log-level {CRITICAL,ERROR,WARNING,INFO,DEBUG}]
                [--log-file LOG_FILE]
-               {init,run,version} ...
-main.py: error: argument primary_subparser: invalid choice: 'unknown' (choose from init, run, version)
+               {compile,init,run,serve,version} ...
+main.py: error: argument primary_subparser: invalid choice: 'unknown' (choose from compile, init, run, serve, version)
 """
     expected_return_code = 2
 
@@ -331,8 +348,8 @@ def test_mainline_unknown_via_module() -> None:
                    [--set SET_CONFIGURATION] [--strict-config] [--stack-trace]
                    [--log-level {CRITICAL,ERROR,WARNING,INFO,DEBUG}]
                    [--log-file LOG_FILE]
-                   {init,run,version} ...
-__main.py__: error: argument primary_subparser: invalid choice: 'unknown' (choose from init, run, version)
+                   {compile,init,run,serve,version} ...
+__main.py__: error: argument primary_subparser: invalid choice: 'unknown' (choose from compile, init, run, serve, version)
 """
     expected_return_code = 2
 
@@ -358,8 +375,8 @@ def test_mainline_unknown_via_direct_arguments() -> None:
     expected_error = """usage: run_pytest_script.py [-h] [--stack-trace]
                             [--log-level {CRITICAL,ERROR,WARNING,INFO,DEBUG}]
                             [--log-file LOG_FILE]
-                            {init,run,version} ...
-run_pytest_script.py: error: argument primary_subparser: invalid choice: 'unknown' (choose from 'init', 'run', 'version')
+                            {compile,init,run,serve,version} ...
+run_pytest_script.py: error: argument primary_subparser: invalid choice: 'unknown' (choose from 'compile', 'init', 'run', 'serve', 'version')
 """
     expected_return_code = 2
 
@@ -393,6 +410,25 @@ def test_mainline_version() -> None:
     execute_result.assert_results(expected_output, expected_error, expected_return_code)
 
 
+def test_mainline_bare_run_arguments_match_parser() -> None:
+    """
+    Test to verify that the arguments provided for a "run" command with no options,
+    without building the full parser, match those that the parser would provide.
+    """
+
+    # Arrange
+    arguments_to_use = ["run"]
+
+    # Act
+    bare_run_arguments = PyShell.parse_bare_run_arguments(arguments_to_use)
+    parsed_arguments = PyShell.create_argument_parser().parse_args(arguments_to_use)
+
+    # Assert
+    assert bare_run_arguments is not None
+    assert vars(bare_run_arguments) == vars(parsed_arguments)
+    assert PyShell.parse_bare_run_arguments(["run", "--client"]) is None
+
+
 def test_mainline_init() -> None:
     """
     Test to verify that we can invoke the init command.
@@ -400,18 +436,22 @@ def test_mainline_init() -> None:
 
     # Arrange
     application_runner = ApplicationMainline()
-    arguments_to_use = ["init"]
+    arguments_to_use = ["init", "--shell", "bash"]
 
-    expected_output = """export PS1="\\$(IS_PYSHELL_PS1=1 /c/Users/jack/.virtualenvs/pyshell-lw4-13FC/Scripts/python.exe /c/enlistments/pyshell/main.py run)"
-"""
-    expected_error = ""
+    expected_render_command = (
+        f"IS_PYSHELL_PS1=1 {sys.executable} {ENTRY_SCRIPT_PATH} run"
+    )
     expected_return_code = 0
 
     # Act
     execute_result = application_runner.invoke_main(arguments=arguments_to_use)
 
     # Assert
-    execute_result.assert_results(expected_output, expected_error, expected_return_code)
+    assert execute_result.return_code == expected_return_code
+    hook_script = execute_result.std_out.getvalue()
+    assert expected_render_command in hook_script
+    assert "\nPS1='${__pyshell_prompt_value}'\n" in hook_script
+    assert hook_script.endswith("\nunset -f __pyshell_prompt_trap\n")
 
 
 def test_mainline_run(
@@ -56,7 +56,7 @@ def test_project_data_source_get_property_dependencies_root_directory_no_dynamic
     generated_value = data_source.get_property_dependencies("root_directory")
 
     # Assert
-    assert generated_value == [PropertyPath.from_one("system.full_cwd")]
+    assert generated_value == (PropertyPath.from_one("system.full_cwd"),)
 
 
 def test_project_data_source_get_property_dependencies_root_directory_bad_dynamic() -> (
@@ -75,7 +75,7 @@ def test_project_data_source_get_property_dependencies_root_directory_bad_dynami
     generated_value = data_source.get_property_dependencies("unknown")
 
     # Assert
-    assert generated_value == []
+    assert generated_value == ()
 
 
 def test_project_data_source_get_property_dependencies_root_directory_good_dynamic() -> (
@@ -96,7 +96,7 @@ def test_project_data_source_get_property_dependencies_root_directory_good_dynam
     generated_value = data_source.get_property_dependencies("root_directory")
 
     # Assert
-    assert generated_value == [
+    assert generated_value == (
         PropertyPath.from_one("system.root_directory"),
         PropertyPath.from_one("system.full_cwd"),
-    ]
+    )
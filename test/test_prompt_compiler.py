@@ -0,0 +1,229 @@
+"""
+Tests for the PromptCompiler class.
+"""
+
+import os
+import shutil
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+from test.test_main_line import ENTRY_SCRIPT_PATH, ApplicationMainline
+from test.utils import create_temporary_configuration_file
+
+import pytest
+from application_properties import ApplicationProperties
+
+from pyshell.data_source_manager import DataSourceManager
+from pyshell.line_item_manager import LineItemManager, PropertyItem, TextItem
+from pyshell.line_items.line_item import LineItem
+from pyshell.line_items.property_item import ItemDisplayModifier
+from pyshell.prompt_compiler import PromptCompiler
+
+APPLICATION_COMMAND = [sys.executable, ENTRY_SCRIPT_PATH]
+
+
+def create_compiler(line_item_manager: LineItemManager) -> PromptCompiler:
+    """Create a compiler for the line items, using the standard data sources."""
+    data_source_manager = DataSourceManager()
+    data_source_manager.from_properties(ApplicationProperties())
+    return PromptCompiler(data_source_manager, line_item_manager, APPLICATION_COMMAND)
+
+
+def run_compiled_prompt(compiled_script: str, working_directory: str) -> str:
+    """Run the compiled script in bash, returning what the prompt function prints."""
+    completed_process = subprocess.run(  # nosec subprocess_without_shell_equals_true
+        ["bash", "-c", compiled_script + "\n" + PromptCompiler.FUNCTION_NAME],
+        cwd=working_directory,
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return completed_process.stdout
+
+
+def test_prompt_compiler_translated_properties() -> None:
+    """Test to verify that properties with a shell translation do not invoke the
+    application."""
+
+    # Arrange
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("system", "full_cwd", prefix="["))
+    line_item_manager.register_item(TextItem("]$ "))
+    prompt_compiler = create_compiler(line_item_manager)
+
+    # Act
+    compiled_script = prompt_compiler.compile("bash")
+
+    # Assert
+    assert "IS_PYSHELL_PS1" not in compiled_script
+    assert '__pyshell_property_0="$PWD"' in compiled_script
+    assert compiled_script.endswith("\nPS1='$(__pyshell_prompt)'")
+
+
+def test_prompt_compiler_untranslated_property_uses_application() -> None:
+    """Test to verify that properties without a shell translation are evaluated by
+    a single invocation of the application."""
+
+    # Arrange
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("system", "date"))
+    line_item_manager.register_item(PropertyItem("system", "cwd"))
+    line_item_manager.register_item(PropertyItem("system", "time_24"))
+    prompt_compiler = create_compiler(line_item_manager)
+
+    # Act
+    compiled_script = prompt_compiler.compile("bash")
+
+    # Assert
+    assert compiled_script.count("IS_PYSHELL_PS1=1 ") == 1
+    assert "run --property system.date --property system.time_24;" in compiled_script
+
+
+def test_prompt_compiler_zsh() -> None:
+    """Test to verify that the zsh function escapes the prompt and turns on prompt
+    substitution."""
+
+    # Arrange
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(TextItem("100% "))
+    prompt_compiler = create_compiler(line_item_manager)
+
+    # Act
+    compiled_script = prompt_compiler.compile("zsh")
+
+    # Assert
+    assert """printf '%s' "${__pyshell_output//\\%/%%}\"""" in compiled_script
+    assert compiled_script.endswith(
+        "\nsetopt PROMPT_SUBST\nPROMPT='$(__pyshell_prompt)'"
+    )
+
+
+def test_prompt_compiler_quote_for_shell() -> None:
+    """Test to verify that text that cannot be quoted on a single line is quoted
+    using escapes."""
+
+    # Arrange
+    text_to_quote = "it's\n$ "
+
+    # Act
+    quoted_text = LineItem._quote_for_shell(text_to_quote)
+
+    # Assert
+    assert quoted_text == "$'it\\'s\\n$ '"
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_prompt_compiler_run_in_bash() -> None:
+    """Test to verify that the compiled function renders the same prompt that the
+    application would."""
+
+    # Arrange
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(PropertyItem("system", "cwd", prefix="["))
+    line_item_manager.register_item(
+        PropertyItem(
+            "git",
+            "branch",
+            prefix=" (",
+            suffix=")",
+            display_modifier=ItemDisplayModifier.NOT_EMPTY,
+        )
+    )
+    line_item_manager.register_item(TextItem("]\n$ "))
+    prompt_compiler = create_compiler(line_item_manager)
+    compiled_script = prompt_compiler.compile("bash")
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        project_directory = os.path.join(temporary_directory, "project")
+        os.makedirs(os.path.join(project_directory, ".git"))
+        with open(
+            os.path.join(project_directory, ".git", "HEAD"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("ref: refs/heads/feature/compile\n")
+
+        # Act
+        inside_output = run_compiled_prompt(compiled_script, project_directory)
+        outside_output = run_compiled_prompt(compiled_script, temporary_directory)
+
+    # Assert
+    assert inside_output == "[project (feature/compile)]\n$ "
+    assert outside_output == f"[{os.path.basename(temporary_directory)}]\n$ "
+
+
+def test_mainline_compile() -> None:
+    """Test to verify that the compile command prints the prompt function."""
+
+    # Arrange
+    application_runner = ApplicationMainline()
+    arguments_to_use = ["compile", "--shell", "zsh"]
+
+    # Act
+    execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+    # Assert
+    assert execute_result.return_code == 0
+    compiled_lines = execute_result.std_out.getvalue().splitlines()
+    assert compiled_lines[1] == "__pyshell_prompt() {"
+    assert compiled_lines[-1] == "PROMPT='$(__pyshell_prompt)'"
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_mainline_compile_fallback_from_other_directory() -> None:
+    """Test to verify that properties without a shell translation are evaluated by
+    the application from a directory other than the one that contains it."""
+
+    # Arrange
+    json_configuration = """{"items": {"date": {"type": "property",
+        "data_source": "system", "data_item": "date"}}}"""
+    application_runner = ApplicationMainline()
+    with create_temporary_configuration_file(json_configuration) as config_path:
+        arguments_to_use = ["--config", config_path, "compile", "--shell", "bash"]
+        execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+        compiled_script = execute_result.std_out.getvalue()
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            # Act
+            completed_process = (
+                subprocess.run(  # nosec subprocess_without_shell_equals_true
+                    [
+                        "bash",
+                        "-c",
+                        compiled_script + "\n" + PromptCompiler.FUNCTION_NAME,
+                    ],
+                    cwd=temporary_directory,
+                    text=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=True,
+                )
+            )
+
+    # Assert
+    assert f"{sys.executable} {ENTRY_SCRIPT_PATH} --config" in compiled_script
+    assert completed_process.stdout
+    assert completed_process.stderr == ""
+
+
+def test_mainline_run_property() -> None:
+    """Test to verify that the run command can print the values of properties."""
+
+    # Arrange
+    application_runner = ApplicationMainline()
+    arguments_to_use = [
+        "run",
+        "--property",
+        "system.cwd",
+        "--property",
+        "system.full_cwd",
+    ]
+
+    expected_output = f"{os.path.basename(os.getcwd())}\n{os.getcwd()}\n"
+    expected_error = ""
+    expected_return_code = 0
+
+    # Act
+    execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+    # Assert
+    execute_result.assert_results(expected_output, expected_error, expected_return_code)
@@ -0,0 +1,261 @@
+"""
+Tests for the PromptHook class.
+"""
+
+import os
+import shutil
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+from test.test_main_line import ENTRY_SCRIPT_PATH, ApplicationMainline
+from test.utils import create_temporary_configuration_file
+from typing import List
+
+import pytest
+
+from pyshell.prompt_hook import PromptHook
+
+
+def create_counting_command(log_path: str) -> List[str]:
+    """Create a command that stands in for the application, printing how many
+    times it has been invoked."""
+    return [
+        "sh",
+        "-c",
+        f'echo x >> "{log_path}"; printf "%s" "rendered $(wc -l < "{log_path}")"',
+    ]
+
+
+def run_hook_steps(hook_script: str, working_directory: str, steps: str) -> str:
+    """Load the hook in bash and run the steps, returning what they print."""
+    completed_process = subprocess.run(  # nosec subprocess_without_shell_equals_true
+        ["bash", "-c", hook_script + "\n" + steps],
+        cwd=working_directory,
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return completed_process.stdout
+
+
+def test_prompt_hook_detect_shell(monkeypatch) -> None:
+    """Test to verify that the shell is detected from the SHELL variable."""
+
+    # Arrange
+    monkeypatch.setenv("SHELL", "/usr/bin/zsh")
+
+    # Act
+    detected_shell = PromptHook.detect_shell()
+
+    # Assert
+    assert detected_shell == "zsh"
+
+
+def test_prompt_hook_detect_shell_unknown(monkeypatch) -> None:
+    """Test to verify that an unsupported shell defaults to bash."""
+
+    # Arrange
+    monkeypatch.setenv("SHELL", "/bin/fish")
+
+    # Act
+    detected_shell = PromptHook.detect_shell()
+
+    # Assert
+    assert detected_shell == "bash"
+
+
+def test_prompt_hook_zsh() -> None:
+    """Test to verify that the zsh hook is installed as a precmd hook."""
+
+    # Arrange
+    prompt_hook = PromptHook(
+        create_counting_command("render.log"), "/tmp/pyshell.cfg", True
+    )
+
+    # Act
+    hook_script = prompt_hook.generate("zsh")
+
+    # Assert
+    assert hook_script.endswith(
+        "\nadd-zsh-hook precmd __pyshell_prompt_hook\nsetopt PROMPT_SUBST\n"
+        + "PROMPT='${__pyshell_prompt_value//\\%/%%}'\n"
+        + "add-zsh-hook zshexit __pyshell_prompt_remove_marker"
+    )
+
+
+def test_prompt_hook_volatile() -> None:
+    """Test to verify that without the render cache, the hook always renders."""
+
+    # Arrange
+    prompt_hook = PromptHook(
+        create_counting_command("render.log"), "/tmp/pyshell.cfg", False
+    )
+
+    # Act
+    hook_script = prompt_hook.generate("bash")
+
+    # Assert
+    assert "-nt" not in hook_script
+    assert "mktemp" not in hook_script
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_prompt_hook_renders_only_on_change() -> None:
+    """Test to verify that the hook only renders the prompt again if the directory,
+    the git HEAD or the configuration file changes."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        configuration_file = os.path.join(temporary_directory, "pyshell.cfg")
+        with open(configuration_file, "wt", encoding="utf-8") as outfile:
+            outfile.write("{}")
+        git_directory = os.path.join(temporary_directory, "project", ".git")
+        os.makedirs(git_directory)
+        with open(
+            os.path.join(git_directory, "HEAD"), "wt", encoding="utf-8"
+        ) as outfile:
+            outfile.write("ref: refs/heads/main\n")
+        prompt_hook = PromptHook(
+            create_counting_command(os.path.join(temporary_directory, "render.log")),
+            configuration_file,
+            True,
+        )
+        steps = """show() { __pyshell_prompt_hook; printf '%s\\n' "$__pyshell_prompt_value"; }
+show
+show
+cd project
+show
+show
+sleep 0.1; printf 'ref: refs/heads/other\\n' > .git/HEAD
+show
+show
+sleep 0.1; printf '{ }' > ../pyshell.cfg
+show
+false; __pyshell_prompt_hook; echo "status $?"
+"""
+
+        # Act
+        hook_output = run_hook_steps(
+            prompt_hook.generate("bash"), temporary_directory, steps
+        )
+
+    # Assert
+    assert hook_output.splitlines() == [
+        "rendered 1",
+        "rendered 1",
+        "rendered 2",
+        "rendered 2",
+        "rendered 3",
+        "rendered 3",
+        "rendered 4",
+        "status 1",
+    ]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_prompt_hook_removes_marker_on_exit() -> None:
+    """Test to verify that the marker file is kept if the hook is loaded again, and
+    is removed when the shell exits, without replacing an existing EXIT trap."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        prompt_hook = PromptHook(
+            create_counting_command(os.path.join(temporary_directory, "render.log")),
+            os.path.join(temporary_directory, "pyshell.cfg"),
+            True,
+        )
+        hook_script = prompt_hook.generate("bash")
+        steps = f"""first_marker="$__pyshell_prompt_marker"
+{hook_script}
+[ "$__pyshell_prompt_marker" = "$first_marker" ] && echo "same marker"
+__pyshell_prompt_hook
+printf '%s\\n' "$__pyshell_prompt_marker"
+"""
+
+        # Act
+        hook_output = run_hook_steps(
+            "trap 'echo user trap' EXIT\n" + hook_script,
+            temporary_directory,
+            steps,
+        ).splitlines()
+        marker_path = hook_output[1]
+        is_marker_removed = not os.path.exists(marker_path)
+
+    # Assert
+    assert hook_output[0] == "same marker"
+    assert marker_path
+    assert is_marker_removed
+    assert hook_output[2:] == ["user trap"]
+
+
+def test_mainline_init_with_volatile_property() -> None:
+    """Test to verify that if the prompt shows the time, the hook renders it every
+    time instead of caching it."""
+
+    # Arrange
+    json_configuration = """{"items": {"time": {"type": "property",
+        "data_source": "system", "data_item": "time_24"}}}"""
+    application_runner = ApplicationMainline()
+    with create_temporary_configuration_file(json_configuration) as config_path:
+        arguments_to_use = ["--config", config_path, "init", "--shell", "bash"]
+
+        # Act
+        execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+    # Assert
+    assert execute_result.return_code == 0
+    hook_script = execute_result.std_out.getvalue()
+    assert f"{ENTRY_SCRIPT_PATH} --config {config_path} run" in hook_script
+    assert "-nt" not in hook_script
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_prompt_hook_from_other_directory() -> None:
+    """Test to verify that the hook generated by the entry script renders the prompt
+    from a directory other than the one that contains the application."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        configuration_file = os.path.join(temporary_directory, "pyshell.json")
+        with open(configuration_file, "wt", encoding="utf-8") as outfile:
+            outfile.write('{"items": {"prompt": {"type": "text", "text": "--> "}}}')
+        hook_environment = dict(os.environ)
+        hook_environment.pop("PYTHONPATH", None)
+        hook_environment["XDG_CACHE_HOME"] = os.path.join(temporary_directory, "cache")
+        init_process = subprocess.run(  # nosec subprocess_without_shell_equals_true
+            [
+                sys.executable,
+                ENTRY_SCRIPT_PATH,
+                "--config",
+                configuration_file,
+                "init",
+                "--shell",
+                "bash",
+            ],
+            cwd=temporary_directory,
+            env=hook_environment,
+            text=True,
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+
+        # Act
+        hook_process = subprocess.run(  # nosec subprocess_without_shell_equals_true
+            [
+                "bash",
+                "-c",
+                init_process.stdout
+                + '\n__pyshell_prompt_hook; printf "%s" "$__pyshell_prompt_value"',
+            ],
+            cwd=temporary_directory,
+            env=hook_environment,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+        )
+
+    # Assert
+    assert hook_process.stdout.startswith("-->")
+    assert "No module named" not in hook_process.stderr
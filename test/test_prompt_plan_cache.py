@@ -0,0 +1,197 @@
+"""Module to provide tests for the PromptPlanCache class.
+"""
+
+import json
+import os
+import tempfile
+from test.patches import set_environment_simulating_execution_in_ps1
+from test.test_main_line import ApplicationMainline
+from test.utils import create_temporary_configuration_file
+
+from application_properties import ApplicationProperties
+
+from pyshell.line_item_manager import LineItemManager, PropertyItem, TextItem
+from pyshell.line_items.property_item import ItemDisplayModifier
+from pyshell.prompt_plan_cache import PromptPlan, PromptPlanCache
+
+
+def test_prompt_plan_cache_compute_key_missing_file() -> None:
+    """Test to verify that a configuration file that does not exist has no key."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        configuration_file = os.path.join(temporary_directory, "missing.cfg")
+
+        # Act
+        plan_key = PromptPlanCache.compute_key(configuration_file, False)
+
+    # Assert
+    assert plan_key is None
+
+
+def test_prompt_plan_cache_compute_key_changes_with_contents() -> None:
+    """Test to verify that changing the configuration file contents changes the key."""
+
+    # Arrange
+    with create_temporary_configuration_file('{"a": 1}') as configuration_file:
+        first_key = PromptPlanCache.compute_key(configuration_file, False)
+        with open(configuration_file, "wt", encoding="utf-8") as outfile:
+            outfile.write('{"a": 2}')
+
+        # Act
+        second_key = PromptPlanCache.compute_key(configuration_file, False)
+
+    # Assert
+    assert first_key is not None
+    assert second_key is not None
+    assert first_key.content_hash != second_key.content_hash
+    assert first_key != second_key
+
+
+def test_prompt_plan_cache_save_and_load() -> None:
+    """Test to verify that a saved plan can be loaded and applied."""
+
+    # Arrange
+    properties = ApplicationProperties()
+    properties.load_from_dict({"log": {"level": "INFO"}})
+    line_item_manager = LineItemManager()
+    line_item_manager.register_item(TextItem("bob"))
+    line_item_manager.register_item(
+        PropertyItem(
+            "system", "cwd", prefix="[", display_modifier=ItemDisplayModifier.NOT_EMPTY
+        )
+    )
+    prompt_plan = PromptPlan.from_managers(properties, line_item_manager)
+    assert prompt_plan is not None
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        with create_temporary_configuration_file("{}") as configuration_file:
+            plan_key = PromptPlanCache.compute_key(configuration_file, False)
+            assert plan_key is not None
+            plan_cache = PromptPlanCache(temporary_directory)
+            plan_cache.save(plan_key, prompt_plan)
+
+            # Act
+            loaded_plan = plan_cache.load(plan_key)
+
+    # Assert
+    assert loaded_plan == prompt_plan
+
+    new_properties = ApplicationProperties()
+    loaded_plan.apply_settings(new_properties)
+    assert new_properties.get_string_property("log.level") == "INFO"
+
+    new_line_item_manager = LineItemManager()
+    loaded_plan.apply_line_items(new_line_item_manager)
+    assert new_line_item_manager.line_items == line_item_manager.line_items
+    assert (
+        new_line_item_manager.get_properties_required_for_items()
+        == line_item_manager.get_properties_required_for_items()
+    )
+
+
+def test_prompt_plan_cache_load_out_of_date() -> None:
+    """Test to verify that a plan compiled from different contents is not loaded."""
+
+    # Arrange
+    prompt_plan = PromptPlan(settings={}, line_items=[], required_properties=[])
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        with create_temporary_configuration_file("{}") as configuration_file:
+            plan_cache = PromptPlanCache(temporary_directory)
+            first_key = PromptPlanCache.compute_key(configuration_file, False)
+            assert first_key is not None
+            plan_cache.save(first_key, prompt_plan)
+            second_key = PromptPlanCache.compute_key(configuration_file, True)
+            assert second_key is not None
+
+            # Act
+            loaded_plan = plan_cache.load(second_key)
+
+    # Assert
+    assert loaded_plan is None
+
+
+def test_mainline_prompt_plan_used_when_invoked_from_ps1(monkeypatch) -> None:
+    """Test to verify that when invoked from the prompt, the second run of the
+    same configuration uses the cached plan instead of parsing the configuration."""
+
+    # Arrange
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        monkeypatch.setenv("XDG_CACHE_HOME", temporary_directory)
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = ["--config", config_path, "run"]
+            with set_environment_simulating_execution_in_ps1():
+                first_result = application_runner.invoke_main(
+                    arguments=arguments_to_use
+                )
+            plan_directory = os.path.join(temporary_directory, "pyshell", "plans")
+            plan_file = os.path.join(plan_directory, os.listdir(plan_directory)[0])
+            with open(plan_file, "rt", encoding="utf-8") as infile:
+                plan_document = json.load(infile)
+            plan_document["plan"]["line_items"][0]["text"] = "cached> "
+            with open(plan_file, "wt", encoding="utf-8") as outfile:
+                json.dump(plan_document, outfile)
+
+            # Act
+            with set_environment_simulating_execution_in_ps1():
+                second_result = application_runner.invoke_main(
+                    arguments=arguments_to_use
+                )
+
+    # Assert
+    first_result.assert_results("-->\a".replace("\a", " "), "", 0)
+    second_result.assert_results("cached>\a".replace("\a", " "), "", 0)
+
+
+def test_mainline_prompt_plan_with_bad_line_items(monkeypatch) -> None:
+    """Test to verify that a cached plan whose line items cannot be loaded, such as
+    one that was edited by hand, is treated as missing and the configuration is
+    parsed instead."""
+
+    # Arrange
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        monkeypatch.setenv("XDG_CACHE_HOME", temporary_directory)
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = ["--config", config_path, "run"]
+            with set_environment_simulating_execution_in_ps1():
+                application_runner.invoke_main(arguments=arguments_to_use)
+            plan_directory = os.path.join(temporary_directory, "pyshell", "plans")
+            plan_file = os.path.join(plan_directory, os.listdir(plan_directory)[0])
+            with open(plan_file, "rt", encoding="utf-8") as infile:
+                plan_document = json.load(infile)
+            del plan_document["plan"]["line_items"][0]["text"]
+            plan_document["plan"]["line_items"].append({"type": "unknown"})
+            with open(plan_file, "wt", encoding="utf-8") as outfile:
+                json.dump(plan_document, outfile)
+
+            # Act
+            with set_environment_simulating_execution_in_ps1():
+                execute_result = application_runner.invoke_main(
+                    arguments=arguments_to_use
+                )
+
+    # Assert
+    execute_result.assert_results("-->\a".replace("\a", " "), "", 0)
+
+
+def test_mainline_prompt_plan_not_used_when_invoked_normally(monkeypatch) -> None:
+    """Test to verify that when invoked normally, no plan is cached."""
+
+    # Arrange
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        monkeypatch.setenv("XDG_CACHE_HOME", temporary_directory)
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = ["--config", config_path, "run"]
+
+            # Act
+            execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+        # Assert
+        assert not os.path.exists(os.path.join(temporary_directory, "pyshell"))
+    execute_result.assert_results("-->\a".replace("\a", " "), "", 0)
@@ -0,0 +1,507 @@
+"""Module to provide tests for the PromptServer and PromptClient classes.
+"""
+
+import os
+import socket
+import stat
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+import threading
+from test.test_main_line import ENTRY_SCRIPT_PATH, ApplicationMainline
+from test.utils import create_temporary_configuration_file
+from typing import Dict
+
+import pytest
+
+from pyshell.application_configuration_helper import ApplicationConfigurationHelper
+from pyshell.file_path_helpers import FilePathHelpers
+from pyshell.main import PyShell
+from pyshell.prompt_client import PromptClient
+from pyshell.prompt_server import PromptServer
+from pyshell.pyshell_exception import PyShellException
+
+requires_unix_sockets = pytest.mark.skipif(
+    not PromptClient.is_supported(), reason="Requires Unix domain sockets."
+)
+
+
+def render_with_directory_and_user(
+    current_directory: str, environment: Dict[str, str]
+) -> str:
+    """Simple render function that reports the user and the current directory."""
+    return f"{environment.get('USER', '')}@{current_directory}"
+
+
+def render_with_error(current_directory: str, environment: Dict[str, str]) -> str:
+    """Simple render function that always fails."""
+    _ = (current_directory, environment)
+    raise ValueError("bad render")
+
+
+def test_prompt_client_parse_thin_arguments_run_client() -> None:
+    """Test to verify that a plain "run --client" invocation is handled by the thin client."""
+
+    # Arrange
+    arguments = ["run", "--client"]
+
+    # Act
+    prompt_client = PromptClient.parse_thin_arguments(arguments)
+
+    # Assert
+    assert prompt_client is not None
+    assert prompt_client.socket_path == PromptClient.default_socket_path()
+
+
+def test_prompt_client_parse_thin_arguments_run_client_with_socket() -> None:
+    """Test to verify that a "run --client --socket" invocation is handled by the thin client."""
+
+    # Arrange
+    arguments = ["run", "--client", "--socket", "/some/path.sock"]
+
+    # Act
+    prompt_client = PromptClient.parse_thin_arguments(arguments)
+
+    # Assert
+    assert prompt_client is not None
+    assert prompt_client.socket_path == "/some/path.sock"
+
+
+def test_prompt_client_parse_thin_arguments_run_client_with_config() -> None:
+    """Test to verify that a "--config ... run --client" invocation is handled by the
+    thin client, which asks for a daemon using that configuration file."""
+
+    # Arrange
+    arguments = ["--config", "pyshell.cfg", "run", "--client"]
+
+    # Act
+    prompt_client = PromptClient.parse_thin_arguments(arguments)
+
+    # Assert
+    assert prompt_client is not None
+    assert prompt_client.configuration_path == os.path.abspath("pyshell.cfg")
+
+
+def test_prompt_client_default_configuration_path() -> None:
+    """Test to verify that the client uses the same default configuration file as
+    the application."""
+
+    # Arrange
+
+    # Act
+    configuration_path = PromptClient.resolve_configuration_path(None)
+
+    # Assert
+    assert configuration_path == FilePathHelpers.normalize_path(
+        ApplicationConfigurationHelper.DEFAULT_CONFIGURATION_PATH
+    )
+
+
+def test_prompt_client_parse_thin_arguments_other_arguments() -> None:
+    """Test to verify that any other arguments are left for the full application."""
+
+    # Arrange
+    arguments_to_check = [
+        [],
+        ["run"],
+        ["--config", "abc", "run"],
+        ["--set", "abc=1", "run", "--client"],
+        ["run", "--client", "--socket"],
+        ["run", "--client", "--other", "abc"],
+    ]
+
+    # Act
+    # Assert
+    for arguments in arguments_to_check:
+        assert PromptClient.parse_thin_arguments(arguments) is None, str(arguments)
+
+
+def test_prompt_client_default_socket_path_from_environment(monkeypatch) -> None:
+    """Test to verify that the socket path environment variable has the highest precedence."""
+
+    # Arrange
+    monkeypatch.setenv(PromptClient.SOCKET_ENVIRONMENT_VARIABLE, "/env/path.sock")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+
+    # Act
+    socket_path = PromptClient.default_socket_path()
+
+    # Assert
+    assert socket_path == "/env/path.sock"
+
+
+def test_prompt_client_default_socket_path_from_runtime_directory(monkeypatch) -> None:
+    """Test to verify that the runtime directory is used if present."""
+
+    # Arrange
+    monkeypatch.delenv(PromptClient.SOCKET_ENVIRONMENT_VARIABLE, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+
+    # Act
+    socket_path = PromptClient.default_socket_path()
+
+    # Assert
+    assert socket_path == os.path.join("/run/user/1000", "pyshell.sock")
+
+
+@requires_unix_sockets
+def test_prompt_client_no_daemon() -> None:
+    """Test to verify that the client reports no output if no daemon is listening."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        prompt_client = PromptClient(
+            socket_path=os.path.join(temporary_directory, "missing.sock")
+        )
+
+        # Act
+        client_output = prompt_client.render("/", {})
+
+    # Assert
+    assert client_output is None
+
+
+@requires_unix_sockets
+def test_prompt_server_renders_for_client() -> None:
+    """Test to verify that the server renders the prompt using the directory and
+    environment supplied by the client."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        prompt_server = PromptServer(socket_path, render_with_directory_and_user)
+        prompt_server.start()
+        server_thread = threading.Thread(target=prompt_server.handle_next_request)
+        server_thread.start()
+
+        # Act
+        try:
+            client_output = PromptClient(socket_path=socket_path).render(
+                "/some/directory", {"USER": "bob"}
+            )
+        finally:
+            server_thread.join()
+            prompt_server.stop()
+
+        # Assert
+        assert client_output == "bob@/some/directory"
+        assert not os.path.exists(socket_path)
+
+
+@requires_unix_sockets
+def test_prompt_server_refuses_other_configuration() -> None:
+    """Test to verify that the server only renders the prompt for clients that use
+    the same configuration as it does."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        daemon_configuration = os.path.join(temporary_directory, "daemon.cfg")
+        prompt_server = PromptServer(
+            socket_path,
+            render_with_directory_and_user,
+            configuration_file=daemon_configuration,
+        )
+        prompt_server.start()
+
+        def handle_requests() -> None:
+            for _ in range(3):
+                prompt_server.handle_next_request()
+
+        server_thread = threading.Thread(target=handle_requests)
+        server_thread.start()
+
+        # Act
+        try:
+            other_output = PromptClient(
+                socket_path=socket_path,
+                configuration_file=os.path.join(temporary_directory, "other.cfg"),
+            ).render("/", {"USER": "bob"})
+            settings_output = PromptClient(
+                socket_path=socket_path,
+                configuration_file=daemon_configuration,
+                configuration_settings=["log.level=DEBUG"],
+            ).render("/", {"USER": "bob"})
+            same_output = PromptClient(
+                socket_path=socket_path, configuration_file=daemon_configuration
+            ).render("/", {"USER": "bob"})
+        finally:
+            server_thread.join()
+            prompt_server.stop()
+
+    # Assert
+    assert other_output is None
+    assert settings_output is None
+    assert same_output == "bob@/"
+
+
+@requires_unix_sockets
+def test_prompt_server_socket_not_accessible_to_others() -> None:
+    """Test to verify that the socket is created without access for other users."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        prompt_server = PromptServer(socket_path, render_with_directory_and_user)
+
+        # Act
+        try:
+            prompt_server.start()
+            socket_mode = os.stat(socket_path).st_mode
+        finally:
+            prompt_server.stop()
+
+    # Assert
+    assert stat.S_ISSOCK(socket_mode)
+    assert not socket_mode & 0o077
+
+
+@requires_unix_sockets
+def test_prompt_server_drops_stalled_client() -> None:
+    """Test to verify that a client that connects and never sends its request is
+    dropped, so that the next client still has its prompt rendered."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        prompt_server = PromptServer(
+            socket_path, render_with_directory_and_user, request_timeout=0.1
+        )
+        prompt_server.start()
+
+        def handle_two_requests() -> None:
+            prompt_server.handle_next_request()
+            prompt_server.handle_next_request()
+
+        server_thread = threading.Thread(target=handle_two_requests)
+        server_thread.start()
+
+        # Act
+        try:
+            with socket.socket(
+                getattr(socket, "AF_UNIX"), socket.SOCK_STREAM
+            ) as stalled_client:
+                stalled_client.connect(socket_path)
+                stalled_client.sendall(b'{"cwd": ')
+                client_output = PromptClient(socket_path=socket_path).render(
+                    "/some/directory", {"USER": "bob"}
+                )
+        finally:
+            server_thread.join()
+            prompt_server.stop()
+
+    # Assert
+    assert client_output == "bob@/some/directory"
+
+
+@requires_unix_sockets
+def test_prompt_server_render_error() -> None:
+    """Test to verify that if the server cannot render the prompt, the client reports
+    no output and can fall back to rendering in-process."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        prompt_server = PromptServer(socket_path, render_with_error)
+        prompt_server.start()
+        server_thread = threading.Thread(target=prompt_server.handle_next_request)
+        server_thread.start()
+
+        # Act
+        try:
+            client_output = PromptClient(socket_path=socket_path).render("/", {})
+        finally:
+            server_thread.join()
+            prompt_server.stop()
+
+    # Assert
+    assert client_output is None
+
+
+@requires_unix_sockets
+def test_prompt_server_stale_socket_removed() -> None:
+    """Test to verify that a socket file left behind by a previous daemon is removed."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        with open(socket_path, "wt", encoding="utf-8") as outfile:
+            outfile.write("")
+        prompt_server = PromptServer(socket_path, render_with_directory_and_user)
+
+        # Act
+        try:
+            prompt_server.start()
+            is_socket_present = os.path.exists(socket_path)
+        finally:
+            prompt_server.stop()
+
+    # Assert
+    assert is_socket_present
+
+
+@requires_unix_sockets
+def test_prompt_server_already_running() -> None:
+    """Test to verify that a second daemon cannot take over the socket of a running one."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        first_server = PromptServer(socket_path, render_with_directory_and_user)
+        first_server.start()
+        second_server = PromptServer(socket_path, render_with_directory_and_user)
+
+        # Act
+        try:
+            second_server.start()
+            assert False, "Should have raised an exception by now."  # noqa: B011
+        except PyShellException as this_exception:
+            caught_exception = this_exception
+        finally:
+            first_server.stop()
+
+    # Assert
+    assert (
+        str(caught_exception)
+        == f"A prompt daemon is already listening on '{socket_path}'."
+    )
+
+
+def test_mainline_run_client_without_daemon() -> None:
+    """Test to verify that the "run --client" command falls back to rendering the
+    prompt in-process if the daemon is not running."""
+
+    # Arrange
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = [
+                "--config",
+                config_path,
+                "run",
+                "--client",
+                "--socket",
+                os.path.join(temporary_directory, "missing.sock"),
+            ]
+
+            expected_output = "-->\a".replace("\a", " ")
+            expected_error = ""
+            expected_return_code = 0
+
+            # Act
+            execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+    # Assert
+    execute_result.assert_results(expected_output, expected_error, expected_return_code)
+
+
+def test_mainline_run_client_daemon_already_tried(monkeypatch) -> None:
+    """Test to verify that the "run --client" command does not try to connect to the
+    daemon again if the thin client has already found that it is not available."""
+
+    # Arrange
+    render_calls = []
+    monkeypatch.setattr(
+        PromptClient, "render_current", lambda self: render_calls.append(self)
+    )
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    with create_temporary_configuration_file(json_configuration) as config_path:
+        arguments_to_use = ["--config", config_path, "run", "--client"]
+
+        # Act
+        try:
+            PyShell(daemon_already_tried=True).main(direct_args=arguments_to_use)
+        except SystemExit as this_exit:
+            assert not this_exit.code
+
+    # Assert
+    assert not render_calls
+
+
+@requires_unix_sockets
+def test_mainline_run_client_other_configuration() -> None:
+    """Test to verify that the "run --client" command renders the prompt in-process
+    if the daemon was started with a different configuration file."""
+
+    # Arrange
+    json_configuration = '{"items": {"prompt": {"type": "text", "text": "--> "}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        prompt_server = PromptServer(
+            socket_path,
+            render_with_directory_and_user,
+            configuration_file=os.path.join(temporary_directory, "daemon.cfg"),
+        )
+        prompt_server.start()
+        server_thread = threading.Thread(target=prompt_server.handle_next_request)
+        server_thread.start()
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = [
+                "--config",
+                config_path,
+                "run",
+                "--client",
+                "--socket",
+                socket_path,
+            ]
+
+            # Act
+            try:
+                execute_result = application_runner.invoke_main(
+                    arguments=arguments_to_use
+                )
+            finally:
+                server_thread.join()
+                prompt_server.stop()
+
+    # Assert
+    execute_result.assert_results("-->\a".replace("\a", " "), "", 0)
+
+
+@requires_unix_sockets
+def test_entry_script_uses_thin_client() -> None:
+    """Test to verify that the "main.py" entry script asks the daemon to render the
+    prompt, without loading the rest of the application."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        socket_path = os.path.join(temporary_directory, "test.sock")
+        prompt_server = PromptServer(socket_path, render_with_directory_and_user)
+        prompt_server.start()
+        server_thread = threading.Thread(target=prompt_server.handle_next_request)
+        server_thread.start()
+        client_environment = dict(os.environ)
+        client_environment["USER"] = "bob"
+
+        # Act
+        try:
+            completed_process = (
+                subprocess.run(  # nosec subprocess_without_shell_equals_true
+                    [
+                        sys.executable,
+                        "-X",
+                        "importtime",
+                        ENTRY_SCRIPT_PATH,
+                        "run",
+                        "--client",
+                        "--socket",
+                        socket_path,
+                    ],
+                    cwd=temporary_directory,
+                    env=client_environment,
+                    text=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=True,
+                    timeout=10,
+                )
+            )
+        finally:
+            server_thread.join()
+            prompt_server.stop()
+
+    # Assert
+    assert completed_process.stdout == f"bob@{temporary_directory}\n"
+    assert "pyshell.main" not in completed_process.stderr
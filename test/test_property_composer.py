@@ -138,3 +138,45 @@ def test_property_composer_basic_with_default_and_multiple_dependencies_differen
     assert registered_properties[0] == new_dependency_two
     assert registered_properties[1] == new_dependency_one
     assert registered_properties[2] == default_dependency
+
+
+def test_property_composer_registered_properties_cached_until_added() -> None:
+    """Test to verify that the composer returns the same registered properties until
+    another dependency is added."""
+
+    # Arrange
+    default_dependency = PropertyPath.from_one("system.full_cwd")
+    new_dependency = PropertyPath.from_one("git.root_directory")
+    property_composer = PropertyComposer("basic", default_dependency)
+
+    # Act
+    first_properties = property_composer.registered_properties
+    second_properties = property_composer.registered_properties
+    property_composer.add_dependency(new_dependency, ComposerPriorityLevel.NORMAL)
+    third_properties = property_composer.registered_properties
+
+    # Assert
+    assert first_properties is second_properties
+    assert first_properties == (default_dependency,)
+    assert third_properties == (new_dependency, default_dependency)
+
+
+def test_property_path_full_name() -> None:
+    """Test to verify that the full name of a property path is interned, and is not
+    considered when comparing property paths."""
+
+    # Arrange
+    source_name = "".join(["sys", "tem"])
+
+    # Act
+    first_path = PropertyPath(source_name, "full_cwd")
+    second_path = PropertyPath.from_one("system.full_cwd")
+
+    # Assert
+    assert first_path.full_name == "system.full_cwd"
+    assert first_path.full_name is second_path.full_name
+    assert first_path == second_path
+    assert hash(first_path) == hash(second_path)
+    assert (
+        repr(first_path) == "PropertyPath(source_name='system', item_name='full_cwd')"
+    )
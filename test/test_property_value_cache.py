@@ -0,0 +1,432 @@
+"""Module to provide tests for the PropertyValueCache class.
+"""
+
+import json
+import os
+import subprocess  # nosec blacklist
+import sys
+import tempfile
+import threading
+import time
+from test.patches import set_environment_simulating_execution_in_ps1
+from test.test_main_line import ENTRY_SCRIPT_PATH, ApplicationMainline
+from test.utils import create_temporary_configuration_file
+
+from pyshell.data_sources.base_data_source import (
+    PropertyCachePolicy,
+    PropertyCacheScope,
+)
+from pyshell.property_value_cache import PropertyValueCache
+
+DIRECTORY_POLICY = PropertyCachePolicy(60, PropertyCacheScope.DIRECTORY)
+GLOBAL_POLICY = PropertyCachePolicy(60, PropertyCacheScope.GLOBAL)
+REPOSITORY_POLICY = PropertyCachePolicy(60, PropertyCacheScope.REPOSITORY)
+
+
+def test_property_value_cache_save_and_load() -> None:
+    """Test to verify that a saved value can be loaded by another instance."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("system.host_name", GLOBAL_POLICY, "scaramouche")
+        first_cache.save()
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        loaded_value = second_cache.get("system.host_name", GLOBAL_POLICY)
+
+    # Assert
+    assert loaded_value == "scaramouche"
+
+
+def test_property_value_cache_expired() -> None:
+    """Test to verify that a value is not loaded once its time to live has passed."""
+
+    # Arrange
+    expired_policy = PropertyCachePolicy(0, PropertyCacheScope.GLOBAL)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("system.host_name", expired_policy, "scaramouche")
+        first_cache.save()
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        loaded_value = second_cache.get("system.host_name", expired_policy)
+
+    # Assert
+    assert loaded_value is None
+
+
+def test_property_value_cache_scopes() -> None:
+    """Test to verify that directory scoped values are only loaded in the same
+    directory, that repository scoped values are loaded anywhere in the same
+    repository, and that global values are loaded anywhere."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        project_directory = os.path.join(temporary_directory, "project")
+        nested_directory = os.path.join(project_directory, "nested")
+        os.makedirs(os.path.join(project_directory, ".git"))
+        os.makedirs(nested_directory)
+        first_cache = PropertyValueCache(temporary_directory, project_directory)
+        first_cache.set("test.directory", DIRECTORY_POLICY, "d")
+        first_cache.set("test.repository", REPOSITORY_POLICY, "r")
+        first_cache.set("test.global", GLOBAL_POLICY, "g")
+        first_cache.save()
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, nested_directory)
+        loaded_values = [
+            second_cache.get("test.directory", DIRECTORY_POLICY),
+            second_cache.get("test.repository", REPOSITORY_POLICY),
+            second_cache.get("test.global", GLOBAL_POLICY),
+        ]
+
+    # Assert
+    assert loaded_values == [None, "r", "g"]
+
+
+def test_property_value_cache_save_merges() -> None:
+    """Test to verify that saving keeps the values saved by other instances in the
+    meantime."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("test.first", GLOBAL_POLICY, "1")
+        second_cache.set("test.second", GLOBAL_POLICY, "2")
+
+        # Act
+        first_cache.save()
+        second_cache.save()
+        third_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        loaded_values = [
+            third_cache.get("test.first", GLOBAL_POLICY),
+            third_cache.get("test.second", GLOBAL_POLICY),
+        ]
+
+    # Assert
+    assert loaded_values == ["1", "2"]
+
+
+def test_property_value_cache_file_fingerprint() -> None:
+    """Test to verify that a value is only loaded while the files that it depends on
+    have not changed."""
+
+    # Arrange
+    file_policy = PropertyCachePolicy(None, PropertyCacheScope.GLOBAL)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        head_path = os.path.join(temporary_directory, "HEAD")
+        missing_path = os.path.join(temporary_directory, "missing")
+        with open(head_path, "wt", encoding="utf-8") as outfile:
+            outfile.write("ref: refs/heads/main\n")
+        first_fingerprint = PropertyValueCache.compute_fingerprint(
+            [head_path, missing_path]
+        )
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("git.branch", file_policy, "main", first_fingerprint)
+        first_cache.save()
+        with open(head_path, "wt", encoding="utf-8") as outfile:
+            outfile.write("ref: refs/heads/feature/other\n")
+        second_fingerprint = PropertyValueCache.compute_fingerprint(
+            [head_path, missing_path]
+        )
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        unchanged_value = second_cache.get("git.branch", file_policy, first_fingerprint)
+        changed_value = second_cache.get("git.branch", file_policy, second_fingerprint)
+
+    # Assert
+    assert first_fingerprint[1] is None
+    assert first_fingerprint != second_fingerprint
+    assert unchanged_value == "main"
+    assert changed_value is None
+
+
+def test_property_value_cache_refresh_lock() -> None:
+    """Test to verify that only one refresh of the same properties in the same
+    directory can hold the lock at a time."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+
+        # Act
+        first_acquired = first_cache.acquire_refresh_lock(["git.branch", "test.a"])
+        second_acquired = second_cache.acquire_refresh_lock(["test.a", "git.branch"])
+        other_acquired = second_cache.acquire_refresh_lock(["git.branch"])
+        first_cache.release_refresh_lock(["git.branch", "test.a"])
+        third_acquired = second_cache.acquire_refresh_lock(["test.a", "git.branch"])
+
+    # Assert
+    assert first_acquired
+    assert not second_acquired
+    assert other_acquired
+    assert third_acquired
+
+
+def test_property_value_cache_concurrent_saves() -> None:
+    """Test to verify that values saved to the same scope at the same time by
+    different instances are all kept."""
+
+    # Arrange
+    save_count = 8
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        saving_caches = []
+        for next_index in range(save_count):
+            next_cache = PropertyValueCache(temporary_directory, temporary_directory)
+            next_cache.set(f"test.value_{next_index}", GLOBAL_POLICY, str(next_index))
+            saving_caches.append(next_cache)
+        start_barrier = threading.Barrier(save_count)
+
+        def save_cache(cache_to_save: PropertyValueCache) -> None:
+            start_barrier.wait()
+            cache_to_save.save()
+
+        saving_threads = [
+            threading.Thread(target=save_cache, args=(next_cache,))
+            for next_cache in saving_caches
+        ]
+
+        # Act
+        for next_thread in saving_threads:
+            next_thread.start()
+        for next_thread in saving_threads:
+            next_thread.join()
+        loading_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        loaded_values = [
+            loading_cache.get(f"test.value_{next_index}", GLOBAL_POLICY)
+            for next_index in range(save_count)
+        ]
+        remaining_locks = os.listdir(os.path.join(temporary_directory, "locks"))
+
+    # Assert
+    assert loaded_values == [str(next_index) for next_index in range(save_count)]
+    assert not remaining_locks
+
+
+def test_property_value_cache_save_prunes(monkeypatch) -> None:
+    """Test to verify that saving removes the values that have been expired for
+    longer than the retention period, and keeps only the values stored most
+    recently once a scope holds too many of them."""
+
+    # Arrange
+    monkeypatch.setattr(PropertyValueCache, "MAXIMUM_SCOPE_ENTRIES", 3)
+    expired_policy = PropertyCachePolicy(0, PropertyCacheScope.GLOBAL)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("test.recently_expired", expired_policy, "recent")
+        first_cache.set("test.long_expired", expired_policy, "long ago")
+        first_cache.save()
+        values_directory = os.path.join(temporary_directory, "values")
+        scope_path = os.path.join(values_directory, os.listdir(values_directory)[0])
+        with open(scope_path, "rt", encoding="utf-8") as infile:
+            scope_document = json.load(infile)
+        long_expired_entry = scope_document["values"]["test.long_expired"]
+        long_expired_entry["expires"] -= PropertyValueCache.RETENTION_SECONDS + 1
+        long_expired_entry["stored"] -= PropertyValueCache.RETENTION_SECONDS + 1
+        with open(scope_path, "wt", encoding="utf-8") as outfile:
+            json.dump(scope_document, outfile)
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        for next_index in range(3):
+            time.sleep(0.01)
+            second_cache.set(f"test.value_{next_index}", GLOBAL_POLICY, "new")
+        second_cache.save()
+        with open(scope_path, "rt", encoding="utf-8") as infile:
+            saved_names = sorted(json.load(infile)["values"])
+
+    # Assert
+    assert saved_names == ["test.value_0", "test.value_1", "test.value_2"]
+
+
+def test_property_value_cache_removes_stale_scopes() -> None:
+    """Test to verify that the files of scopes that have not been saved within the
+    retention period are removed when a new scope is saved."""
+
+    # Arrange
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        old_directory = os.path.join(temporary_directory, "old")
+        new_directory = os.path.join(temporary_directory, "new")
+        os.makedirs(old_directory)
+        os.makedirs(new_directory)
+        first_cache = PropertyValueCache(temporary_directory, old_directory)
+        first_cache.set("system.cwd", DIRECTORY_POLICY, old_directory)
+        first_cache.save()
+        values_directory = os.path.join(temporary_directory, "values")
+        old_scope_path = os.path.join(values_directory, os.listdir(values_directory)[0])
+        stale_time = time.time() - PropertyValueCache.RETENTION_SECONDS - 1
+        os.utime(old_scope_path, (stale_time, stale_time))
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, new_directory)
+        second_cache.set("system.cwd", DIRECTORY_POLICY, new_directory)
+        second_cache.save()
+        remaining_scope_files = os.listdir(values_directory)
+
+    # Assert
+    assert len(remaining_scope_files) == 1
+    assert not os.path.exists(old_scope_path)
+
+
+def test_property_value_cache_last_known_value() -> None:
+    """Test to verify that the last known value is kept after it has expired."""
+
+    # Arrange
+    expired_policy = PropertyCachePolicy(0, PropertyCacheScope.DIRECTORY)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("git.status", expired_policy, "clean")
+        first_cache.save()
+
+        # Act
+        second_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        current_value = second_cache.get("git.status", expired_policy)
+        last_known_value = second_cache.get_last_known("git.status", expired_policy)
+
+    # Assert
+    assert current_value is None
+    assert last_known_value == "clean"
+
+
+def test_mainline_run_refresh(monkeypatch) -> None:
+    """Test to verify that the background refresh stores the values of the properties
+    and releases its lock."""
+
+    # Arrange
+    application_runner = ApplicationMainline()
+    arguments_to_use = ["run", "--refresh", "system.cwd"]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        monkeypatch.setenv("XDG_CACHE_HOME", temporary_directory)
+        cache_directory = os.path.join(temporary_directory, "pyshell")
+        assert PropertyValueCache(cache_directory).acquire_refresh_lock(["system.cwd"])
+
+        # Act
+        with set_environment_simulating_execution_in_ps1():
+            execute_result = application_runner.invoke_main(arguments=arguments_to_use)
+
+        value_cache = PropertyValueCache(cache_directory)
+        stored_value = value_cache.get_last_known("system.cwd", DIRECTORY_POLICY)
+        lock_acquired = value_cache.acquire_refresh_lock(["system.cwd"])
+
+    # Assert
+    execute_result.assert_results("", "", 0)
+    assert stored_value == os.path.basename(os.getcwd())
+    assert lock_acquired
+
+
+def test_mainline_run_refresh_failed(monkeypatch) -> None:
+    """Test to verify that the background refresh releases its lock even if it fails
+    before the values can be refreshed."""
+
+    # Arrange
+    json_configuration = '{"items": {"bad": {"type": "not-a-type"}}}'
+    application_runner = ApplicationMainline()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        monkeypatch.setenv("XDG_CACHE_HOME", temporary_directory)
+        cache_directory = os.path.join(temporary_directory, "pyshell")
+        assert PropertyValueCache(cache_directory).acquire_refresh_lock(["system.cwd"])
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = [
+                "--config",
+                config_path,
+                "run",
+                "--refresh",
+                "system.cwd",
+            ]
+
+            # Act
+            with set_environment_simulating_execution_in_ps1():
+                execute_result = application_runner.invoke_main(
+                    arguments=arguments_to_use
+                )
+
+        lock_acquired = PropertyValueCache(cache_directory).acquire_refresh_lock(
+            ["system.cwd"]
+        )
+
+    # Assert
+    assert execute_result.return_code == 1
+    assert lock_acquired
+
+
+def test_mainline_run_starts_refresh(monkeypatch) -> None:
+    """Test to verify that the background refresh is started with the entry script,
+    so that it works from any directory, and that its output is written to a log
+    file next to its lock."""
+
+    # Arrange
+    json_configuration = """{"items": {"cwd": {"type": "property",
+        "data_source": "system", "data_item": "cwd", "refresh": "background"}}}"""
+    application_runner = ApplicationMainline()
+    started_processes = []
+
+    def record_process(process_arguments, **process_options):
+        started_processes.append((process_arguments, process_options["stdout"].name))
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        monkeypatch.setenv("XDG_CACHE_HOME", temporary_directory)
+        monkeypatch.setattr(subprocess, "Popen", record_process)
+        cache_directory = os.path.join(temporary_directory, "pyshell")
+        with create_temporary_configuration_file(json_configuration) as config_path:
+            arguments_to_use = ["--config", config_path, "run"]
+
+            # Act
+            with set_environment_simulating_execution_in_ps1():
+                execute_result = application_runner.invoke_main(
+                    arguments=arguments_to_use
+                )
+
+        expected_log_path = PropertyValueCache(cache_directory).get_refresh_log_path(
+            ["system.cwd"]
+        )
+
+    # Assert
+    assert execute_result.return_code == 0
+    assert len(started_processes) == 1
+    refresh_arguments, refresh_log_path = started_processes[0]
+    assert refresh_arguments[:2] == [sys.executable, ENTRY_SCRIPT_PATH]
+    assert refresh_arguments[-3:] == ["run", "--refresh", "system.cwd"]
+    assert refresh_log_path == expected_log_path
+
+
+def test_property_value_cache_boot_scope(monkeypatch) -> None:
+    """Test to verify that values that last until the machine is restarted are not
+    loaded after a restart."""
+
+    # Arrange
+    boot_policy = PropertyCachePolicy(None, PropertyCacheScope.BOOT)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        boot_id_path = os.path.join(temporary_directory, "boot_id")
+        monkeypatch.setattr(PropertyValueCache, "BOOT_ID_PATH", boot_id_path)
+        with open(boot_id_path, "wt", encoding="utf-8") as outfile:
+            outfile.write("first-boot\n")
+        first_cache = PropertyValueCache(temporary_directory, temporary_directory)
+        first_cache.set("system.host_name", boot_policy, "scaramouche")
+        first_cache.save()
+
+        # Act
+        same_boot_value = PropertyValueCache(
+            temporary_directory, temporary_directory
+        ).get("system.host_name", boot_policy)
+        with open(boot_id_path, "wt", encoding="utf-8") as outfile:
+            outfile.write("second-boot\n")
+        next_boot_value = PropertyValueCache(
+            temporary_directory, temporary_directory
+        ).get("system.host_name", boot_policy)
+        os.remove(boot_id_path)
+        unknown_boot_cache = PropertyValueCache(
+            temporary_directory, temporary_directory
+        )
+        unknown_boot_cache.set("system.host_name", boot_policy, "scaramouche")
+        unknown_boot_value = unknown_boot_cache.get("system.host_name", boot_policy)
+
+    # Assert
+    assert same_boot_value == "scaramouche"
+    assert next_boot_value is None
+    assert unknown_boot_value is None
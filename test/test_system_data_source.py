@@ -104,6 +104,24 @@ def test_system_data_source_get_property_user_name() -> None:
     assert generated_dependencies == user_name_to_test_for
 
 
+def test_system_data_source_get_property_user_name_changed() -> None:
+    """Test to verify that the user_name property follows a change to the user name,
+    such as after "su" in the same terminal."""
+
+    # Arrange
+    data_source = SystemDataSource()
+    with set_environment_simulating_user_name("bob"):
+        first_user_name = data_source.get_property("user_name")
+
+    # Act
+    with set_environment_simulating_user_name("alice"):
+        second_user_name = data_source.get_property("user_name")
+
+    # Assert
+    assert first_user_name == "bob"
+    assert second_user_name == "alice"
+
+
 def test_system_data_source_get_property_hostname(mock_gethostname) -> None:
     """Test to verify that we can get the system's name and it is the same as asking for the "host_name" property."""
 